@@ -1,24 +1,40 @@
+import collections
 import configparser
 import csv
 import datetime
+import json
 import os
 import platform
+import queue
 import sys
+import threading
 import time
 import webbrowser
 from tkinter import Tk, Toplevel, Event, TclError, StringVar, Frame, Menu, Label, Entry, SOLID, RIDGE, \
-    DISABLED, NORMAL, N, S, E, W, LEFT, messagebox, PhotoImage
-from tkinter.ttk import Combobox, Button
-from typing import Union, Optional, List, Dict, Tuple, TextIO, Any
+    DISABLED, NORMAL, N, S, E, W, LEFT, VERTICAL, messagebox, PhotoImage
+from tkinter.ttk import Combobox, Button, Scrollbar
+from typing import Union, Optional, List, Dict, Deque, Tuple, TextIO, Any, TYPE_CHECKING
 
-import bs4
-import pandas
-import requests
-import streamtologger
-import tksheet
+from nse_oca_scheduler import PollScheduler
+from nse_oca_symbols import SymbolCache
+
+if TYPE_CHECKING:
+    import requests
+
+    import nse_oca_capture
+    import nse_oca_chain
+    import nse_oca_engine
+    import nse_oca_export
+    import nse_oca_history
+    import nse_oca_store
+    from nse_oca_client import NseClient
+
+started_at: float = time.perf_counter()
 
 is_windows: bool = platform.system() == "Windows"
 is_windows_10: bool = is_windows and platform.release() == "10"
+palette: Tuple[str, str, str, str] = ("", "#00e676", "#e53935", "SystemButtonFace" if is_windows else "#d9d9d9")
+frame_budget: float = 1 / 60
 if is_windows_10:
     # noinspection PyUnresolvedReferences
     import win10toast
@@ -28,9 +44,11 @@ if is_windows_10:
 class Nse:
     version: str = '5.3'
     beta: Tuple[bool, int] = (False, 0)
+    default_base_url: str = "https://www.nseindia.com"
 
-    def __init__(self, window: Tk) -> None:
-        self.intervals: List[int] = [1, 2, 3, 5, 10, 15]
+    def __init__(self, window: Tk, startup_time: bool = False) -> None:
+        self.startup_time: bool = startup_time
+        self.intervals: List[float] = [0.25, 0.5, 1, 2, 3, 5, 10, 15]
         self.stdout: TextIO = sys.stdout
         self.stderr: TextIO = sys.stderr
         self.previous_date: Optional[datetime.date] = None
@@ -38,13 +56,36 @@ class Nse:
         self.time_difference_factor: int = 5
         self.first_run: bool = True
         self.stop: bool = False
+        self.fetch_requests: queue.Queue = queue.Queue()
+        self.snapshots: queue.Queue = queue.Queue()
+        self.fetch_pending: bool = False
+        self.last_timestamp: Optional[str] = None
+        self.skipped_ticks: int = 0
+        self.fetch_worker: Optional[threading.Thread] = None
+        self.poll_interval: int = 100
+        self.scheduler: Optional[PollScheduler] = None
+        self.journal: Optional[nse_oca_capture.Journal] = None
+        self.snapshot_writer: Optional[nse_oca_store.SnapshotWriter] = None
+        self.export_sink: Optional[nse_oca_export.ExportSink] = None
+        self.history_writer: Optional[nse_oca_history.HistoryWriter] = None
+        self.chains: Dict[str, nse_oca_chain.OptionChain] = {}
+        self.deltas: Dict[str, nse_oca_engine.StrikeDeltas] = {}
+        self.delta_engine: Optional[nse_oca_engine.DeltaEngine] = None
+        self.main_after: Optional[str] = None
+        self.updates_checked: bool = False
+        self.expiries_win: Optional[Toplevel] = None
+        self.strikes_win: Optional[Toplevel] = None
+        self.strike_sort_columns: Tuple[str, ...] = (
+            'Strike Price', 'Call Sum', 'Put Sum', 'Difference', 'Call Boundary', 'Put Boundary', 'Call ITM', 'Put ITM')
+        self.client: Optional[NseClient] = None
+        self.client_lock: threading.Lock = threading.Lock()
+        self.dates_results: queue.Queue = queue.Queue()
+        self.icon_thread: Optional[threading.Thread] = None
         self.dates: List[str] = [""]
         self.indices: List[str] = []
         self.stocks: List[str] = []
-        self.url_oc: str = "https://www.nseindia.com/option-chain"
-        self.url_index: str = "https://www.nseindia.com/api/option-chain-indices?symbol="
-        self.url_stock: str = "https://www.nseindia.com/api/option-chain-equities?symbol="
-        self.url_symbols: str = "https://www.nseindia.com/products-services/" \
+        self.base_url: str = self.get_base_url()
+        self.url_symbols: str = f"{self.base_url}/products-services/" \
                                 "equity-derivatives-list-underlyings-information"
         self.url_icon_png: str = "https://raw.githubusercontent.com/VarunS2002/" \
                                  "Python-NSE-Option-Chain-Analyzer/master/nse_logo.png"
@@ -52,6 +93,8 @@ class Nse:
                                  "Python-NSE-Option-Chain-Analyzer/master/nse_logo.ico"
         self.url_update: str = "https://api.github.com/repos/VarunS2002/" \
                                "Python-NSE-Option-Chain-Analyzer/releases/latest"
+        self.update_cache_path: str = ".NSE-OCA-update.json"
+        self.update_cache_ttl: float = 86400
         self.headers: Dict[str, str] = {
             'user-agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, '
                           'like Gecko) Chrome/80.0.3987.149 Safari/537.36',
@@ -71,63 +114,51 @@ class Nse:
             'Time', 'Value', f'Call Sum ({self.units_str})', f'Put Sum ({self.units_str})',
             f'Difference ({self.units_str})',
             f'Call Boundary ({self.units_str})', f'Put Boundary ({self.units_str})', 'Call ITM', 'Put ITM')
-        self.session: requests.Session = requests.Session()
-        self.cookies: Dict[str, str] = {}
         self.toaster: win10toast.ToastNotifier = win10toast.ToastNotifier() if is_windows_10 else None
         self.get_icon()
         self.login_win(window)
 
     def get_symbols(self, window: Tk) -> None:
-        def create_error_window(error_window: Tk):
+        def create_error_window(error_window: Tk) -> bool:
             error_window.title("NSE-Option-Chain-Analyzer")
             window_width: int = error_window.winfo_reqwidth()
             window_height: int = error_window.winfo_reqheight()
             position_right: int = int(error_window.winfo_screenwidth() / 2 - window_width / 2)
             position_down: int = int(error_window.winfo_screenheight() / 2 - window_height / 2)
             error_window.geometry("320x160+{}+{}".format(position_right, position_down))
-            messagebox.showerror(title="Error", message="Failed to fetch Symbols.\nThe program will now exit.")
-            error_window.destroy()
+            return messagebox.askretrycancel(title="Error", message="Failed to fetch Symbols.\n"
+                                                                    "Retry or cancel to exit the program.")
 
-        try:
-            symbols_information: requests.Response = requests.get(self.url_symbols, headers=self.headers)
-        except Exception as err:
-            print(err, sys.exc_info()[0], "19")
-            create_error_window(window)
-            sys.exit()
-        symbols_information_soup: bs4.BeautifulSoup = bs4.BeautifulSoup(symbols_information.content, "html.parser")
-        try:
-            symbols_table: bs4.element.Tag = symbols_information_soup.findChildren('table')[0]
-        except IndexError as err:
-            print(err, sys.exc_info()[0], "20")
-            create_error_window(window)
-            sys.exit()
-        symbols_table_rows: List[bs4.element.Tag] = list(symbols_table.findChildren(['th', 'tr']))
-        symbols_table_rows_str: List[str] = ['' for _ in range(len(symbols_table_rows) - 1)]
-        for column in range(len(symbols_table_rows) - 1):
-            symbols_table_rows_str[column] = str(symbols_table_rows[column])
-        divider_row: str = '<tr>\n' \
-                           '<td colspan="3"><strong>Derivatives on Individual Securities</strong></td>\n' \
-                           '</tr>'
-        for column in range(4, symbols_table_rows_str.index(divider_row) + 1):
-            cells: bs4.element.ResultSet = symbols_table_rows[column].findChildren('td')
-            column: int = 0
-            for cell in cells:
-                if column == 2:
-                    self.indices.append(cell.string)
-                column += 1
-        for column in reversed(range(symbols_table_rows_str.index(divider_row) + 1)):
-            symbols_table_rows.pop(column)
-        for row in symbols_table_rows:
-            cells: bs4.element.ResultSet = row.findChildren('td')
-            column: int = 0
-            for cell in cells:
-                if column == 2:
-                    self.stocks.append(cell.string)
-                column += 1
+        symbol_cache: SymbolCache = SymbolCache(self.url_symbols, self.headers)
+        symbols: Optional[Tuple[List[str], List[str]]] = symbol_cache.load()
+        if symbols is not None and symbol_cache.expired:
+            symbol_cache.refresh_in_background()
+        while symbols is None:
+            import requests
+
+            try:
+                symbols = symbol_cache.fetch()
+                break
+            except requests.RequestException as err:
+                print(err, sys.exc_info()[0], "19")
+            except ValueError as err:
+                print(err, sys.exc_info()[0], "20")
+            if not create_error_window(window):
+                window.destroy()
+                sys.exit()
+        self.indices, self.stocks = symbols
+
+    def get_client(self) -> 'NseClient':
+        with self.client_lock:
+            if self.client is None:
+                from nse_oca_client import NseClient
+
+                self.client = NseClient(pool_size=1, base_url=self.base_url)
+            return self.client
 
     def get_icon(self) -> None:
-        self.icon_png_path: str
-        self.icon_ico_path: str
+        self.icon_png_path: Optional[str] = None
+        self.icon_ico_path: Optional[str] = None
         try:
             # noinspection PyProtectedMember,PyUnresolvedReferences
             base_path: str = sys._MEIPASS
@@ -136,43 +167,126 @@ class Nse:
             self.load_nse_icon = True
         except AttributeError:
             if self.load_nse_icon:
-                try:
-                    icon_png_raw: requests.Response = requests.get(self.url_icon_png, headers=self.headers, stream=True)
-                    with open('.NSE-OCA.png', 'wb') as f:
-                        for chunk in icon_png_raw.iter_content(1024):
-                            f.write(chunk)
-                    self.icon_png_path = '.NSE-OCA.png'
-                    PhotoImage(file=self.icon_png_path)
-                except Exception as err:
-                    print(err, sys.exc_info()[0], "17")
-                    self.load_nse_icon = False
+                self.load_nse_icon = False
+                if self.load_cached_icon() and (self.icon_ico_path is not None or not is_windows_10):
                     return
-                if is_windows_10:
-                    try:
-                        icon_ico_raw: requests.Response = requests.get(self.url_icon_ico,
-                                                                       headers=self.headers, stream=True)
-                        with open('.NSE-OCA.ico', 'wb') as f:
-                            for chunk in icon_ico_raw.iter_content(1024):
-                                f.write(chunk)
-                        self.icon_ico_path = '.NSE-OCA.ico'
-                    except Exception as err:
-                        print(err, sys.exc_info()[0], "18")
-                        self.icon_ico_path = None
-                        return
+                self.icon_thread = threading.Thread(target=self.download_icon, name="NSE-OCA-Icon", daemon=True)
+                self.icon_thread.start()
+
+    def load_cached_icon(self) -> bool:
+        if not os.path.isfile('.NSE-OCA.png'):
+            return False
+        try:
+            PhotoImage(file='.NSE-OCA.png')
+        except TclError as err:
+            print(err, sys.exc_info()[0], "17")
+            os.remove('.NSE-OCA.png')
+            return False
+        self.icon_png_path = '.NSE-OCA.png'
+        self.icon_ico_path = '.NSE-OCA.ico' if os.path.isfile('.NSE-OCA.ico') else None
+        self.load_nse_icon = True
+        return True
+
+    def download_icon(self) -> None:
+        import requests
+
+        try:
+            icon_png_raw: requests.Response = requests.get(self.url_icon_png, headers=self.headers, stream=True,
+                                                           timeout=10)
+            icon_png_raw.raise_for_status()
+            with open('.NSE-OCA.png.tmp', 'wb') as f:
+                for chunk in icon_png_raw.iter_content(1024):
+                    f.write(chunk)
+            os.replace('.NSE-OCA.png.tmp', '.NSE-OCA.png')
+        except Exception as err:
+            print(err, sys.exc_info()[0], "17")
+            return
+        if is_windows_10:
+            try:
+                icon_ico_raw: requests.Response = requests.get(self.url_icon_ico, headers=self.headers, stream=True,
+                                                               timeout=10)
+                icon_ico_raw.raise_for_status()
+                with open('.NSE-OCA.ico.tmp', 'wb') as f:
+                    for chunk in icon_ico_raw.iter_content(1024):
+                        f.write(chunk)
+                os.replace('.NSE-OCA.ico.tmp', '.NSE-OCA.ico')
+            except Exception as err:
+                print(err, sys.exc_info()[0], "18")
+
+    def poll_icon(self, window: Union[Tk, Toplevel]) -> None:
+        if self.icon_thread is None:
+            return
+        if self.icon_thread.is_alive():
+            window.after(self.poll_interval, self.poll_icon, window)
+            return
+        self.icon_thread = None
+        if self.load_cached_icon():
+            window.iconphoto(True, PhotoImage(file=self.icon_png_path))
 
     def check_for_updates(self, auto: bool = True) -> None:
+        latest_version: Optional[str] = self.load_update_cache() if auto else None
+        if latest_version is not None:
+            self.show_update(latest_version, auto)
+            return
+        results: queue.Queue = queue.Queue()
+        threading.Thread(target=self.fetch_latest_version, args=(results,), name="NSE-OCA-Update",
+                         daemon=True).start()
+        self.root.after(self.poll_interval, self.poll_update, results, auto)
+
+    def fetch_latest_version(self, results: queue.Queue) -> None:
+        import requests
+
         try:
             release_data: requests.Response = requests.get(self.url_update, headers=self.headers, timeout=5)
             latest_version: str = release_data.json()['tag_name']
             float(latest_version)
         except Exception as err:
             print(err, sys.exc_info()[0], "21")
-            if not auto:
-                self.info.attributes('-topmost', False)
-                messagebox.showerror(title="Error", message="Failed to check for updates.")
-                self.info.attributes('-topmost', True)
+            results.put(None)
             return
+        self.save_update_cache(latest_version)
+        results.put(latest_version)
 
+    def load_update_cache(self) -> Optional[str]:
+        if not os.path.isfile(self.update_cache_path):
+            return
+        try:
+            with open(self.update_cache_path) as f:
+                cached: Dict[str, Any] = json.load(f)
+            if time.time() - cached['checked'] > self.update_cache_ttl:
+                return
+            float(cached['latest_version'])
+        except (OSError, ValueError, TypeError, KeyError) as err:
+            print(err, sys.exc_info()[0], "40")
+            return
+        return cached['latest_version']
+
+    def save_update_cache(self, latest_version: str) -> None:
+        try:
+            with open(f"{self.update_cache_path}.tmp", 'w') as f:
+                json.dump({'checked': time.time(), 'latest_version': latest_version}, f)
+            os.replace(f"{self.update_cache_path}.tmp", self.update_cache_path)
+        except OSError as err:
+            print(err, sys.exc_info()[0], "41")
+
+    def poll_update(self, results: queue.Queue, auto: bool) -> None:
+        try:
+            latest_version: Optional[str] = results.get_nowait()
+        except queue.Empty:
+            self.root.after(self.poll_interval, self.poll_update, results, auto)
+            return
+        try:
+            if latest_version is None:
+                if not auto:
+                    self.info.attributes('-topmost', False)
+                    messagebox.showerror(title="Error", message="Failed to check for updates.")
+                    self.info.attributes('-topmost', True)
+                return
+            self.show_update(latest_version, auto)
+        except TclError as err:
+            print(err, sys.exc_info()[0], "21")
+
+    def show_update(self, latest_version: str, auto: bool) -> None:
         if float(latest_version) > float(Nse.version):
             self.info.attributes('-topmost', False) if not auto else None
             update: bool = messagebox.askyesno(
@@ -193,6 +307,16 @@ class Nse:
                                                                           f"Version: {Nse.version}")
                 self.info.attributes('-topmost', True)
 
+    @staticmethod
+    def get_base_url() -> str:
+        config_parser: configparser.ConfigParser = configparser.ConfigParser()
+        try:
+            config_parser.read('NSE-OCA.ini')
+            return config_parser.get('main', 'base_url', fallback='').rstrip('/') or Nse.default_base_url
+        except configparser.Error as err:
+            print(err, sys.exc_info()[0], "0")
+            return Nse.default_base_url
+
     def get_config(self) -> None:
         try:
             self.config_parser.read('NSE-OCA.ini')
@@ -228,7 +352,7 @@ class Nse:
                 self.option_mode: str = self.config_parser.get('main', 'option_mode')
             try:
                 self.seconds: int = self.config_parser.getint('main', 'seconds')
-                if self.seconds not in (60, 120, 180, 300, 600, 900):
+                if self.seconds not in (15, 30, 60, 120, 180, 300, 600, 900):
                     raise ValueError(f'{self.seconds} is not a refresh interval')
             except (configparser.NoOptionError, ValueError) as err:
                 print(err, sys.exc_info()[0], "0")
@@ -278,6 +402,35 @@ class Nse:
                 print(err, sys.exc_info()[0], "0")
                 self.create_config(attribute="warn_late_update")
                 self.warn_late_update: bool = self.config_parser.getboolean('main', 'warn_late_update')
+            try:
+                self.strike_price: str = self.config_parser.get('main', 'strike_price')
+            except (configparser.NoOptionError, ValueError) as err:
+                print(err, sys.exc_info()[0], "0")
+                self.create_config(attribute="strike_price")
+                self.strike_price: str = self.config_parser.get('main', 'strike_price')
+            try:
+                self.capture: bool = self.config_parser.getboolean('main', 'capture')
+            except (configparser.NoOptionError, ValueError) as err:
+                print(err, sys.exc_info()[0], "0")
+                self.create_config(attribute="capture")
+                self.capture: bool = self.config_parser.getboolean('main', 'capture')
+            try:
+                self.adaptive: bool = self.config_parser.getboolean('main', 'adaptive')
+            except (configparser.NoOptionError, ValueError) as err:
+                print(err, sys.exc_info()[0], "0")
+                self.create_config(attribute="adaptive")
+                self.adaptive: bool = self.config_parser.getboolean('main', 'adaptive')
+            try:
+                self.history: bool = self.config_parser.getboolean('main', 'history')
+            except (configparser.NoOptionError, ValueError) as err:
+                print(err, sys.exc_info()[0], "0")
+                self.create_config(attribute="history")
+                self.history: bool = self.config_parser.getboolean('main', 'history')
+            try:
+                self.config_parser.get('main', 'base_url')
+            except configparser.NoOptionError as err:
+                print(err, sys.exc_info()[0], "0")
+                self.create_config(attribute="base_url")
         except (configparser.NoSectionError, configparser.MissingSectionHeaderError,
                 configparser.DuplicateSectionError, configparser.DuplicateOptionError) as err:
             print(err, sys.exc_info()[0], "0")
@@ -303,6 +456,11 @@ class Nse:
             self.config_parser.set('main', 'update', 'True')
             self.config_parser.set('main', 'logging', 'False')
             self.config_parser.set('main', 'warn_late_update', 'False')
+            self.config_parser.set('main', 'strike_price', '')
+            self.config_parser.set('main', 'capture', 'False')
+            self.config_parser.set('main', 'base_url', Nse.default_base_url)
+            self.config_parser.set('main', 'adaptive', 'True')
+            self.config_parser.set('main', 'history', 'False')
         elif attribute is not None:
             if attribute == "load_nse_icon":
                 self.config_parser.set('main', 'load_nse_icon', 'True')
@@ -320,20 +478,28 @@ class Nse:
                 self.config_parser.set('main', 'update', 'True')
             elif attribute == "warn_late_update":
                 self.config_parser.set('main', 'warn_late_update', 'False')
+            elif attribute == "strike_price":
+                self.config_parser.set('main', 'strike_price', '')
+            elif attribute == "capture":
+                self.config_parser.set('main', 'capture', 'False')
+            elif attribute == "base_url":
+                self.config_parser.set('main', 'base_url', Nse.default_base_url)
+            elif attribute == "adaptive":
+                self.config_parser.set('main', 'adaptive', 'True')
+            elif attribute == "history":
+                self.config_parser.set('main', 'history', 'False')
 
         with open('NSE-OCA.ini', 'w') as f:
             self.config_parser.write(f)
 
     # noinspection PyUnusedLocal
-    def get_data(self, event: Optional[Event] = None) -> Optional[Tuple[Optional[requests.Response], Any]]:
+    def get_data(self, event: Optional[Event] = None) -> Optional[Tuple[Optional['requests.Response'], Any]]:
         if self.first_run:
             return self.get_data_first_run()
         else:
             return self.get_data_refresh()
 
-    def get_data_first_run(self) -> Optional[Tuple[Optional[requests.Response], Any]]:
-        request: Optional[requests.Response] = None
-        response: Optional[requests.Response] = None
+    def get_data_first_run(self) -> None:
         self.units_str = 'in K' if self.option_mode == 'Index' else 'in 10s'
         self.output_columns: Tuple[str, str, str, str, str, str, str, str, str] = (
             'Time', 'Value', f'Call Sum\n({self.units_str})', f'Put Sum\n({self.units_str})',
@@ -353,31 +519,46 @@ class Nse:
         with open('NSE-OCA.ini', 'w') as f:
             self.config_parser.write(f)
 
-        url: str = self.url_index + self.index if self.option_mode == 'Index' else self.url_stock + self.stock
+        symbol: str = self.index if self.option_mode == 'Index' else self.stock
+        threading.Thread(target=self.fetch_dates, args=(symbol, self.option_mode), name="NSE-OCA-Dates",
+                         daemon=True).start()
+        self.login.after(self.poll_interval, self.poll_dates)
+
+    def fetch_dates(self, symbol: str, option_mode: str) -> None:
+        import nse_oca_chain
+
+        response: Optional[requests.Response] = self.get_client().get(symbol, option_mode)
+        json_data: Any = None
+        if response is not None:
+            try:
+                json_data = nse_oca_chain.json_loads(response.content)
+            except Exception as err:
+                print(response)
+                print(err, sys.exc_info()[0], "2")
+                json_data = {}
+        self.dates_results.put((symbol, option_mode, response, json_data))
+
+    def poll_dates(self) -> None:
         try:
-            request = self.session.get(self.url_oc, headers=self.headers, timeout=5)
-            self.cookies = dict(request.cookies)
-            response = self.session.get(url, headers=self.headers, timeout=5, cookies=self.cookies)
-        except Exception as err:
-            print(request)
-            print(response)
-            print(err, sys.exc_info()[0], "1")
+            symbol: str
+            option_mode: str
+            response: Optional[requests.Response]
+            json_data: Any
+            symbol, option_mode, response, json_data = self.dates_results.get_nowait()
+        except queue.Empty:
+            self.login.after(self.poll_interval, self.poll_dates)
+            return
+        if option_mode != self.option_mode or \
+                symbol != (self.index if self.option_mode == 'Index' else self.stock):
+            return
+        if response is None:
+            print(f"Failed to fetch the option chain of {symbol}", "1")
             messagebox.showerror(title="Error", message="Error in fetching dates.\nPlease retry.")
             self.dates.clear()
             self.dates = [""]
             self.date_menu.config(values=tuple(self.dates))
             self.date_menu.current(0)
             return
-        json_data: Any
-        if response is not None:
-            try:
-                json_data = response.json()
-            except Exception as err:
-                print(response)
-                print(err, sys.exc_info()[0], "2")
-                json_data = {}
-        else:
-            json_data = {}
         if json_data == {}:
             messagebox.showerror(title="Error", message="Error in fetching dates.\nPlease retry.")
             self.dates.clear()
@@ -397,51 +578,65 @@ class Nse:
         except TclError:
             pass
 
-        return response, json_data
+    def get_data_refresh(self) -> Optional[Tuple[Optional['requests.Response'], Any]]:
+        import nse_oca_chain
 
-    def get_data_refresh(self) -> Optional[Tuple[Optional[requests.Response], Any]]:
-        request: Optional[requests.Response] = None
-        response: Optional[requests.Response] = None
-        url: str = self.url_index + self.index if self.option_mode == 'Index' else self.url_stock + self.stock
+        response: Optional[requests.Response] = self.get_client().get(
+            self.index if self.option_mode == 'Index' else self.stock, self.option_mode)
+        if response is None:
+            return
         try:
-            response = self.session.get(url, headers=self.headers, timeout=5, cookies=self.cookies)
-            if response.status_code == 401:
-                self.session.close()
-                self.session = requests.Session()
-                request = self.session.get(self.url_oc, headers=self.headers, timeout=5)
-                self.cookies = dict(request.cookies)
-                response = self.session.get(url, headers=self.headers, timeout=5, cookies=self.cookies)
-                print("reset cookies")
+            json_data: Any = nse_oca_chain.json_loads(response.content)
         except Exception as err:
-            print(request)
             print(response)
-            print(err, sys.exc_info()[0], "4")
-            try:
-                self.session.close()
-                self.session = requests.Session()
-                request = self.session.get(self.url_oc, headers=self.headers, timeout=5)
-                self.cookies = dict(request.cookies)
-                response = self.session.get(url, headers=self.headers, timeout=5, cookies=self.cookies)
-                print("reset cookies")
-            except Exception as err:
-                print(request)
-                print(response)
-                print(err, sys.exc_info()[0], "5")
-                return
-        if response is not None:
-            try:
-                json_data: Any = response.json()
-            except Exception as err:
-                print(response)
-                print(err, sys.exc_info()[0], "6")
-                json_data = {}
-        else:
+            print(err, sys.exc_info()[0], "6")
             json_data = {}
         if json_data == {}:
             return
+        if self.capture:
+            self.capture_response(response.content)
 
         return response, json_data
 
+    def capture_response(self, content: bytes) -> None:
+        import nse_oca_capture
+
+        symbol: str = self.index if self.option_mode == 'Index' else self.stock
+        journal_path: str = nse_oca_capture.journal_path(symbol)
+        try:
+            if self.journal is None or self.journal.path != journal_path:
+                self.close_journal()
+                self.journal = nse_oca_capture.Journal(journal_path)
+            self.journal.append(symbol, content)
+        except (OSError, ValueError) as err:
+            print(err, sys.exc_info()[0], "33")
+
+    def close_journal(self) -> None:
+        journal: Optional[nse_oca_capture.Journal] = self.journal
+        self.journal = None
+        if journal is not None:
+            journal.close()
+
+    def store_snapshot(self, chain: 'nse_oca_chain.OptionChain') -> None:
+        import nse_oca_store
+
+        symbol: str = self.index if self.option_mode == 'Index' else self.stock
+        if self.snapshot_writer is None:
+            self.snapshot_writer = nse_oca_store.SnapshotWriter()
+        self.snapshot_writer.write(symbol, chain)
+        err: Optional[Exception] = self.snapshot_writer.error()
+        if isinstance(err, PermissionError):
+            messagebox.showerror(title="Export Failed",
+                                 message=f"Failed to access "
+                                         f"{os.path.join(nse_oca_store.store_directory, symbol, self.expiry_date)}.\n"
+                                         f"Permission Denied. Try closing any apps using it.")
+
+    def close_snapshot_writer(self) -> None:
+        snapshot_writer: Optional[nse_oca_store.SnapshotWriter] = self.snapshot_writer
+        self.snapshot_writer = None
+        if snapshot_writer is not None:
+            snapshot_writer.stop()
+
     def login_win(self, window: Tk) -> None:
         self.login: Tk = window
         self.login.title("NSE-Option-Chain-Analyzer")
@@ -500,6 +695,7 @@ class Nse:
         sp_label.grid(row=4, column=0, sticky=N + S + W)
         self.sp_entry = Entry(self.login, width=18, relief=SOLID)
         self.sp_entry.grid(row=4, column=1, sticky=N + S + E)
+        self.sp_entry.insert(0, self.strike_price)
         start_btn: Button = Button(self.login, text="Start", command=self.start, width=10)
         start_btn.grid(row=4, column=2, rowspan=2, sticky=N + S + E + W)
         intervals_label: Label = Label(self.login, text="Refresh Interval (in min): ", justify=LEFT)
@@ -508,8 +704,10 @@ class Nse:
                                                  values=tuple(self.intervals), state="readonly")
         self.intervals_menu.config(width=15)
         self.intervals_menu.grid(row=5, column=1, sticky=N + S + E)
-        self.intervals_menu.current(self.intervals.index(int(self.seconds / 60)))
+        self.intervals_menu.current(self.intervals.index(self.seconds / 60))
         self.sp_entry.focus_set()
+        self.poll_icon(self.login)
+        self.login.after_idle(self.report_startup)
         self.get_data()
 
         # noinspection PyUnusedLocal
@@ -529,6 +727,12 @@ class Nse:
 
         self.login.mainloop()
 
+    def report_startup(self) -> None:
+        if not self.startup_time:
+            return
+        print(f"Login window shown in {time.perf_counter() - started_at:.3f}s", file=self.stdout, flush=True)
+        self.close_login()
+
     def change_option_mode(self) -> None:
         if self.option_mode_btn['text'] == 'Index':
             self.option_mode = 'Stock'
@@ -549,7 +753,7 @@ class Nse:
 
     # noinspection PyUnusedLocal
     def start(self, event: Optional[Event] = None) -> None:
-        self.seconds = int(self.intervals_var.get()) * 60
+        self.seconds = int(float(self.intervals_var.get()) * 60)
         self.config_parser.set('main', 'seconds', f'{self.seconds}')
         with open('NSE-OCA.ini', 'w') as f:
             self.config_parser.write(f)
@@ -561,6 +765,10 @@ class Nse:
             self.export_row(None)
         try:
             self.sp: int = int(self.sp_entry.get())
+            self.config_parser.set('main', 'strike_price', f'{self.sp}')
+            with open('NSE-OCA.ini', 'w') as f:
+                self.config_parser.write(f)
+            self.scheduler = PollScheduler(self.seconds, adaptive=self.adaptive)
             self.login.destroy()
             self.main_win()
         except ValueError as err:
@@ -579,35 +787,40 @@ class Nse:
             self.options.entryconfig(self.options.index(0), label="Stop")
             messagebox.showinfo(title="Started", message="Retrieving new data has been started.")
 
+            if self.main_after is not None:
+                self.root.after_cancel(self.main_after)
+                self.main_after = None
             self.main()
 
+    def export_path(self) -> str:
+        return f"NSE-OCA-{self.index if self.option_mode == 'Index' else self.stock}-{self.expiry_date}.csv"
+
     # noinspection PyUnusedLocal
     def export(self, event: Optional[Event] = None) -> None:
-        sheet_data: List[List[str]] = self.sheet.get_sheet_data()
-        csv_exists: bool = os.path.isfile(
-            f"NSE-OCA-{self.index if self.option_mode == 'Index' else self.stock}-{self.expiry_date}.csv")
+        export_path: str = self.export_path()
+        flushed: Optional[threading.Event] = None
+        if self.export_sink is not None and self.export_sink.path == export_path:
+            flushed = self.export_sink.request_flush()
+        self.export_table(export_path, len(self.table_rows), flushed, time.monotonic() + 1)
+
+    def export_table(self, export_path: str, rows: int, flushed: Optional[threading.Event], deadline: float) -> None:
+        if flushed is not None and not flushed.is_set() and time.monotonic() < deadline:
+            self.root.after(self.poll_interval, self.export_table, export_path, rows, flushed, deadline)
+            return
+        csv_exists: bool = os.path.isfile(export_path)
         try:
-            if not csv_exists:
-                with open(f"NSE-OCA-{self.index if self.option_mode == 'Index' else self.stock}-{self.expiry_date}.csv",
-                          "a", newline="") as row:
-                    data_writer: csv.writer = csv.writer(row)
-                    data_writer.writerow(self.csv_headers)
-
-            with open(f"NSE-OCA-{self.index if self.option_mode == 'Index' else self.stock}-{self.expiry_date}.csv",
-                      "a", newline="") as row:
+            with open(export_path, "a", newline="") as row:
                 data_writer: csv.writer = csv.writer(row)
-                data_writer.writerows(sheet_data)
+                if not csv_exists:
+                    data_writer.writerow(self.csv_headers)
+                for chunk in self.table_rows.chunks(stop=rows):
+                    data_writer.writerows(chunk)
 
-            messagebox.showinfo(title="Export Successful",
-                                message=f"Data has been exported to NSE-OCA-"
-                                        f"{self.index if self.option_mode == 'Index' else self.stock}-"
-                                        f"{self.expiry_date}.csv.")
+            messagebox.showinfo(title="Export Successful", message=f"Data has been exported to {export_path}.")
         except PermissionError as err:
             print(err, sys.exc_info()[0], "12")
             messagebox.showerror(title="Export Failed",
-                                 message=f"Failed to access NSE-OCA-"
-                                         f"{self.index if self.option_mode == 'Index' else self.stock}-"
-                                         f"{self.expiry_date}.csv.\n"
+                                 message=f"Failed to access {export_path}.\n"
                                          f"Permission Denied. Try closing any apps using it.")
         except Exception as err:
             print(err, sys.exc_info()[0], "8")
@@ -615,41 +828,26 @@ class Nse:
                                  message="An error occurred while exporting the data.")
 
     def export_row(self, values: Optional[List[Union[str, float]]]) -> None:
-        if values is None:
-            csv_exists: bool = os.path.isfile(
-                f"NSE-OCA-{self.index if self.option_mode == 'Index' else self.stock}-{self.expiry_date}.csv")
-            try:
-                if not csv_exists:
-                    with open(
-                            f"NSE-OCA-{self.index if self.option_mode == 'Index' else self.stock}-"
-                            f"{self.expiry_date}.csv",
-                            "a", newline="") as row:
-                        data_writer: csv.writer = csv.writer(row)
-                        data_writer.writerow(self.csv_headers)
-            except PermissionError as err:
-                print(err, sys.exc_info()[0], "13")
-                messagebox.showerror(title="Export Failed",
-                                     message=f"Failed to access NSE-OCA-"
-                                             f"{self.index if self.option_mode == 'Index' else self.stock}-"
-                                             f"{self.expiry_date}.csv.\n"
-                                             f"Permission Denied. Try closing any apps using it.")
-            except Exception as err:
-                print(err, sys.exc_info()[0], "9")
-        else:
-            try:
-                with open(f"NSE-OCA-{self.index if self.option_mode == 'Index' else self.stock}-{self.expiry_date}.csv",
-                          "a", newline="") as row:
-                    data_writer: csv.writer = csv.writer(row)
-                    data_writer.writerow(values)
-            except PermissionError as err:
-                print(err, sys.exc_info()[0], "14")
-                messagebox.showerror(title="Export Failed",
-                                     message=f"Failed to access NSE-OCA-"
-                                             f"{self.index if self.option_mode == 'Index' else self.stock}-"
-                                             f"{self.expiry_date}.csv.\n"
-                                             f"Permission Denied. Try closing any apps using it.")
-            except Exception as err:
-                print(err, sys.exc_info()[0], "15")
+        import nse_oca_export
+
+        export_path: str = self.export_path()
+        if self.export_sink is None or self.export_sink.path != export_path:
+            self.close_export_sink()
+            self.export_sink = nse_oca_export.ExportSink(export_path, self.csv_headers)
+        if values is not None:
+            self.export_sink.write(values)
+        err: Optional[OSError] = self.export_sink.error()
+        if isinstance(err, PermissionError):
+            messagebox.showerror(title="Export Failed",
+                                 message=f"Failed to access {export_path}.\n"
+                                         f"Permission Denied. Try closing any apps using it. Rows are kept and "
+                                         f"will be written once it can be accessed again.")
+
+    def close_export_sink(self) -> None:
+        export_sink: Optional[nse_oca_export.ExportSink] = self.export_sink
+        self.export_sink = None
+        if export_sink is not None:
+            export_sink.stop()
 
     # noinspection PyUnusedLocal
     def toggle_live_export(self, event: Optional[Event] = None) -> None:
@@ -662,30 +860,31 @@ class Nse:
             self.live_export = True
             self.options.entryconfig(self.options.index(2), label="Live Exporting to CSV: On")
             messagebox.showinfo(title="Live Exporting Enabled",
-                                message=f"Data rows will be exported in real time to "
-                                        f"NSE-OCA-{self.index if self.option_mode == 'Index' else self.stock}-"
-                                        f"{self.expiry_date}.csv.")
+                                message=f"Data rows will be exported in real time to {self.export_path()}.")
 
         self.config_parser.set('main', 'live_export', f'{self.live_export}')
         with open('NSE-OCA.ini', 'w') as f:
             self.config_parser.write(f)
-        self.export_row(None)
+        self.export_row(None) if self.live_export else self.close_export_sink()
 
     # noinspection PyUnusedLocal
     def toggle_save_oc(self, event: Optional[Event] = None) -> None:
         if self.save_oc:
             self.save_oc = False
-            self.options.entryconfig(self.options.index(3), label="Dump Entire Option Chain to CSV: Off")
-            messagebox.showinfo(title="Dump Entire Option Chain Disabled",
-                                message=f"Entire Option Chain data will not be exported.")
+            self.close_snapshot_writer()
+            self.options.entryconfig(self.options.index(3), label="Store Entire Option Chain: Off")
+            messagebox.showinfo(title="Storing Entire Option Chain Disabled",
+                                message="Entire Option Chain data will not be stored.")
         else:
+            import nse_oca_store
+
             self.save_oc = True
-            self.options.entryconfig(self.options.index(3), label="Dump Entire Option Chain to CSV: On")
-            messagebox.showinfo(title="Dump Entire Option Chain Enabled",
-                                message=f"Entire Option Chain data will be exported to "
-                                        f"NSE-OCA-"
-                                        f"{self.index if self.option_mode == 'Index' else self.stock}-"
-                                        f"{self.expiry_date}-Full.csv.")
+            self.options.entryconfig(self.options.index(3), label="Store Entire Option Chain: On")
+            symbol: str = self.index if self.option_mode == 'Index' else self.stock
+            messagebox.showinfo(title="Storing Entire Option Chain Enabled",
+                                message=f"Every update of the Entire Option Chain will be appended to "
+                                        f"{os.path.join(nse_oca_store.store_directory, symbol, self.expiry_date)}.\n"
+                                        f"Export any of them to CSV with nse_oca_store.py.")
 
         self.config_parser.set('main', 'save_oc', f'{self.save_oc}')
         with open('NSE-OCA.ini', 'w') as f:
@@ -740,16 +939,34 @@ class Nse:
         with open('NSE-OCA.ini', 'w') as f:
             self.config_parser.write(f)
 
+    # noinspection PyUnusedLocal
+    def toggle_adaptive(self, event: Optional[Event] = None) -> None:
+        if self.adaptive:
+            self.adaptive = False
+            self.options.entryconfig(self.options.index(7), label="Adaptive Refresh: Off")
+            messagebox.showinfo(title="Adaptive Refresh Disabled",
+                                message="Program will refresh at the selected interval.")
+        else:
+            self.adaptive = True
+            self.options.entryconfig(self.options.index(7), label="Adaptive Refresh: On")
+            messagebox.showinfo(title="Adaptive Refresh Enabled",
+                                message="Program will refresh just after the server is expected to update.")
+        self.scheduler.adaptive = self.adaptive
+
+        self.config_parser.set('main', 'adaptive', f'{self.adaptive}')
+        with open('NSE-OCA.ini', 'w') as f:
+            self.config_parser.write(f)
+
     # noinspection PyUnusedLocal
     def toggle_updates(self, event: Optional[Event] = None) -> None:
         if self.update:
             self.update = False
-            self.options.entryconfig(self.options.index(8), label="Auto Check for Updates: Off")
+            self.options.entryconfig(self.options.index(9), label="Auto Check for Updates: Off")
             messagebox.showinfo(title="Auto Checking for Updates Disabled",
                                 message="Program will not check for updates at start.")
         else:
             self.update = True
-            self.options.entryconfig(self.options.index(8), label="Auto Check for Updates: On")
+            self.options.entryconfig(self.options.index(9), label="Auto Check for Updates: On")
             messagebox.showinfo(title="Auto Checking for Updates Enabled",
                                 message="Program will check for updates at start.")
 
@@ -759,6 +976,8 @@ class Nse:
 
     # noinspection PyUnusedLocal
     def log(self, event: Optional[Event] = None) -> None:
+        import streamtologger
+
         if self.first_run and self.logging or not self.logging:
             streamtologger.redirect(target="NSE-OCA.log",
                                     header_format="[{timestamp:%Y-%m-%d %H:%M:%S} - {level:5}] ")
@@ -783,7 +1002,7 @@ class Nse:
                     print("NSE icon loading disabled")
 
             try:
-                self.options.entryconfig(self.options.index(9), label="Debug Logging: On")
+                self.options.entryconfig(self.options.index(10), label="Debug Logging: On")
                 messagebox.showinfo(title="Debug Logging Enabled",
                                     message="Errors will be logged to NSE-OCA.log.")
             except AttributeError:
@@ -794,13 +1013,75 @@ class Nse:
             sys.stderr = self.stderr
             streamtologger._is_redirected = False
             self.logging = False
-            self.options.entryconfig(self.options.index(9), label="Debug Logging: Off")
+            self.options.entryconfig(self.options.index(10), label="Debug Logging: Off")
             messagebox.showinfo(title="Debug Logging Disabled", message="Errors will not be logged.")
 
         self.config_parser.set('main', 'logging', f'{self.logging}')
         with open('NSE-OCA.ini', 'w') as f:
             self.config_parser.write(f)
 
+    # noinspection PyUnusedLocal
+    def toggle_capture(self, event: Optional[Event] = None) -> None:
+        if self.capture:
+            self.capture = False
+            self.close_journal()
+            self.options.entryconfig(self.options.index(11), label="Capture Raw Responses: Off")
+            messagebox.showinfo(title="Capturing Raw Responses Disabled",
+                                message="Raw responses will not be saved.")
+        else:
+            import nse_oca_capture
+
+            self.capture = True
+            self.options.entryconfig(self.options.index(11), label="Capture Raw Responses: On")
+            symbol: str = self.index if self.option_mode == 'Index' else self.stock
+            messagebox.showinfo(title="Capturing Raw Responses Enabled",
+                                message=f"Raw responses will be saved to {nse_oca_capture.journal_path(symbol)} "
+                                        f"for replaying with nse_oca_headless.py --replay.")
+
+        self.config_parser.set('main', 'capture', f'{self.capture}')
+        with open('NSE-OCA.ini', 'w') as f:
+            self.config_parser.write(f)
+
+    # noinspection PyUnusedLocal
+    def toggle_history(self, event: Optional[Event] = None) -> None:
+        if self.history:
+            self.history = False
+            self.close_history_writer()
+            self.options.entryconfig(self.options.index(12), label="Store History in SQLite: Off")
+            messagebox.showinfo(title="Storing History Disabled",
+                                message="Data rows will not be stored in the database.")
+        else:
+            import nse_oca_history
+
+            self.history = True
+            self.options.entryconfig(self.options.index(12), label="Store History in SQLite: On")
+            messagebox.showinfo(title="Storing History Enabled",
+                                message=f"Data rows of every symbol and expiry will be stored in "
+                                        f"{nse_oca_history.database_path}. Query them across sessions with "
+                                        f"nse_oca_history.py.")
+
+        self.config_parser.set('main', 'history', f'{self.history}')
+        with open('NSE-OCA.ini', 'w') as f:
+            self.config_parser.write(f)
+
+    def store_history(self, analysis: 'nse_oca_engine.Analysis') -> None:
+        import nse_oca_history
+
+        if self.history_writer is None:
+            self.history_writer = nse_oca_history.HistoryWriter()
+        self.history_writer.write(self.index if self.option_mode == 'Index' else self.stock, self.expiry_date, self.sp,
+                                  analysis)
+        err: Optional[Exception] = self.history_writer.error()
+        if err is not None:
+            messagebox.showerror(title="Export Failed",
+                                 message=f"Failed to store data rows in {nse_oca_history.database_path}.\n{err}")
+
+    def close_history_writer(self) -> None:
+        history_writer: Optional[nse_oca_history.HistoryWriter] = self.history_writer
+        self.history_writer = None
+        if history_writer is not None:
+            history_writer.stop()
+
     # noinspection PyUnusedLocal
     def links(self, link: str, event: Optional[Event] = None) -> None:
 
@@ -873,12 +1154,226 @@ class Nse:
         updates.grid(row=5, column=0, columnspan=2, sticky=N + S + W + E)
         self.info.mainloop()
 
+    # noinspection PyUnusedLocal
+    def all_expiries(self, event: Optional[Event] = None) -> None:
+        import tksheet
+
+        if self.expiries_win is not None:
+            self.expiries_win.focus_force()
+            return
+        self.expiries_win = Toplevel(self.root)
+        self.expiries_win.title(f"All Expiries - {self.index if self.option_mode == 'Index' else self.stock}")
+        self.expiries_win.protocol('WM_DELETE_WINDOW', self.close_expiries)
+        window_width: int = self.expiries_win.winfo_reqwidth()
+        window_height: int = self.expiries_win.winfo_reqheight()
+        position_right: int = int(self.expiries_win.winfo_screenwidth() / 3 - window_width / 2)
+        position_down: int = int(self.expiries_win.winfo_screenheight() / 3 - window_height / 2)
+        self.expiries_win.geometry("975x400+{}+{}".format(position_right, position_down))
+        self.expiries_win.iconphoto(True, PhotoImage(file=self.icon_png_path)) if self.load_nse_icon else None
+        self.expiries_win.rowconfigure(0, weight=1)
+        self.expiries_win.columnconfigure(0, weight=1)
+        self.expiries_win.columnconfigure(1, weight=1)
+        self.expiries_win.columnconfigure(2, weight=1)
+
+        expiry_columns: Tuple[str, ...] = (
+            'Expiry Date', f'Call Sum\n({self.units_str})', f'Put Sum\n({self.units_str})',
+            f'Difference\n({self.units_str})', f'Call Boundary\n({self.units_str})',
+            f'Put Boundary\n({self.units_str})', 'Call ITM', 'Put ITM', 'PCR', 'Upper Boundary\nStrike Price',
+            'Lower Boundary\nStrike Price')
+        self.expiries_sheet: tksheet.Sheet = tksheet.Sheet(
+            self.expiries_win, column_width=85, align="center", headers=expiry_columns,
+            header_font=("TkDefaultFont", 9, "bold"), empty_horizontal=0, empty_vertical=20, header_height=35)
+        self.expiries_sheet.enable_bindings(
+            ("toggle_select", "drag_select", "column_select", "row_select", "column_width_resize",
+             "arrowkeys", "right_click_popup_menu", "rc_select", "copy", "select_all"))
+        self.expiries_sheet.grid(row=0, column=0, columnspan=3, sticky=N + S + W + E)
+        expiry_label: Label = Label(self.expiries_win, text=f"Expiry Date for Strike Price {self.sp}: ",
+                                    justify=LEFT)
+        expiry_label.grid(row=1, column=0, sticky=N + S + W)
+        self.expiries_var: StringVar = StringVar(self.expiries_win)
+        self.expiries_var.set(self.expiry_date)
+        self.expiries_menu: Combobox = Combobox(self.expiries_win, textvariable=self.expiries_var,
+                                                state="readonly")
+        self.expiries_menu.config(width=15)
+        self.expiries_menu.grid(row=1, column=1, sticky=N + S + E + W)
+        switch_btn: Button = Button(self.expiries_win, text="Switch", command=self.switch_expiry, width=10)
+        switch_btn.grid(row=1, column=2, sticky=N + S + E + W)
+        self.expiries_menu.bind('<Return>', self.switch_expiry)
+        self.update_expiries()
+
+    def update_expiries(self) -> None:
+        import nse_oca_engine
+
+        if self.expiries_win is None:
+            return
+        results: List[nse_oca_engine.ExpiryAnalysis] = nse_oca_engine.analyze_expiries(
+            self.chains, self.sp, self.round_factor)
+        rows: List[List[Union[str, float]]] = []
+        for result in results:
+            analysis: Optional[nse_oca_engine.Analysis] = result.analysis
+            rows.append([result.expiry_date] +
+                        (analysis.row()[2:] if analysis is not None else [""] * 7) +
+                        [result.boundaries.put_call_ratio, result.boundaries.max_call_oi_sp,
+                         result.boundaries.max_put_oi_sp])
+        self.expiries_sheet.set_sheet_data(rows, reset_col_positions=False)
+        self.expiries_sheet.dehighlight_all()
+        self.expiries_sheet.highlight_rows(
+            rows=[number for number, result in enumerate(results) if result.expiry_date == self.expiry_date],
+            bg="#90caf9")
+        self.expiries_sheet.refresh()
+        self.expiries_menu.config(values=tuple(result.expiry_date for result in results
+                                               if result.analysis is not None))
+
+    # noinspection PyUnusedLocal
+    def switch_expiry(self, event: Optional[Event] = None) -> None:
+        expiry_date: str = self.expiries_var.get()
+        if expiry_date in self.chains:
+            self.switch(expiry_date, self.sp, self.expiries_win)
+
+    def switch(self, expiry_date: str, sp: int, parent: Toplevel) -> None:
+        if expiry_date == self.expiry_date and sp == self.sp:
+            return
+        if len(self.table_rows) and not messagebox.askyesno(
+                "Switch", f"The table will be cleared and show {expiry_date} - {sp} from now on.\n"
+                          f"Export it first to keep the data.\nProceed?",
+                icon='warning', default='no', parent=parent):
+            return
+        self.expiry_date = expiry_date
+        self.sp = sp
+        self.config_parser.set('main', 'strike_price', f'{self.sp}')
+        with open('NSE-OCA.ini', 'w') as f:
+            self.config_parser.write(f)
+        self.first_run = True
+        self.root.title(f"NSE-Option-Chain-Analyzer - {self.index if self.option_mode == 'Index' else self.stock} "
+                        f"- {self.expiry_date} - {self.sp}")
+        self.table_rows.clear()
+        self.table_offset = None
+        self.render_table()
+        self.export_row(None) if self.live_export else None
+        if not self.stop and not self.fetch_pending:
+            self.process_snapshot(self.chains[expiry_date])
+        else:
+            self.update_expiries()
+            self.update_strikes()
+
+    def close_expiries(self) -> None:
+        expiries_win: Optional[Toplevel] = self.expiries_win
+        self.expiries_win = None
+        if expiries_win is not None:
+            expiries_win.destroy()
+
+    # noinspection PyUnusedLocal
+    def scan_strikes(self, event: Optional[Event] = None) -> None:
+        import tksheet
+
+        if self.strikes_win is not None:
+            self.strikes_win.focus_force()
+            return
+        self.strikes_win = Toplevel(self.root)
+        self.strikes_win.protocol('WM_DELETE_WINDOW', self.close_strikes)
+        window_width: int = self.strikes_win.winfo_reqwidth()
+        window_height: int = self.strikes_win.winfo_reqheight()
+        position_right: int = int(self.strikes_win.winfo_screenwidth() / 3 - window_width / 2)
+        position_down: int = int(self.strikes_win.winfo_screenheight() / 3 - window_height / 2)
+        self.strikes_win.geometry("1065x560+{}+{}".format(position_right, position_down))
+        self.strikes_win.iconphoto(True, PhotoImage(file=self.icon_png_path)) if self.load_nse_icon else None
+        self.strikes_win.rowconfigure(0, weight=1)
+        self.strikes_win.columnconfigure(0, weight=1)
+        self.strikes_win.columnconfigure(1, weight=1)
+        self.strikes_win.columnconfigure(2, weight=1)
+        self.strikes_win.columnconfigure(3, weight=1)
+        self.strikes_win.columnconfigure(4, weight=1)
+
+        strike_columns: Tuple[str, ...] = (
+            'Strike Price', f'Call Sum\n({self.units_str})', f'Put Sum\n({self.units_str})',
+            f'Difference\n({self.units_str})', f'Call Boundary\n({self.units_str})',
+            f'Put Boundary\n({self.units_str})', 'Call ITM', 'Put ITM', f'Call OI Change\n({self.units_str})',
+            'Call Build-up', f'Put OI Change\n({self.units_str})', 'Put Build-up')
+        self.strikes_sheet: tksheet.Sheet = tksheet.Sheet(
+            self.strikes_win, column_width=85, align="center", headers=strike_columns,
+            header_font=("TkDefaultFont", 9, "bold"), empty_horizontal=0, empty_vertical=20, header_height=35)
+        self.strikes_sheet.enable_bindings(
+            ("toggle_select", "drag_select", "column_select", "row_select", "column_width_resize",
+             "arrowkeys", "right_click_popup_menu", "rc_select", "copy", "select_all"))
+        self.strikes_sheet.grid(row=0, column=0, columnspan=5, sticky=N + S + W + E)
+        sort_label: Label = Label(self.strikes_win, text="Sort by: ", justify=LEFT)
+        sort_label.grid(row=1, column=0, sticky=N + S + W)
+        self.strikes_sort_var: StringVar = StringVar(self.strikes_win)
+        self.strikes_sort_var.set(self.strike_sort_columns[0])
+        strikes_sort_menu: Combobox = Combobox(self.strikes_win, textvariable=self.strikes_sort_var,
+                                               values=self.strike_sort_columns, state="readonly")
+        strikes_sort_menu.config(width=15)
+        strikes_sort_menu.grid(row=1, column=1, sticky=N + S + E + W)
+        strikes_sort_menu.bind("<<ComboboxSelected>>", lambda event: self.update_strikes())
+        strike_label: Label = Label(self.strikes_win, text="Strike Price: ", justify=LEFT)
+        strike_label.grid(row=1, column=2, sticky=N + S + E)
+        self.strikes_var: StringVar = StringVar(self.strikes_win)
+        self.strikes_var.set(str(self.sp))
+        self.strikes_menu: Combobox = Combobox(self.strikes_win, textvariable=self.strikes_var, state="readonly")
+        self.strikes_menu.config(width=15)
+        self.strikes_menu.grid(row=1, column=3, sticky=N + S + E + W)
+        switch_btn: Button = Button(self.strikes_win, text="Switch", command=self.switch_strike, width=10)
+        switch_btn.grid(row=1, column=4, sticky=N + S + E + W)
+        self.strikes_menu.bind('<Return>', self.switch_strike)
+        self.update_strikes()
+
+    def update_strikes(self) -> None:
+        import numpy
+
+        import nse_oca_engine
+
+        if self.strikes_win is None:
+            return
+        self.strikes_win.title(f"Scan Strikes - {self.index if self.option_mode == 'Index' else self.stock} "
+                               f"- {self.expiry_date}")
+        chain: Optional[nse_oca_chain.OptionChain] = self.chains.get(self.expiry_date)
+        if chain is None or len(chain) == 0:
+            return
+        table: nse_oca_engine.StrikeTable = nse_oca_engine.analyze_strikes(chain, self.round_factor)
+        sort_column: int = self.strike_sort_columns.index(self.strikes_sort_var.get())
+        order: Optional[numpy.ndarray] = None if sort_column == 0 else \
+            numpy.argsort(-table[sort_column], kind='stable')
+        rows: List[List[Union[str, float]]] = table.rows(order)
+        deltas: Optional[nse_oca_engine.StrikeDeltas] = self.deltas.get(self.expiry_date)
+        changes: Dict[float, List[Union[str, float]]] = {}
+        if deltas is not None:
+            changes = {strike_price: [round(call_oi / self.round_factor, 1), nse_oca_engine.buildup_labels[call],
+                                      round(put_oi / self.round_factor, 1), nse_oca_engine.buildup_labels[put]]
+                       for strike_price, call_oi, put_oi, call, put in zip(
+                           deltas.strike_price.tolist(), deltas.column('call_oi').tolist(),
+                           deltas.column('put_oi').tolist(), deltas.call_buildup.tolist(),
+                           deltas.put_buildup.tolist())}
+        for row in rows:
+            row.extend(changes.get(row[0], ["", "", "", ""]))
+        self.strikes_sheet.set_sheet_data(rows, reset_col_positions=False)
+        self.strikes_sheet.dehighlight_all()
+        self.strikes_sheet.highlight_rows(rows=[number for number, row in enumerate(rows) if row[0] == self.sp],
+                                          bg="#90caf9")
+        self.strikes_sheet.refresh()
+        self.strikes_menu.config(values=tuple(str(int(strike_price)) for strike_price in chain.strike_price.tolist()
+                                              if strike_price.is_integer()))
+
+    # noinspection PyUnusedLocal
+    def switch_strike(self, event: Optional[Event] = None) -> None:
+        sp: int = int(self.strikes_var.get())
+        chain: Optional[nse_oca_chain.OptionChain] = self.chains.get(self.expiry_date)
+        if chain is not None and chain.row(sp) is not None:
+            self.switch(self.expiry_date, sp, self.strikes_win)
+
+    def close_strikes(self) -> None:
+        strikes_win: Optional[Toplevel] = self.strikes_win
+        self.strikes_win = None
+        if strikes_win is not None:
+            strikes_win.destroy()
+
     def close_login(self) -> None:
-        self.session.close()
+        self.client.close() if self.client is not None else None
+        self.close_journal()
+        self.close_snapshot_writer()
+        self.close_export_sink()
+        self.close_history_writer()
         if self.logging:
             print('----------Quitting Program----------')
-        os.remove('.NSE-OCA.png') if os.path.isfile('.NSE-OCA.png') else None
-        os.remove('.NSE-OCA.ico') if os.path.isfile('.NSE-OCA.ico') else None
         self.login.destroy()
         sys.exit()
 
@@ -887,17 +1382,24 @@ class Nse:
         ask_quit: bool = messagebox.askyesno("Quit", "All unsaved data will be lost.\nProceed to quit?", icon='warning',
                                              default='no')
         if ask_quit:
-            self.session.close()
+            self.client.close() if self.client is not None else None
+            self.close_journal()
+            self.close_snapshot_writer()
+            self.close_export_sink()
+            self.close_history_writer()
+            self.table_rows.close()
             if self.logging:
+                self.log_render_times()
                 print('----------Quitting Program----------')
-            os.remove('.NSE-OCA.png') if os.path.isfile('.NSE-OCA.png') else None
-            os.remove('.NSE-OCA.ico') if os.path.isfile('.NSE-OCA.ico') else None
             self.root.destroy()
             sys.exit()
         elif not ask_quit:
             pass
 
     def main_win(self) -> None:
+        import tksheet
+        import nse_oca_rows
+
         self.root: Tk = Tk()
         self.root.focus_force()
         self.root.title("NSE-Option-Chain-Analyzer")
@@ -906,8 +1408,9 @@ class Nse:
         window_height: int = self.root.winfo_reqheight()
         position_right: int = int(self.root.winfo_screenwidth() / 3 - window_width / 2)
         position_down: int = int(self.root.winfo_screenheight() / 3 - window_height / 2)
-        self.root.geometry("815x560+{}+{}".format(position_right, position_down))
+        self.root.geometry("815x590+{}+{}".format(position_right, position_down))
         self.root.iconphoto(True, PhotoImage(file=self.icon_png_path)) if self.load_nse_icon else None
+        self.poll_icon(self.root)
         self.root.rowconfigure(0, weight=1)
         self.root.columnconfigure(0, weight=1)
 
@@ -917,7 +1420,7 @@ class Nse:
         self.options.add_command(label="Export Table to CSV", accelerator="(Ctrl+S)", command=self.export)
         self.options.add_command(label=f"Live Exporting to CSV: {'On' if self.live_export else 'Off'}",
                                  accelerator="(Ctrl+B)", command=self.toggle_live_export)
-        self.options.add_command(label=f"Dump Entire Option Chain to CSV: {'On' if self.save_oc else 'Off'}",
+        self.options.add_command(label=f"Store Entire Option Chain: {'On' if self.save_oc else 'Off'}",
                                  accelerator="(Ctrl+O)", command=self.toggle_save_oc)
         self.options.add_command(label=f"Notifications: {'On' if self.notifications else 'Off'}",
                                  accelerator="(Ctrl+N)", command=self.toggle_notifications,
@@ -926,11 +1429,19 @@ class Nse:
                                  accelerator="(Ctrl+K)", command=self.toggle_auto_stop)
         self.options.add_command(label=f"Warn Late Server Updates: {'On' if self.warn_late_update else 'Off'}",
                                  accelerator="(Ctrl+W)", command=self.toggle_warn_late_update)
+        self.options.add_command(label=f"Adaptive Refresh: {'On' if self.adaptive else 'Off'}",
+                                 accelerator="(Ctrl+D)", command=self.toggle_adaptive)
         self.options.add_separator()
         self.options.add_command(label=f"Auto Check for Updates: {'On' if self.update else 'Off'}",
                                  accelerator="(Ctrl+U)", command=self.toggle_updates)
         self.options.add_command(label=f"Debug Logging: {'On' if self.logging else 'Off'}", accelerator="(Ctrl+L)",
                                  command=self.log)
+        self.options.add_command(label=f"Capture Raw Responses: {'On' if self.capture else 'Off'}",
+                                 accelerator="(Ctrl+R)", command=self.toggle_capture)
+        self.options.add_command(label=f"Store History in SQLite: {'On' if self.history else 'Off'}",
+                                 accelerator="(Ctrl+H)", command=self.toggle_history)
+        self.options.add_command(label="All Expiries", accelerator="(Ctrl+E)", command=self.all_expiries)
+        self.options.add_command(label="Scan Strikes", accelerator="(Ctrl+T)", command=self.scan_strikes)
         self.options.add_command(label="About", accelerator="(Ctrl+M)", command=self.about)
         self.options.add_command(label="Quit", accelerator="(Ctrl+Q)", command=self.close_main)
         menubar.add_cascade(label="Menu", menu=self.options)
@@ -943,8 +1454,13 @@ class Nse:
         self.root.bind('<Control-n>', self.toggle_notifications) if is_windows_10 else None
         self.root.bind('<Control-k>', self.toggle_auto_stop)
         self.root.bind('<Control-w>', self.toggle_warn_late_update)
+        self.root.bind('<Control-d>', self.toggle_adaptive)
         self.root.bind('<Control-u>', self.toggle_updates)
         self.root.bind('<Control-l>', self.log)
+        self.root.bind('<Control-r>', self.toggle_capture)
+        self.root.bind('<Control-h>', self.toggle_history)
+        self.root.bind('<Control-e>', self.all_expiries)
+        self.root.bind('<Control-t>', self.scan_strikes)
         self.root.bind('<Control-m>', self.about)
         self.root.bind('<Control-q>', self.close_main)
 
@@ -955,11 +1471,24 @@ class Nse:
 
         self.sheet: tksheet.Sheet = tksheet.Sheet(top_frame, column_width=85, align="center",
                                                   headers=self.output_columns, header_font=("TkDefaultFont", 9, "bold"),
-                                                  empty_horizontal=0, empty_vertical=20, header_height=35)
+                                                  empty_horizontal=0, empty_vertical=0, header_height=35,
+                                                  show_y_scrollbar=False)
         self.sheet.enable_bindings(
             ("toggle_select", "drag_select", "column_select", "row_select", "column_width_resize",
              "arrowkeys", "right_click_popup_menu", "rc_select", "copy", "select_all"))
         self.sheet.grid(row=0, column=0, sticky=N + S + W + E)
+        self.sheet.bind("<MouseWheel>", self.wheel_table)
+        self.sheet.bind("<Button-4>", self.wheel_table)
+        self.sheet.bind("<Button-5>", self.wheel_table)
+        self.table_scroll: Scrollbar = Scrollbar(top_frame, orient=VERTICAL, command=self.scroll_table)
+        self.table_scroll.grid(row=0, column=1, sticky=N + S)
+        self.table_rows: nse_oca_rows.RowBuffer = nse_oca_rows.RowBuffer()
+        self.table_offset: Optional[int] = None
+        self.table_page: int = 1
+        self.table_shown: Tuple[int, int] = (0, 0)
+        self.previous_analysis: Optional[nse_oca_engine.Analysis] = None
+        self.render_times: Deque[float] = collections.deque(maxlen=1000)
+        top_frame.bind("<Configure>", self.resize_table)
 
         bottom_frame: Frame = Frame(self.root)
         bottom_frame.rowconfigure(0, weight=1)
@@ -968,6 +1497,7 @@ class Nse:
         bottom_frame.rowconfigure(3, weight=1)
         bottom_frame.rowconfigure(4, weight=1)
         bottom_frame.rowconfigure(5, weight=1)
+        bottom_frame.rowconfigure(6, weight=1)
         bottom_frame.columnconfigure(0, weight=1)
         bottom_frame.columnconfigure(1, weight=1)
         bottom_frame.columnconfigure(2, weight=1)
@@ -1053,65 +1583,86 @@ class Nse:
         put_itm_label.grid(row=5, column=4, columnspan=2, sticky=N + S + W + E)
         self.put_itm_val: Label = Label(bottom_frame, text="", relief=RIDGE)
         self.put_itm_val.grid(row=5, column=6, columnspan=2, sticky=N + S + W + E)
-
-        self.root.after(100, self.main)
+        max_pain_label: Label = Label(bottom_frame, text="Max Pain:", relief=RIDGE, font=("TkDefaultFont", 9, "bold"))
+        max_pain_label.grid(row=6, column=0, columnspan=2, sticky=N + S + W + E)
+        self.max_pain_val: Label = Label(bottom_frame, text="", relief=RIDGE)
+        self.max_pain_val.grid(row=6, column=2, columnspan=2, sticky=N + S + W + E)
+        oi_levels_label: Label = Label(bottom_frame, text="OI Support - Resistance:", relief=RIDGE,
+                                       font=("TkDefaultFont", 9, "bold"))
+        oi_levels_label.grid(row=6, column=4, columnspan=2, sticky=N + S + W + E)
+        self.oi_levels_val: Label = Label(bottom_frame, text="", relief=RIDGE)
+        self.oi_levels_val.grid(row=6, column=6, columnspan=2, sticky=N + S + W + E)
+        self.value_labels: Dict[str, Label] = {
+            'max_call_oi': self.max_call_oi_val, 'max_call_oi_sp': self.max_call_oi_sp_val,
+            'max_call_oi_2': self.max_call_oi_2_val, 'max_call_oi_sp_2': self.max_call_oi_sp_2_val,
+            'max_put_oi': self.max_put_oi_val, 'max_put_oi_sp': self.max_put_oi_sp_val,
+            'max_put_oi_2': self.max_put_oi_2_val, 'max_put_oi_sp_2': self.max_put_oi_sp_2_val,
+            'max_pain': self.max_pain_val, 'oi_levels': self.oi_levels_val, 'oi': self.oi_val, 'pcr': self.pcr_val,
+            'call_itm': self.call_itm_val, 'put_itm': self.put_itm_val, 'call_exits': self.call_exits_val,
+            'put_exits': self.put_exits_val}
+
+        self.main_after = self.root.after(100, self.main_tick)
 
         self.root.mainloop()
 
-    def get_dataframe(self) -> Optional[Tuple[pandas.DataFrame, str, float]]:
-        try:
-            response: Optional[requests.Response]
-            json_data: Any
-            response, json_data = self.get_data()
-        except TypeError:
+    def start_fetch_worker(self) -> None:
+        import nse_oca_engine
+
+        if self.fetch_worker is not None and self.fetch_worker.is_alive():
             return
+        if self.delta_engine is None:
+            self.delta_engine = nse_oca_engine.DeltaEngine()
+        self.fetch_worker = threading.Thread(target=self.fetch_loop, name="NSE-OCA-Fetch", daemon=True)
+        self.fetch_worker.start()
+
+    def fetch_loop(self) -> None:
+        while True:
+            self.fetch_requests.get()
+            status: str = 'ok'
+            chains: Optional[Dict[str, nse_oca_chain.OptionChain]] = None
+            deltas: Dict[str, nse_oca_engine.StrikeDeltas] = {}
+            try:
+                data: Optional[Tuple[Optional[requests.Response], Any]] = self.get_data_refresh()
+                if data is None:
+                    status = 'failed'
+                else:
+                    response: Optional[requests.Response]
+                    json_data: Any
+                    response, json_data = data
+                    if self.is_stale(json_data):
+                        status = 'stale'
+                    else:
+                        chains = self.get_option_chains(response, json_data)
+                        if chains is None:
+                            status = 'failed'
+                        else:
+                            self.last_timestamp = json_data['records']['timestamp']
+                            deltas = self.delta_engine.update_all(chains)
+            except Exception as err:
+                print(err, sys.exc_info()[0], "22")
+                status = 'failed'
+            self.snapshots.put((status, chains, deltas))
+
+    def is_stale(self, json_data: Any) -> bool:
+        timestamp: str = json_data['records']['timestamp']
+        if timestamp == self.last_timestamp:
+            self.skipped_ticks += 1
+            print(f"Skipped unchanged snapshot {timestamp} ({self.skipped_ticks} skipped)")
+            return True
+        return False
+
+    def get_option_chains(self, response: Optional['requests.Response'],
+                          json_data: Any) -> Optional[Dict[str, 'nse_oca_chain.OptionChain']]:
+        import nse_oca_chain
+
         if response is None or json_data is None:
             return
 
-        pandas.set_option('display.max_rows', None)
-        pandas.set_option('display.max_columns', None)
-        pandas.set_option('display.width', 400)
-
-        df: pandas.DataFrame = pandas.read_json(response.text)
-        df = df.transpose()
-
-        ce_values: List[dict] = [data['CE'] for data in json_data['records']['data'] if
-                                 "CE" in data and str(data['expiryDate'].lower() == str(self.expiry_date).lower())]
-        pe_values: List[dict] = [data['PE'] for data in json_data['records']['data'] if
-                                 "PE" in data and str(data['expiryDate'].lower() == str(self.expiry_date).lower())]
-        points: float = pe_values[0]['underlyingValue']
-        if points == 0:
-            for item in pe_values:
-                if item['underlyingValue'] != 0:
-                    points = item['underlyingValue']
-                    break
-        ce_data: pandas.DataFrame = pandas.DataFrame(ce_values)
-        pe_data: pandas.DataFrame = pandas.DataFrame(pe_values)
-        ce_data_f: pandas.DataFrame = ce_data.loc[ce_data['expiryDate'] == self.expiry_date]
-        pe_data_f: pandas.DataFrame = pe_data.loc[pe_data['expiryDate'] == self.expiry_date]
-        if ce_data_f.empty:
-            messagebox.showerror(title="Error",
-                                 message="Invalid Expiry Date.\nPlease restart and enter a new Expiry Date.")
-            self.change_state()
-            return
-        columns_ce: List[str] = ['openInterest', 'changeinOpenInterest', 'totalTradedVolume', 'impliedVolatility',
-                                 'lastPrice',
-                                 'change', 'bidQty', 'bidprice', 'askPrice', 'askQty', 'strikePrice']
-        columns_pe: List[str] = ['strikePrice', 'bidQty', 'bidprice', 'askPrice', 'askQty', 'change', 'lastPrice',
-                                 'impliedVolatility', 'totalTradedVolume', 'changeinOpenInterest', 'openInterest']
-        ce_data_f = ce_data_f[columns_ce]
-        pe_data_f = pe_data_f[columns_pe]
-        merged_inner: pandas.DataFrame = pandas.merge(left=ce_data_f, right=pe_data_f, left_on='strikePrice',
-                                                      right_on='strikePrice')
-        merged_inner.columns = ['Open Interest', 'Change in Open Interest', 'Traded Volume', 'Implied Volatility',
-                                'Last Traded Price', 'Net Change', 'Bid Quantity', 'Bid Price', 'Ask Price',
-                                'Ask Quantity', 'Strike Price', 'Bid Quantity', 'Bid Price', 'Ask Price',
-                                'Ask Quantity', 'Net Change', 'Last Traded Price', 'Implied Volatility',
-                                'Traded Volume', 'Change in Open Interest', 'Open Interest']
-        current_time: str = df['timestamp']['records']
-        return merged_inner, current_time, points
-
-    def set_values(self) -> None:
+        return nse_oca_chain.extract_chains(json_data)
+
+    def set_values(self, analysis: 'nse_oca_engine.Analysis') -> None:
+        import nse_oca_engine
+
         if self.first_run:
             self.root.title(f"NSE-Option-Chain-Analyzer - {self.index if self.option_mode == 'Index' else self.stock} "
                             f"- {self.expiry_date} - {self.sp}")
@@ -1121,75 +1672,54 @@ class Nse:
         self.old_max_put_oi_sp: float
         self.old_max_put_oi_sp_2: float
 
-        self.max_call_oi_val.config(text=self.max_call_oi)
-        self.max_call_oi_sp_val.config(text=self.max_call_oi_sp)
-        self.max_call_oi_2_val.config(text=self.max_call_oi_2)
-        self.max_call_oi_sp_2_val.config(text=self.max_call_oi_sp_2)
-        self.max_put_oi_val.config(text=self.max_put_oi)
-        self.max_put_oi_sp_val.config(text=self.max_put_oi_sp)
-        self.max_put_oi_2_val.config(text=self.max_put_oi_2)
-        self.max_put_oi_sp_2_val.config(text=self.max_put_oi_sp_2)
-
-        if self.first_run or self.old_max_call_oi_sp == self.max_call_oi_sp:
-            self.old_max_call_oi_sp = self.max_call_oi_sp
+        boundaries: nse_oca_engine.OiBoundaries = analysis.boundaries
+
+        if self.first_run or self.old_max_call_oi_sp == boundaries.max_call_oi_sp:
+            self.old_max_call_oi_sp = boundaries.max_call_oi_sp
         else:
             if self.notifications:
                 self.toaster.show_toast("Upper Boundary Strike Price changed "
                                         f"for {self.index if self.option_mode == 'Index' else self.stock}",
-                                        f"Changed from {self.old_max_call_oi_sp} to {self.max_call_oi_sp}",
+                                        f"Changed from {self.old_max_call_oi_sp} to {boundaries.max_call_oi_sp}",
                                         duration=4, threaded=True,
                                         icon_path=self.icon_ico_path if self.load_nse_icon else None)
-            self.old_max_call_oi_sp = self.max_call_oi_sp
+            self.old_max_call_oi_sp = boundaries.max_call_oi_sp
 
-        if self.first_run or self.old_max_call_oi_sp_2 == self.max_call_oi_sp_2:
-            self.old_max_call_oi_sp_2 = self.max_call_oi_sp_2
+        if self.first_run or self.old_max_call_oi_sp_2 == boundaries.max_call_oi_sp_2:
+            self.old_max_call_oi_sp_2 = boundaries.max_call_oi_sp_2
         else:
             if self.notifications:
                 self.toaster.show_toast("Upper Boundary Strike Price 2 changed "
                                         f"for {self.index if self.option_mode == 'Index' else self.stock}",
-                                        f"Changed from {self.old_max_call_oi_sp_2} to {self.max_call_oi_sp_2}",
+                                        f"Changed from {self.old_max_call_oi_sp_2} to {boundaries.max_call_oi_sp_2}",
                                         duration=4, threaded=True,
                                         icon_path=self.icon_ico_path if self.load_nse_icon else None)
-            self.old_max_call_oi_sp_2 = self.max_call_oi_sp_2
+            self.old_max_call_oi_sp_2 = boundaries.max_call_oi_sp_2
 
-        if self.first_run or self.old_max_put_oi_sp == self.max_put_oi_sp:
-            self.old_max_put_oi_sp = self.max_put_oi_sp
+        if self.first_run or self.old_max_put_oi_sp == boundaries.max_put_oi_sp:
+            self.old_max_put_oi_sp = boundaries.max_put_oi_sp
         else:
             if self.notifications:
                 self.toaster.show_toast("Lower Boundary Strike Price changed "
                                         f"for {self.index if self.option_mode == 'Index' else self.stock}",
-                                        f"Changed from {self.old_max_put_oi_sp} to {self.max_put_oi_sp}",
+                                        f"Changed from {self.old_max_put_oi_sp} to {boundaries.max_put_oi_sp}",
                                         duration=4, threaded=True,
                                         icon_path=self.icon_ico_path if self.load_nse_icon else None)
-            self.old_max_put_oi_sp = self.max_put_oi_sp
+            self.old_max_put_oi_sp = boundaries.max_put_oi_sp
 
-        if self.first_run or self.old_max_put_oi_sp_2 == self.max_put_oi_sp_2:
-            self.old_max_put_oi_sp_2 = self.max_put_oi_sp_2
+        if self.first_run or self.old_max_put_oi_sp_2 == boundaries.max_put_oi_sp_2:
+            self.old_max_put_oi_sp_2 = boundaries.max_put_oi_sp_2
         else:
             if self.notifications:
                 self.toaster.show_toast("Lower Boundary Strike Price 2 changed "
                                         f"for {self.index if self.option_mode == 'Index' else self.stock}",
-                                        f"Changed from {self.old_max_put_oi_sp_2} to {self.max_put_oi_sp_2}",
+                                        f"Changed from {self.old_max_put_oi_sp_2} to {boundaries.max_put_oi_sp_2}",
                                         duration=4, threaded=True,
                                         icon_path=self.icon_ico_path if self.load_nse_icon else None)
-            self.old_max_put_oi_sp_2 = self.max_put_oi_sp_2
-
-        red: str = "#e53935"
-        green: str = "#00e676"
-        default: str = "SystemButtonFace" if is_windows else "#d9d9d9"
-
-        bg: str
+            self.old_max_put_oi_sp_2 = boundaries.max_put_oi_sp_2
 
         self.old_oi_label: str
-        oi_label: str
-
-        if self.call_sum >= self.put_sum:
-            oi_label = "Bearish"
-            bg = red
-        else:
-            oi_label = "Bullish"
-            bg = green
-        self.oi_val.config(text=oi_label, bg=bg)
+        oi_label: str = analysis.oi_label
 
         if self.first_run or self.old_oi_label == oi_label:
             self.old_oi_label = oi_label
@@ -1202,33 +1732,8 @@ class Nse:
                                         icon_path=self.icon_ico_path if self.load_nse_icon else None)
             self.old_oi_label = oi_label
 
-        if self.put_call_ratio >= 1:
-            self.pcr_val.config(text=self.put_call_ratio, bg=green)
-        else:
-            self.pcr_val.config(text=self.put_call_ratio, bg=red)
-
-        def set_itm_labels(call_change: float, put_change: float) -> str:
-            label: str = "No"
-            if put_change > call_change:
-                if put_change >= 0:
-                    if call_change <= 0:
-                        label = "Yes"
-                    elif put_change / call_change > 1.5:
-                        label = "Yes"
-                else:
-                    if put_change / call_change < 0.5:
-                        label = "Yes"
-            if call_change <= 0:
-                label = "Yes"
-            return label
-
         self.old_call_label: str
-        call: str = set_itm_labels(call_change=self.p5, put_change=self.p4)
-
-        if call == "No":
-            self.call_itm_val.config(text="No", bg=default)
-        else:
-            self.call_itm_val.config(text="Yes", bg=green)
+        call: str = analysis.call_itm_label
 
         if self.first_run or self.old_call_label == call:
             self.old_call_label = call
@@ -1242,12 +1747,7 @@ class Nse:
             self.old_call_label = call
 
         self.old_put_label: str
-        put: str = set_itm_labels(call_change=self.p7, put_change=self.p6)
-
-        if put == "No":
-            self.put_itm_val.config(text="No", bg=default)
-        else:
-            self.put_itm_val.config(text="Yes", bg=red)
+        put: str = analysis.put_itm_label
 
         if self.first_run or self.old_put_label == put:
             self.old_put_label = put
@@ -1261,19 +1761,8 @@ class Nse:
             self.old_put_label = put
 
         self.old_call_exits_label: str
-        call_exits_label: str
-
-        if self.call_boundary <= 0:
-            call_exits_label = "Yes"
-            bg = green
-        elif self.call_sum <= 0:
-            call_exits_label = "Yes"
-            bg = green
-        else:
-            call_exits_label = "No"
-            bg = default
+        call_exits_label: str = analysis.call_exits_label
 
-        self.call_exits_val.config(text=call_exits_label, bg=bg)
         if self.first_run or self.old_call_exits_label == call_exits_label:
             self.old_call_exits_label = call_exits_label
         else:
@@ -1286,19 +1775,8 @@ class Nse:
             self.old_call_exits_label = call_exits_label
 
         self.old_put_exits_label: str
-        put_exits_label: str
-
-        if self.put_boundary <= 0:
-            put_exits_label = "Yes"
-            bg = red
-        elif self.put_sum <= 0:
-            put_exits_label = "Yes"
-            bg = red
-        else:
-            put_exits_label = "No"
-            bg = default
+        put_exits_label: str = analysis.put_exits_label
 
-        self.put_exits_val.config(text=put_exits_label, bg=bg)
         if self.first_run or self.old_put_exits_label == put_exits_label:
             self.old_put_exits_label = put_exits_label
         else:
@@ -1310,106 +1788,138 @@ class Nse:
                                         icon_path=self.icon_ico_path if self.load_nse_icon else None)
             self.old_put_exits_label = put_exits_label
 
-        output_values: List[Union[str, float]] = [self.str_current_time, self.points, self.call_sum,
-                                                  self.put_sum, self.difference,
-                                                  self.call_boundary, self.put_boundary, self.call_itm,
-                                                  self.put_itm]
-        self.sheet.insert_row(values=output_values)
+        output_values: List[Union[str, float]] = analysis.row()
         if self.live_export:
             self.export_row(output_values)
 
-        last_row: int = self.sheet.get_total_rows() - 1
+        start: float = time.perf_counter()
+        diff: nse_oca_engine.RenderDiff = nse_oca_engine.render_diff(
+            None if self.first_run else self.previous_analysis, analysis)
+        for key, (text, color) in diff.labels.items():
+            if color:
+                self.value_labels[key].config(text=text, bg=palette[color])
+            else:
+                self.value_labels[key].config(text=text)
+        self.table_rows.append(output_values, diff.colors)
+        self.render_table()
+        render_time: float = time.perf_counter() - start
+        self.render_times.append(render_time)
+        self.previous_analysis = analysis
+        if self.logging:
+            print(f"Rendered {analysis.timestamp} in {render_time * 1000:.1f} ms"
+                  f"{' (over the frame budget)' if render_time > frame_budget else ''}")
 
-        self.old_points: float
-        if self.first_run or self.points == self.old_points:
-            self.old_points = self.points
-        elif self.points > self.old_points:
-            self.sheet.highlight_cells(row=last_row, column=1, bg=green)
-            self.old_points = self.points
-        else:
-            self.sheet.highlight_cells(row=last_row, column=1, bg=red)
-            self.old_points = self.points
-        self.old_call_sum: float
-        if self.first_run or self.old_call_sum == self.call_sum:
-            self.old_call_sum = self.call_sum
-        elif self.call_sum > self.old_call_sum:
-            self.sheet.highlight_cells(row=last_row, column=2, bg=red)
-            self.old_call_sum = self.call_sum
-        else:
-            self.sheet.highlight_cells(row=last_row, column=2, bg=green)
-            self.old_call_sum = self.call_sum
-        self.old_put_sum: float
-        if self.first_run or self.old_put_sum == self.put_sum:
-            self.old_put_sum = self.put_sum
-        elif self.put_sum > self.old_put_sum:
-            self.sheet.highlight_cells(row=last_row, column=3, bg=green)
-            self.old_put_sum = self.put_sum
-        else:
-            self.sheet.highlight_cells(row=last_row, column=3, bg=red)
-            self.old_put_sum = self.put_sum
-        self.old_difference: float
-        if self.first_run or self.old_difference == self.difference:
-            self.old_difference = self.difference
-        elif self.difference > self.old_difference:
-            self.sheet.highlight_cells(row=last_row, column=4, bg=red)
-            self.old_difference = self.difference
-        else:
-            self.sheet.highlight_cells(row=last_row, column=4, bg=green)
-            self.old_difference = self.difference
-        self.old_call_boundary: float
-        if self.first_run or self.old_call_boundary == self.call_boundary:
-            self.old_call_boundary = self.call_boundary
-        elif self.call_boundary > self.old_call_boundary:
-            self.sheet.highlight_cells(row=last_row, column=5, bg=red)
-            self.old_call_boundary = self.call_boundary
-        else:
-            self.sheet.highlight_cells(row=last_row, column=5, bg=green)
-            self.old_call_boundary = self.call_boundary
-        self.old_put_boundary: float
-        if self.first_run or self.old_put_boundary == self.put_boundary:
-            self.old_put_boundary = self.put_boundary
-        elif self.put_boundary > self.old_put_boundary:
-            self.sheet.highlight_cells(row=last_row, column=6, bg=green)
-            self.old_put_boundary = self.put_boundary
-        else:
-            self.sheet.highlight_cells(row=last_row, column=6, bg=red)
-            self.old_put_boundary = self.put_boundary
-        self.old_call_itm: float
-        if self.first_run or self.old_call_itm == self.call_itm:
-            self.old_call_itm = self.call_itm
-        elif self.call_itm > self.old_call_itm:
-            self.sheet.highlight_cells(row=last_row, column=7, bg=green)
-            self.old_call_itm = self.call_itm
-        else:
-            self.sheet.highlight_cells(row=last_row, column=7, bg=red)
-            self.old_call_itm = self.call_itm
-        self.old_put_itm: float
-        if self.first_run or self.old_put_itm == self.put_itm:
-            self.old_put_itm = self.put_itm
-        elif self.put_itm > self.old_put_itm:
-            self.sheet.highlight_cells(row=last_row, column=8, bg=red)
-            self.old_put_itm = self.put_itm
+    def log_render_times(self) -> None:
+        if not self.render_times:
+            return
+        render_times: List[float] = sorted(self.render_times)
+        print(f"Render time of the last {len(render_times)} ticks: "
+              f"median {render_times[len(render_times) // 2] * 1000:.1f} ms, max {render_times[-1] * 1000:.1f} ms, "
+              f"{sum(render_time > frame_budget for render_time in render_times)} over the frame budget of "
+              f"{frame_budget * 1000:.1f} ms")
+
+    def render_table(self) -> None:
+        total: int = len(self.table_rows)
+        last_offset: int = max(0, total - self.table_page)
+        offset: int = last_offset if self.table_offset is None else min(self.table_offset, last_offset)
+        stop: int = min(total, offset + self.table_page)
+        shown_offset: int
+        shown_stop: int
+        shown_offset, shown_stop = self.table_shown
+        if shown_stop > total or stop <= shown_offset or offset >= shown_stop:
+            self.sheet.set_sheet_data(self.table_rows.rows(offset, stop), reset_col_positions=False, redraw=False,
+                                      reset_highlights=True)
+            self.highlight_table_rows(offset, offset, stop)
         else:
-            self.sheet.highlight_cells(row=last_row, column=8, bg=green)
-            self.old_put_itm = self.put_itm
-
-        if self.sheet.get_yview()[1] >= 0.9:
-            self.sheet.see(last_row)
-            self.sheet.set_yview(1)
+            for _ in range(shown_offset, offset):
+                self.sheet.delete_row(0, redraw=False)
+            for _ in range(stop, shown_stop):
+                self.sheet.delete_row(self.sheet.total_rows() - 1, redraw=False)
+            for row, values in enumerate(self.table_rows.rows(offset, shown_offset)):
+                self.sheet.insert_row(values, idx=row)
+            self.highlight_table_rows(offset, offset, shown_offset)
+            for values in self.table_rows.rows(shown_stop, stop):
+                self.sheet.insert_row(values)
+            self.highlight_table_rows(offset, shown_stop, stop)
+        if (offset, stop) != self.table_shown:
+            self.sheet.row_index([f"{row + 1}" for row in range(offset, stop)])
+            self.table_shown = (offset, stop)
+        self.table_scroll.set(offset / total if total else 0, stop / total if total else 1)
         self.sheet.refresh()
 
+    def highlight_table_rows(self, offset: int, start: int, stop: int) -> None:
+        for row, colors in enumerate(self.table_rows.colors(start, stop).tolist(), start=start - offset):
+            for column, color in enumerate(colors, start=1):
+                if color:
+                    self.sheet.highlight_cells(row=row, column=column, bg=palette[color])
+
+    def scroll_table(self, *args: str) -> None:
+        last_offset: int = max(0, len(self.table_rows) - self.table_page)
+        offset: int = last_offset if self.table_offset is None else self.table_offset
+        if args[0] == "moveto":
+            offset = int(float(args[1]) * len(self.table_rows))
+        elif args[0] == "scroll":
+            offset += int(args[1]) * (self.table_page if args[2] == "pages" else 1)
+        self.table_offset = None if offset >= last_offset else max(0, offset)
+        self.render_table()
+
+    def wheel_table(self, event: Event) -> None:
+        self.scroll_table("scroll", "-3" if event.num == 4 or event.delta > 0 else "3", "units")
+
+    def resize_table(self, event: Event) -> None:
+        table_page: int = max(1, (event.height - self.sheet.default_header_height() - 20) //
+                              self.sheet.default_row_height())
+        if table_page != self.table_page:
+            self.table_page = table_page
+            self.render_table()
+
+    def main_tick(self) -> None:
+        self.main_after = None
+        self.main()
+
     def main(self) -> None:
-        if self.stop:
+        if self.stop or self.fetch_pending or self.main_after is not None:
             return
 
+        self.start_fetch_worker()
+        self.fetch_pending = True
+        self.fetch_requests.put(self.expiry_date)
+        self.root.after(self.poll_interval, self.poll_snapshots)
+
+    def poll_snapshots(self) -> None:
         try:
-            entire_oc: pandas.DataFrame
-            current_time: str
-            self.points: float
-            entire_oc, current_time, self.points = self.get_dataframe()
-        except TypeError:
-            self.root.after((self.seconds * 1000), self.main)
+            status: str
+            chains: Optional[Dict[str, nse_oca_chain.OptionChain]]
+            deltas: Dict[str, nse_oca_engine.StrikeDeltas]
+            status, chains, deltas = self.snapshots.get_nowait()
+        except queue.Empty:
+            self.root.after(self.poll_interval, self.poll_snapshots)
             return
+        self.fetch_pending = False
+
+        if self.stop:
+            return
+        if status != 'ok':
+            self.scheduler.record(self.last_timestamp if status == 'stale' else None)
+            self.schedule_main()
+            return
+        self.chains = chains
+        self.deltas = deltas
+        snapshot: Optional[nse_oca_chain.OptionChain] = chains.get(self.expiry_date)
+        if snapshot is None or len(snapshot) == 0:
+            self.update_expiries()
+            messagebox.showerror(title="Error",
+                                 message="Invalid Expiry Date.\nPlease select another Expiry Date from All Expiries "
+                                         "or restart.")
+            self.change_state()
+            return
+        self.scheduler.record(snapshot.timestamp)
+        self.process_snapshot(snapshot)
+
+    def process_snapshot(self, entire_oc: 'nse_oca_chain.OptionChain') -> None:
+        import nse_oca_engine
+
+        current_time: str = entire_oc.timestamp
 
         self.str_current_time: str = current_time.split(" ")[1]
         current_date: datetime.date = datetime.datetime.strptime(current_time.split(" ")[0], '%d-%b-%Y').date()
@@ -1436,158 +1946,33 @@ class Nse:
                                      messagebox.showinfo(title=title, message=message)))
                 self.previous_time = current_time
             else:
-                self.root.after((self.seconds * 1000), self.main)
+                self.schedule_main()
                 return
 
-        call_oi_list: List[int] = []
-        for i in range(len(entire_oc)):
-            int_call_oi: int = int(entire_oc.iloc[i, [0]][0])
-            call_oi_list.append(int_call_oi)
-        call_oi_index: int = call_oi_list.index(max(call_oi_list))
-        self.max_call_oi: float = round(max(call_oi_list) / self.round_factor, 1)
-        self.max_call_oi_sp: float = float(entire_oc.iloc[call_oi_index]['Strike Price'])
-
-        put_oi_list: List[int] = []
-        for i in range(len(entire_oc)):
-            int_put_oi: int = int(entire_oc.iloc[i, [20]][0])
-            put_oi_list.append(int_put_oi)
-        put_oi_index: int = put_oi_list.index(max(put_oi_list))
-        self.max_put_oi: float = round(max(put_oi_list) / self.round_factor, 1)
-        self.max_put_oi_sp: float = float(entire_oc.iloc[put_oi_index]['Strike Price'])
-
-        sp_range_list: List[float] = []
-        for i in range(put_oi_index, call_oi_index + 1):
-            sp_range_list.append(float(entire_oc.iloc[i]['Strike Price']))
-
-        self.max_call_oi_2: float
-        self.max_call_oi_sp_2: float
-        self.max_put_oi_2: float
-        self.max_put_oi_sp_2: float
-        if self.max_call_oi_sp == self.max_put_oi_sp:
-            self.max_call_oi_2 = self.max_call_oi
-            self.max_call_oi_sp_2 = self.max_call_oi_sp
-            self.max_put_oi_2 = self.max_put_oi
-            self.max_put_oi_sp_2 = self.max_put_oi_sp
-        elif len(sp_range_list) == 2:
-            self.max_call_oi_2 = round((entire_oc[entire_oc['Strike Price'] == self.max_put_oi_sp].iloc[0, 0]) /
-                                       self.round_factor, 1)
-            self.max_call_oi_sp_2 = self.max_put_oi_sp
-            self.max_put_oi_2 = round((entire_oc[entire_oc['Strike Price'] == self.max_call_oi_sp].iloc[0, 20]) /
-                                      self.round_factor, 1)
-            self.max_put_oi_sp_2 = self.max_call_oi_sp
-        else:
-            call_oi_list_2: List[int] = []
-            for i in range(put_oi_index, call_oi_index):
-                int_call_oi_2: int = int(entire_oc.iloc[i, [0]][0])
-                call_oi_list_2.append(int_call_oi_2)
-            call_oi_index_2: int = put_oi_index + call_oi_list_2.index(max(call_oi_list_2))
-            self.max_call_oi_2 = round(max(call_oi_list_2) / self.round_factor, 1)
-            self.max_call_oi_sp_2 = float(entire_oc.iloc[call_oi_index_2]['Strike Price'])
-
-            put_oi_list_2: List[int] = []
-            for i in range(put_oi_index + 1, call_oi_index + 1):
-                int_put_oi_2: int = int(entire_oc.iloc[i, [20]][0])
-                put_oi_list_2.append(int_put_oi_2)
-            put_oi_index_2: int = put_oi_index + 1 + put_oi_list_2.index(max(put_oi_list_2))
-            self.max_put_oi_2 = round(max(put_oi_list_2) / self.round_factor, 1)
-            self.max_put_oi_sp_2 = float(entire_oc.iloc[put_oi_index_2]['Strike Price'])
-
-        total_call_oi: int = sum(call_oi_list)
-        total_put_oi: int = sum(put_oi_list)
-        self.put_call_ratio: float
-        try:
-            self.put_call_ratio = round(total_put_oi / total_call_oi, 2)
-        except ZeroDivisionError:
-            self.put_call_ratio = 0
-
-        try:
-            index: int = int(entire_oc[entire_oc['Strike Price'] == self.sp].index.tolist()[0])
-        except IndexError as err:
-            print(err, sys.exc_info()[0], "10")
+        analysis: Optional[nse_oca_engine.Analysis] = nse_oca_engine.analyze(entire_oc, self.sp, self.round_factor)
+        if analysis is None:
+            print(f"Strike Price {self.sp} not found in the option chain", "10")
             messagebox.showerror(title="Error",
                                  message="Incorrect Strike Price.\nPlease enter correct Strike Price.")
             self.root.destroy()
             return
 
-        a: pandas.DataFrame = entire_oc[['Change in Open Interest']][entire_oc['Strike Price'] == self.sp]
-        b1: pandas.Series = a.iloc[:, 0]
-        c1: int = int(b1.get(index))
-        b2: pandas.Series = entire_oc.iloc[:, 1]
-        c2: int = int(b2.get((index + 1), 'Change in Open Interest'))
-        b3: pandas.Series = entire_oc.iloc[:, 1]
-        c3: int = int(b3.get((index + 2), 'Change in Open Interest'))
-        if isinstance(c2, str):
-            c2 = 0
-        if isinstance(c3, str):
-            c3 = 0
-        self.call_sum: float = round((c1 + c2 + c3) / self.round_factor, 1)
-        if self.call_sum == -0:
-            self.call_sum = 0.0
-        self.call_boundary: float = round(c3 / self.round_factor, 1)
-
-        o1: pandas.Series = a.iloc[:, 1]
-        p1: int = int(o1.get(index))
-        o2: pandas.Series = entire_oc.iloc[:, 19]
-        p2: int = int(o2.get((index + 1), 'Change in Open Interest'))
-        p3: int = int(o2.get((index + 2), 'Change in Open Interest'))
-        self.p4: int = int(o2.get((index + 4), 'Change in Open Interest'))
-        o3: pandas.Series = entire_oc.iloc[:, 1]
-        self.p5: int = int(o3.get((index + 4), 'Change in Open Interest'))
-        self.p6: int = int(o3.get((index - 2), 'Change in Open Interest'))
-        self.p7: int = int(o2.get((index - 2), 'Change in Open Interest'))
-        if isinstance(p2, str):
-            p2 = 0
-        if isinstance(p3, str):
-            p3 = 0
-        if isinstance(self.p4, str):
-            self.p4 = 0
-        if isinstance(self.p5, str):
-            self.p5 = 0
-        self.put_sum: float = round((p1 + p2 + p3) / self.round_factor, 1)
-        self.put_boundary: float = round(p1 / self.round_factor, 1)
-        self.difference: float = round(self.call_sum - self.put_sum, 1)
-        self.call_itm: float
-        if self.p5 == 0:
-            self.call_itm = 0.0
-        else:
-            self.call_itm = round(self.p4 / self.p5, 1)
-            if self.call_itm == -0:
-                self.call_itm = 0.0
-        if isinstance(self.p6, str):
-            self.p6 = 0
-        if isinstance(self.p7, str):
-            self.p7 = 0
-        self.put_itm: float
-        if self.p7 == 0:
-            self.put_itm = 0.0
-        else:
-            self.put_itm = round(self.p6 / self.p7, 1)
-            if self.put_itm == -0:
-                self.put_itm = 0.0
-
         if self.stop:
             return
 
-        self.set_values()
+        self.set_values(analysis)
+        self.update_expiries()
+        self.update_strikes()
 
         if self.save_oc:
-            try:
-                entire_oc.to_csv(
-                    f"NSE-OCA-{self.index if self.option_mode == 'Index' else self.stock}-{self.expiry_date}-Full.csv",
-                    index=False)
-            except PermissionError as err:
-                print(err, sys.exc_info()[0], "11")
-                messagebox.showerror(title="Export Failed",
-                                     message=f"Failed to access NSE-OCA-"
-                                             f"{self.index if self.option_mode == 'Index' else self.stock}-"
-                                             f"{self.expiry_date}-Full.csv.\n"
-                                             f"Permission Denied. Try closing any apps using it.")
-            except Exception as err:
-                print(err, sys.exc_info()[0], "16")
+            self.store_snapshot(entire_oc)
+        if self.history:
+            self.store_history(analysis)
 
         if self.first_run:
-            if self.update:
+            if self.update and not self.updates_checked:
                 self.check_for_updates()
+                self.updates_checked = True
             self.first_run = False
         if self.str_current_time == '15:30:00' and not self.stop and self.auto_stop \
                 and self.previous_date == datetime.datetime.strptime(time.strftime("%d-%b-%Y", time.localtime()),
@@ -1596,15 +1981,28 @@ class Nse:
             self.options.entryconfig(self.options.index(0), label="Start")
             messagebox.showinfo(title="Market Closed", message="Retrieving new data has been stopped.")
             return
-        self.root.after((self.seconds * 1000), self.main)
+        self.schedule_main()
         return
 
+    def schedule_main(self) -> None:
+        if self.main_after is not None:
+            return
+        self.main_after = self.root.after(int(self.scheduler.delay() * 1000), self.main_tick)
+
     @staticmethod
-    def create_instance() -> None:
+    def create_instance(startup_time: bool = False) -> None:
         master_window: Tk = Tk()
-        Nse(master_window)
+        Nse(master_window, startup_time)
         master_window.mainloop()
 
+    @staticmethod
+    def create_headless_instance(args: Optional[List[str]] = None) -> None:
+        import nse_oca_headless
+        nse_oca_headless.main(args)
+
 
 if __name__ == '__main__':
-    Nse.create_instance()
+    if '--headless' in sys.argv[1:]:
+        Nse.create_headless_instance([arg for arg in sys.argv[1:] if arg != '--headless'])
+    else:
+        Nse.create_instance('--startup-time' in sys.argv[1:])
@@ -0,0 +1,132 @@
+import gzip
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+import zlib
+from typing import Optional, Iterator, Tuple, Any
+
+import nse_oca_chain
+
+record_header: struct.Struct = struct.Struct('<dHI')
+gzip_magic: bytes = b'\x1f\x8b\x08'
+
+
+def journal_path(symbol: str, day: Optional[str] = None) -> str:
+    return f"NSE-OCA-{symbol}-{day if day is not None else time.strftime('%Y-%m-%d')}.journal.gz"
+
+
+class Journal:
+    def __init__(self, path: str) -> None:
+        self.path: str = path
+        self.lock: threading.Lock = threading.Lock()
+        self.file: gzip.GzipFile = gzip.open(path, 'ab')
+        self.records: int = 0
+
+    def append(self, symbol: str, content: bytes, fetched_at: Optional[float] = None) -> None:
+        encoded_symbol: bytes = symbol.encode()
+        with self.lock:
+            self.file.write(record_header.pack(fetched_at if fetched_at is not None else time.time(),
+                                               len(encoded_symbol), len(content)))
+            self.file.write(encoded_symbol)
+            self.file.write(content)
+            self.file.flush(zlib.Z_SYNC_FLUSH)
+            self.records += 1
+
+    def close(self) -> None:
+        with self.lock:
+            self.file.close()
+
+
+def read_members(path: str, chunk_size: int = 1 << 16) -> Iterator[Tuple[int, bytes]]:
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as raw:
+            start: int = 0
+            member: int = 0
+            while 0 <= start < len(raw):
+                decompressor: Any = zlib.decompressobj(16 + zlib.MAX_WBITS)
+                position: int = start
+                try:
+                    while not decompressor.eof and position < len(raw):
+                        stop: int = raw.find(gzip_magic, position + 1, position + chunk_size)
+                        stop = stop if stop >= 0 else min(position + chunk_size, len(raw))
+                        data: bytes = decompressor.decompress(raw[position:stop])
+                        position = stop
+                        if data:
+                            yield member, data
+                except zlib.error as err:
+                    print(err, sys.exc_info()[0], "31")
+                    start = position if position > start and raw[position:position + len(gzip_magic)] == gzip_magic \
+                        else raw.find(gzip_magic, position + 1)
+                else:
+                    start = position - len(decompressor.unused_data) if decompressor.eof else -1
+                member += 1
+
+
+def read_journal(path: str) -> Iterator[Tuple[float, str, bytes]]:
+    current: int = 0
+    buffer: bytes = b''
+    for member, data in read_members(path):
+        if member != current:
+            current = member
+            buffer = b''
+        buffer += data
+        offset: int = 0
+        while len(buffer) - offset >= record_header.size:
+            fetched_at: float
+            symbol_length: int
+            content_length: int
+            fetched_at, symbol_length, content_length = record_header.unpack_from(buffer, offset)
+            symbol_start: int = offset + record_header.size
+            content_start: int = symbol_start + symbol_length
+            end: int = content_start + content_length
+            if end > len(buffer):
+                break
+            yield fetched_at, buffer[symbol_start:content_start].decode(), buffer[content_start:end]
+            offset = end
+        buffer = buffer[offset:]
+
+
+class ReplaySource:
+    def __init__(self, path: str, speed: float = 0.0) -> None:
+        self.path: str = path
+        self.speed: float = speed
+        self.records: Iterator[Tuple[float, str, bytes]] = read_journal(path)
+        self.first_fetched_at: Optional[float] = None
+        self.started_at: float = 0.0
+        self.finished: bool = False
+        self.replayed: int = 0
+
+    def next_content(self, symbol: Optional[str] = None) -> Optional[bytes]:
+        for fetched_at, record_symbol, content in self.records:
+            if symbol is not None and record_symbol != symbol:
+                continue
+            if self.first_fetched_at is None:
+                self.first_fetched_at = fetched_at
+                self.started_at = time.monotonic()
+            elif self.speed > 0:
+                delay: float = (fetched_at - self.first_fetched_at) / self.speed - \
+                               (time.monotonic() - self.started_at)
+                if delay > 0:
+                    time.sleep(delay)
+            self.replayed += 1
+            return content
+        self.finished = True
+        return
+
+    def fetch(self, symbol: Optional[str] = None, option_mode: Optional[str] = None) -> Optional[Tuple[None, Any]]:
+        content: Optional[bytes] = self.next_content(symbol)
+        if content is None:
+            return
+        try:
+            return None, nse_oca_chain.json_loads(content)
+        except Exception as err:
+            print(err, sys.exc_info()[0], "32")
+            return
+
+    def close(self) -> None:
+        self.finished = True
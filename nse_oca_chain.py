@@ -0,0 +1,216 @@
+import argparse
+import datetime
+import io
+import json
+import operator
+import random
+import time
+from typing import Optional, List, Dict, Tuple, NamedTuple, Sequence, Any
+
+import numpy
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def json_loads(content: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def json_dumps(data: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(',', ':')).encode()
+
+
+class OptionChain(NamedTuple):
+    expiry_date: str
+    timestamp: str
+    underlying_value: float
+    strike_price: numpy.ndarray
+    call_oi: numpy.ndarray
+    call_change_oi: numpy.ndarray
+    call_volume: numpy.ndarray
+    call_iv: numpy.ndarray
+    call_ltp: numpy.ndarray
+    call_net_change: numpy.ndarray
+    call_bid_qty: numpy.ndarray
+    call_bid_price: numpy.ndarray
+    call_ask_price: numpy.ndarray
+    call_ask_qty: numpy.ndarray
+    put_oi: numpy.ndarray
+    put_change_oi: numpy.ndarray
+    put_volume: numpy.ndarray
+    put_iv: numpy.ndarray
+    put_ltp: numpy.ndarray
+    put_net_change: numpy.ndarray
+    put_bid_qty: numpy.ndarray
+    put_bid_price: numpy.ndarray
+    put_ask_price: numpy.ndarray
+    put_ask_qty: numpy.ndarray
+    strike_rows: Dict[float, int]
+
+    def __len__(self) -> int:
+        return len(self.strike_price)
+
+    def row(self, strike_price: float) -> Optional[int]:
+        return self.strike_rows.get(strike_price)
+
+    def rows(self) -> List[List[Any]]:
+        return [list(row) for row in zip(*(getattr(self, field).tolist() for field in csv_fields))]
+
+
+int_keys: Tuple[str, ...] = ('openInterest', 'changeinOpenInterest', 'totalTradedVolume', 'bidQty', 'askQty')
+float_keys: Tuple[str, ...] = ('impliedVolatility', 'lastPrice', 'change', 'bidprice', 'askPrice')
+int_fields: Tuple[str, ...] = ('oi', 'change_oi', 'volume', 'bid_qty', 'ask_qty')
+float_fields: Tuple[str, ...] = ('iv', 'ltp', 'net_change', 'bid_price', 'ask_price')
+int_values: operator.itemgetter = operator.itemgetter(*int_keys)
+float_values: operator.itemgetter = operator.itemgetter(*float_keys)
+csv_fields: Tuple[str, ...] = (
+    'call_oi', 'call_change_oi', 'call_volume', 'call_iv', 'call_ltp', 'call_net_change', 'call_bid_qty',
+    'call_bid_price', 'call_ask_price', 'call_ask_qty', 'strike_price', 'put_bid_qty', 'put_bid_price',
+    'put_ask_price', 'put_ask_qty', 'put_net_change', 'put_ltp', 'put_iv', 'put_volume', 'put_change_oi', 'put_oi')
+csv_headers: Tuple[str, ...] = (
+    'Open Interest', 'Change in Open Interest', 'Traded Volume', 'Implied Volatility', 'Last Traded Price',
+    'Net Change', 'Bid Quantity', 'Bid Price', 'Ask Price', 'Ask Quantity', 'Strike Price', 'Bid Quantity',
+    'Bid Price', 'Ask Price', 'Ask Quantity', 'Net Change', 'Last Traded Price', 'Implied Volatility',
+    'Traded Volume', 'Change in Open Interest', 'Open Interest')
+
+
+def extract_chains(json_data: Any, expiry_dates: Optional[Sequence[str]] = None) -> Dict[str, OptionChain]:
+    records: Dict[str, Any] = json_data['records']
+    data: List[Dict[str, Any]] = records['data']
+    codes: Dict[str, int] = {expiry_date: number for number, expiry_date in
+                             enumerate(expiry_dates if expiry_dates is not None else records['expiryDates'])}
+    expiries: numpy.ndarray = numpy.empty(len(data), dtype=numpy.int64)
+    strikes: numpy.ndarray = numpy.empty(len(data), dtype=numpy.float64)
+    ints: numpy.ndarray = numpy.empty((len(data), 2 * len(int_keys)), dtype=numpy.int64)
+    floats: numpy.ndarray = numpy.empty((len(data), 2 * len(float_keys)), dtype=numpy.float64)
+    underlying_values: Dict[int, float] = {}
+    count: int = 0
+    for row in data:
+        code: Optional[int] = codes.get(row['expiryDate'])
+        if code is None:
+            if expiry_dates is not None:
+                continue
+            code = codes[row['expiryDate']] = len(codes)
+        call: Optional[Dict[str, Any]] = row.get('CE')
+        put: Optional[Dict[str, Any]] = row.get('PE')
+        if call is None or put is None:
+            continue
+        expiries[count] = code
+        strikes[count] = row['strikePrice']
+        ints[count] = int_values(call) + int_values(put)
+        floats[count] = float_values(call) + float_values(put)
+        if not underlying_values.get(code):
+            underlying_values[code] = put['underlyingValue'] or call['underlyingValue']
+        count += 1
+
+    order: numpy.ndarray = numpy.lexsort((strikes[:count], expiries[:count]))
+    expiries = expiries[:count][order]
+    strikes = strikes[:count][order]
+    ints = ints[:count][order]
+    floats = floats[:count][order]
+    bounds: numpy.ndarray = numpy.searchsorted(expiries, numpy.arange(len(codes) + 1))
+    chains: Dict[str, OptionChain] = {}
+    for expiry_date, code in codes.items():
+        rows: slice = slice(int(bounds[code]), int(bounds[code + 1]))
+        columns: Dict[str, Any] = {'strike_price': strikes[rows],
+                                   'strike_rows': dict(zip(strikes[rows].tolist(), range(rows.stop - rows.start)))}
+        for side_number, side in enumerate(('call', 'put')):
+            for number, field in enumerate(int_fields):
+                columns[f'{side}_{field}'] = ints[rows, side_number * len(int_fields) + number]
+            for number, field in enumerate(float_fields):
+                columns[f'{side}_{field}'] = floats[rows, side_number * len(float_fields) + number]
+        chains[expiry_date] = OptionChain(
+            expiry_date=expiry_date, timestamp=records['timestamp'],
+            underlying_value=float(underlying_values.get(code) or records.get('underlyingValue', 0.0)), **columns)
+    return chains
+
+
+def extract_chain(json_data: Any, expiry_date: str) -> OptionChain:
+    return extract_chains(json_data, (expiry_date,))[expiry_date]
+
+
+def synthetic_payload(symbol: str = 'NIFTY', underlying_value: float = 18000.0, strikes: int = 120,
+                      expiries: int = 18, step: float = 50.0, timestamp: Optional[datetime.datetime] = None,
+                      seed: Optional[int] = None) -> Dict[str, Any]:
+    rng: random.Random = random.Random(seed)
+    timestamp = timestamp if timestamp is not None else datetime.datetime.now().replace(microsecond=0)
+    first_expiry: datetime.date = timestamp.date() + datetime.timedelta(days=(3 - timestamp.weekday()) % 7)
+    expiry_dates: List[str] = [(first_expiry + datetime.timedelta(weeks=week)).strftime('%d-%b-%Y')
+                               for week in range(expiries)]
+    atm: float = round(underlying_value / step) * step
+    strike_prices: List[float] = [atm + (i - strikes // 2) * step for i in range(strikes)]
+
+    def option(strike_price: float, expiry_date: str, option_type: str) -> Dict[str, Any]:
+        intrinsic: float = max(0.0, underlying_value - strike_price) if option_type == 'CE' else \
+            max(0.0, strike_price - underlying_value)
+        last_price: float = round(intrinsic + rng.uniform(0.05, 2.0) * step, 2)
+        return {
+            'strikePrice': strike_price, 'expiryDate': expiry_date, 'underlying': symbol,
+            'identifier': f'OPTIDX{symbol}{expiry_date}{option_type}{strike_price:.2f}',
+            'openInterest': rng.randint(0, 200000), 'changeinOpenInterest': rng.randint(-50000, 50000),
+            'pchangeinOpenInterest': round(rng.uniform(-100, 100), 2),
+            'totalTradedVolume': rng.randint(0, 2000000), 'impliedVolatility': round(rng.uniform(0, 40), 2),
+            'lastPrice': last_price, 'change': round(rng.uniform(-50, 50), 2),
+            'pChange': round(rng.uniform(-50, 50), 2), 'totalBuyQuantity': rng.randint(0, 500000),
+            'totalSellQuantity': rng.randint(0, 500000), 'bidQty': rng.randint(0, 5000),
+            'bidprice': round(last_price * 0.99, 2), 'askQty': rng.randint(0, 5000),
+            'askPrice': round(last_price * 1.01, 2), 'underlyingValue': underlying_value}
+
+    data: List[Dict[str, Any]] = []
+    for strike_price in strike_prices:
+        for expiry_date in expiry_dates:
+            row: Dict[str, Any] = {'strikePrice': strike_price, 'expiryDate': expiry_date}
+            for option_type in ('CE', 'PE'):
+                row[option_type] = option(strike_price, expiry_date, option_type)
+            data.append(row)
+    return {
+        'records': {'expiryDates': expiry_dates, 'data': data,
+                    'timestamp': timestamp.strftime('%d-%b-%Y %H:%M:%S'), 'underlyingValue': underlying_value,
+                    'strikePrices': strike_prices},
+        'filtered': {'data': [row for row in data if row['expiryDate'] == expiry_dates[0]]}}
+
+
+def benchmark() -> None:
+    import pandas
+
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description="Compare option chain decode paths.")
+    parser.add_argument('--file', help="Raw option chain response to decode instead of a synthetic one")
+    parser.add_argument('--strikes', type=int, default=120)
+    parser.add_argument('--expiries', type=int, default=18)
+    parser.add_argument('--repeat', type=int, default=20)
+    args: argparse.Namespace = parser.parse_args()
+    if args.file:
+        with open(args.file, 'rb') as f:
+            content: bytes = f.read()
+    else:
+        content = json_dumps(synthetic_payload(strikes=args.strikes, expiries=args.expiries, seed=0))
+    text: str = content.decode()
+
+    start: float = time.perf_counter()
+    for _ in range(args.repeat):
+        json_data: Any = json.loads(text)
+        df: pandas.DataFrame = pandas.read_json(io.StringIO(text)).transpose()
+        current_time: str = df['timestamp']['records']
+    double_decode: float = (time.perf_counter() - start) / args.repeat
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        json_data = json_loads(content)
+        current_time = json_data['records']['timestamp']
+    single_decode: float = (time.perf_counter() - start) / args.repeat
+
+    print(f"Payload: {len(content) / 1024:.0f} KB, {len(json_data['records']['data'])} rows, "
+          f"decoder: {'orjson' if orjson is not None else 'json'}, last timestamp: {current_time}")
+    print(f"json + pandas.read_json: {double_decode * 1000:.1f} ms per tick")
+    print(f"single decode:           {single_decode * 1000:.1f} ms per tick")
+    print(f"saved:                   {(double_decode - single_decode) * 1000:.1f} ms per tick")
+
+
+if __name__ == '__main__':
+    benchmark()
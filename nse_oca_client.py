@@ -0,0 +1,189 @@
+import json
+import os
+import random
+import sys
+import threading
+import time
+from typing import Optional, List, Dict, Tuple, Any
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import nse_oca_chain
+from nse_oca_capture import Journal
+
+
+class NseClient:
+    base_url: str = "https://www.nseindia.com"
+    headers: Dict[str, str] = {
+        'user-agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, '
+                      'like Gecko) Chrome/80.0.3987.149 Safari/537.36',
+        'accept-language': 'en,gu;q=0.9,hi;q=0.8',
+        'accept-encoding': 'gzip, deflate, br'}
+
+    def __init__(self, pool_size: int = 10, timeout: float = 5, journal: Optional[Journal] = None,
+                 base_url: Optional[str] = None, cookie_file: Optional[str] = ".NSE-OCA-cookies.json",
+                 cookie_ttl: float = 300, renew_before: float = 30, renew_fraction: float = 0.25, retries: int = 3,
+                 backoff: float = 0.5, max_backoff: float = 4) -> None:
+        self.base_url: str = (base_url or self.base_url).rstrip('/')
+        self.url_oc: str = f"{self.base_url}/option-chain"
+        self.url_index: str = f"{self.base_url}/api/option-chain-indices?symbol="
+        self.url_stock: str = f"{self.base_url}/api/option-chain-equities?symbol="
+        self.timeout: float = timeout
+        self.journal: Optional[Journal] = journal
+        self.cookie_file: Optional[str] = cookie_file
+        self.cookie_ttl: float = cookie_ttl
+        self.renew_before: float = renew_before
+        self.renew_fraction: float = renew_fraction
+        self.retries: int = retries
+        self.backoff: float = backoff
+        self.max_backoff: float = max_backoff
+        self.session: requests.Session = requests.Session()
+        adapter: HTTPAdapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.cookies: Dict[str, str] = {}
+        self.cookies_expire_at: float = 0.0
+        self.cookies_lifetime: float = cookie_ttl
+        self.cookies_generation: int = 0
+        self.handshake_lock: threading.Lock = threading.Lock()
+        self.lock: threading.Lock = threading.Lock()
+        self.renewing: bool = False
+        self.requests: int = 0
+        self.handshakes: int = 0
+        self.renewals: int = 0
+        self.reconnects: int = 0
+        self.load_cookies()
+
+    def url(self, symbol: str, option_mode: str) -> str:
+        return self.url_index + symbol if option_mode == 'Index' else self.url_stock + symbol
+
+    def load_cookies(self) -> None:
+        if self.cookie_file is None or not os.path.isfile(self.cookie_file):
+            return
+        try:
+            with open(self.cookie_file) as f:
+                saved: Dict[str, Any] = json.load(f).get(self.base_url, {})
+        except (OSError, ValueError, AttributeError) as err:
+            print(err, sys.exc_info()[0], "34")
+            return
+        if saved.get('expires', 0) > time.time() + self.renew_before:
+            self.cookies = dict(saved['cookies'])
+            self.cookies_expire_at = saved['expires']
+            self.cookies_lifetime = self.cookies_expire_at - time.time()
+
+    def save_cookies(self) -> None:
+        if self.cookie_file is None:
+            return
+        try:
+            with open(self.cookie_file) as f:
+                saved: Dict[str, Any] = json.load(f)
+        except (OSError, ValueError):
+            saved = {}
+        saved[self.base_url] = {'cookies': self.cookies, 'expires': self.cookies_expire_at}
+        try:
+            with open(f"{self.cookie_file}.tmp", 'w') as f:
+                json.dump(saved, f)
+            os.replace(f"{self.cookie_file}.tmp", self.cookie_file)
+        except OSError as err:
+            print(err, sys.exc_info()[0], "35")
+
+    def handshake(self, generation: Optional[int] = None) -> None:
+        with self.handshake_lock:
+            if generation is not None and generation != self.cookies_generation:
+                return
+            request: requests.Response = self.session.get(self.url_oc, headers=self.headers, timeout=self.timeout)
+            with self.lock:
+                self.handshakes += 1
+            expires: List[int] = [cookie.expires for cookie in request.cookies if cookie.expires]
+            self.cookies = dict(request.cookies)
+            self.cookies_expire_at = min(expires) if expires else time.time() + self.cookie_ttl
+            self.cookies_lifetime = self.cookies_expire_at - time.time()
+            self.cookies_generation += 1
+        self.save_cookies()
+
+    def renew_window(self) -> float:
+        return min(self.renew_before, max(0.0, self.cookies_lifetime * self.renew_fraction))
+
+    def start_renewal(self) -> bool:
+        with self.lock:
+            if self.renewing:
+                return False
+            self.renewing = True
+            return True
+
+    def renew(self, generation: int) -> None:
+        try:
+            self.handshake(generation)
+            with self.lock:
+                self.renewals += 1
+        except Exception as err:
+            print(err, sys.exc_info()[0], "36")
+        finally:
+            with self.lock:
+                self.renewing = False
+
+    def get(self, symbol: str, option_mode: str) -> Optional[requests.Response]:
+        url: str = self.url(symbol, option_mode)
+        expired: int = self.cookies_generation
+        remaining: float = self.cookies_expire_at - time.time()
+        if not self.cookies or remaining <= 0:
+            try:
+                self.handshake(expired)
+            except Exception as err:
+                print(err, sys.exc_info()[0], "24")
+        elif remaining < self.renew_window() and self.start_renewal():
+            threading.Thread(target=self.renew, args=(expired,), name="NSE-OCA-Renew", daemon=True).start()
+
+        unauthorized: bool = False
+        for attempt in range(self.retries + 1):
+            generation: int = self.cookies_generation
+            with self.lock:
+                self.requests += 1
+            try:
+                response: requests.Response = self.session.get(url, headers=self.headers, timeout=self.timeout,
+                                                               cookies=self.cookies)
+            except Exception as err:
+                print(err, sys.exc_info()[0], "23")
+                with self.lock:
+                    self.reconnects += 1
+                if attempt < self.retries:
+                    time.sleep(random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt)))
+                continue
+            if response.status_code >= 500:
+                print(response, "23")
+                if attempt < self.retries:
+                    time.sleep(random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt)))
+                continue
+            if response.status_code != 401:
+                return response
+            if unauthorized:
+                return
+            unauthorized = True
+            try:
+                self.handshake(generation)
+            except Exception as err:
+                print(err, sys.exc_info()[0], "24")
+                return
+        return
+
+    def fetch(self, symbol: str, option_mode: str) -> Optional[Tuple[requests.Response, Any]]:
+        response: Optional[requests.Response] = self.get(symbol, option_mode)
+        if response is None:
+            return
+        try:
+            json_data: Any = nse_oca_chain.json_loads(response.content)
+        except Exception as err:
+            print(response)
+            print(err, sys.exc_info()[0], "25")
+            return
+        if not json_data:
+            return
+        if self.journal is not None:
+            self.journal.append(symbol, response.content)
+        return response, json_data
+
+    def close(self) -> None:
+        self.session.close()
+        if self.journal is not None:
+            self.journal.close()
@@ -0,0 +1,378 @@
+from typing import Optional, List, Dict, Tuple, Union, NamedTuple
+
+import numpy
+
+from nse_oca_chain import OptionChain
+
+
+class OiBoundaries(NamedTuple):
+    max_call_oi: float
+    max_call_oi_sp: float
+    max_put_oi: float
+    max_put_oi_sp: float
+    max_call_oi_2: float
+    max_call_oi_sp_2: float
+    max_put_oi_2: float
+    max_put_oi_sp_2: float
+    put_call_ratio: float
+
+
+def oi_boundaries(chain: OptionChain, round_factor: int) -> OiBoundaries:
+    call_oi: numpy.ndarray = chain.call_oi
+    put_oi: numpy.ndarray = chain.put_oi
+    strike_price: numpy.ndarray = chain.strike_price
+    call_oi_index: int = int(numpy.argmax(call_oi))
+    put_oi_index: int = int(numpy.argmax(put_oi))
+    max_call_oi: float = round(int(call_oi[call_oi_index]) / round_factor, 1)
+    max_call_oi_sp: float = float(strike_price[call_oi_index])
+    max_put_oi: float = round(int(put_oi[put_oi_index]) / round_factor, 1)
+    max_put_oi_sp: float = float(strike_price[put_oi_index])
+
+    call_oi_index_2: int
+    put_oi_index_2: int
+    if call_oi_index <= put_oi_index:
+        call_oi_index_2, put_oi_index_2 = call_oi_index, put_oi_index
+    elif call_oi_index - put_oi_index == 1:
+        call_oi_index_2, put_oi_index_2 = put_oi_index, call_oi_index
+    else:
+        call_oi_index_2 = put_oi_index + int(numpy.argmax(call_oi[put_oi_index:call_oi_index]))
+        put_oi_index_2 = put_oi_index + 1 + int(numpy.argmax(put_oi[put_oi_index + 1:call_oi_index + 1]))
+
+    total_call_oi: int = int(call_oi.sum())
+    total_put_oi: int = int(put_oi.sum())
+    put_call_ratio: float = round(total_put_oi / total_call_oi, 2) if total_call_oi != 0 else 0
+
+    return OiBoundaries(max_call_oi=max_call_oi, max_call_oi_sp=max_call_oi_sp,
+                        max_put_oi=max_put_oi, max_put_oi_sp=max_put_oi_sp,
+                        max_call_oi_2=round(int(call_oi[call_oi_index_2]) / round_factor, 1),
+                        max_call_oi_sp_2=float(strike_price[call_oi_index_2]),
+                        max_put_oi_2=round(int(put_oi[put_oi_index_2]) / round_factor, 1),
+                        max_put_oi_sp_2=float(strike_price[put_oi_index_2]),
+                        put_call_ratio=put_call_ratio)
+
+
+class OiLevels(NamedTuple):
+    max_pain: float
+    support: float
+    resistance: float
+
+
+def max_pain(chain: OptionChain) -> float:
+    if len(chain) == 0:
+        return 0.0
+    strike_price: numpy.ndarray = chain.strike_price
+    call_oi: numpy.ndarray = chain.call_oi.astype(numpy.float64)
+    put_oi: numpy.ndarray = chain.put_oi.astype(numpy.float64)
+    call_value: numpy.ndarray = call_oi * strike_price
+    put_value: numpy.ndarray = put_oi * strike_price
+    call_pain: numpy.ndarray = strike_price * numpy.cumsum(call_oi) - numpy.cumsum(call_value)
+    put_pain: numpy.ndarray = (put_value.sum() - numpy.cumsum(put_value)) - \
+        strike_price * (put_oi.sum() - numpy.cumsum(put_oi))
+    return float(strike_price[int(numpy.argmin(call_pain + put_pain))])
+
+
+def weighted_strike(strike_price: numpy.ndarray, oi: numpy.ndarray) -> float:
+    total: int = int(oi.sum())
+    return round(float(numpy.dot(strike_price, oi)) / total, 2) if total > 0 else 0.0
+
+
+def oi_levels(chain: OptionChain) -> OiLevels:
+    below: numpy.ndarray = chain.strike_price <= chain.underlying_value
+    above: numpy.ndarray = chain.strike_price >= chain.underlying_value
+    return OiLevels(max_pain=max_pain(chain),
+                    support=weighted_strike(chain.strike_price[below], chain.put_oi[below]),
+                    resistance=weighted_strike(chain.strike_price[above], chain.call_oi[above]))
+
+
+class Analysis(NamedTuple):
+    timestamp: str
+    time: str
+    points: float
+    call_sum: float
+    put_sum: float
+    difference: float
+    call_boundary: float
+    put_boundary: float
+    call_itm: float
+    put_itm: float
+    boundaries: OiBoundaries
+    levels: OiLevels
+    oi_label: str
+    call_itm_label: str
+    put_itm_label: str
+    call_exits_label: str
+    put_exits_label: str
+
+    def row(self) -> List[Union[str, float]]:
+        return [self.time, self.points, self.call_sum, self.put_sum, self.difference,
+                self.call_boundary, self.put_boundary, self.call_itm, self.put_itm]
+
+
+none, green, red, default = 0, 1, 2, 3
+row_rising_colors: Tuple[int, ...] = (green, red, green, red, red, green, green, red)
+
+
+class RenderDiff(NamedTuple):
+    labels: Dict[str, Tuple[str, int]]
+    colors: List[int]
+
+
+def row_colors(previous: Optional[Analysis], analysis: Analysis) -> List[int]:
+    if previous is None:
+        return [none] * len(row_rising_colors)
+    return [rising if value > old else 3 - rising if value < old else none
+            for rising, old, value in zip(row_rising_colors, previous.row()[1:], analysis.row()[1:])]
+
+
+def label_values(analysis: Analysis) -> Dict[str, Tuple[str, int]]:
+    boundaries: OiBoundaries = analysis.boundaries
+    levels: OiLevels = analysis.levels
+    return {'max_call_oi': (f"{boundaries.max_call_oi}", none),
+            'max_call_oi_sp': (f"{boundaries.max_call_oi_sp}", none),
+            'max_call_oi_2': (f"{boundaries.max_call_oi_2}", none),
+            'max_call_oi_sp_2': (f"{boundaries.max_call_oi_sp_2}", none),
+            'max_put_oi': (f"{boundaries.max_put_oi}", none),
+            'max_put_oi_sp': (f"{boundaries.max_put_oi_sp}", none),
+            'max_put_oi_2': (f"{boundaries.max_put_oi_2}", none),
+            'max_put_oi_sp_2': (f"{boundaries.max_put_oi_sp_2}", none),
+            'max_pain': (f"{levels.max_pain}", none),
+            'oi_levels': (f"{levels.support} - {levels.resistance}", none),
+            'oi': (analysis.oi_label, red if analysis.oi_label == "Bearish" else green),
+            'pcr': (f"{boundaries.put_call_ratio}", green if boundaries.put_call_ratio >= 1 else red),
+            'call_itm': ("No", default) if analysis.call_itm_label == "No" else ("Yes", green),
+            'put_itm': ("No", default) if analysis.put_itm_label == "No" else ("Yes", red),
+            'call_exits': (analysis.call_exits_label, green if analysis.call_exits_label == "Yes" else default),
+            'put_exits': (analysis.put_exits_label, red if analysis.put_exits_label == "Yes" else default)}
+
+
+def render_diff(previous: Optional[Analysis], analysis: Analysis) -> RenderDiff:
+    labels: Dict[str, Tuple[str, int]] = label_values(analysis)
+    if previous is not None:
+        old_labels: Dict[str, Tuple[str, int]] = label_values(previous)
+        labels = {key: value for key, value in labels.items() if old_labels[key] != value}
+    return RenderDiff(labels=labels, colors=row_colors(previous, analysis))
+
+
+def itm_label(call_change: float, put_change: float) -> str:
+    label: str = "No"
+    if put_change > call_change:
+        if put_change >= 0:
+            if call_change <= 0:
+                label = "Yes"
+            elif put_change / call_change > 1.5:
+                label = "Yes"
+        else:
+            if put_change / call_change < 0.5:
+                label = "Yes"
+    if call_change <= 0:
+        label = "Yes"
+    return label
+
+
+def int_at(values: numpy.ndarray, row: int, default: int = 0) -> int:
+    return int(values[row]) if 0 <= row < len(values) else default
+
+
+def analyze(chain: OptionChain, strike_price: float, round_factor: int,
+            boundaries: Optional[OiBoundaries] = None) -> Optional[Analysis]:
+    index: Optional[int] = chain.row(strike_price)
+    if index is None:
+        return
+
+    c1: int = int_at(chain.call_change_oi, index)
+    c2: int = int_at(chain.call_change_oi, index + 1)
+    c3: int = int_at(chain.call_change_oi, index + 2)
+    call_sum: float = round((c1 + c2 + c3) / round_factor, 1)
+    if call_sum == -0:
+        call_sum = 0.0
+    call_boundary: float = round(c3 / round_factor, 1)
+
+    p1: int = int_at(chain.put_change_oi, index)
+    p2: int = int_at(chain.put_change_oi, index + 1)
+    p3: int = int_at(chain.put_change_oi, index + 2)
+    p4: int = int_at(chain.put_change_oi, index + 4)
+    p5: int = int_at(chain.call_change_oi, index + 4)
+    p6: int = int_at(chain.call_change_oi, index - 2)
+    p7: int = int_at(chain.put_change_oi, index - 2)
+    put_sum: float = round((p1 + p2 + p3) / round_factor, 1)
+    put_boundary: float = round(p1 / round_factor, 1)
+    difference: float = round(call_sum - put_sum, 1)
+    call_itm: float = 0.0
+    if p5 != 0:
+        call_itm = round(p4 / p5, 1)
+        if call_itm == -0:
+            call_itm = 0.0
+    put_itm: float = 0.0
+    if p7 != 0:
+        put_itm = round(p6 / p7, 1)
+        if put_itm == -0:
+            put_itm = 0.0
+
+    return Analysis(timestamp=chain.timestamp, time=chain.timestamp.split(" ")[1], points=chain.underlying_value,
+                    call_sum=call_sum, put_sum=put_sum, difference=difference,
+                    call_boundary=call_boundary, put_boundary=put_boundary, call_itm=call_itm, put_itm=put_itm,
+                    boundaries=boundaries if boundaries is not None else oi_boundaries(chain, round_factor),
+                    levels=oi_levels(chain),
+                    oi_label="Bearish" if call_sum >= put_sum else "Bullish",
+                    call_itm_label=itm_label(call_change=p5, put_change=p4),
+                    put_itm_label=itm_label(call_change=p7, put_change=p6),
+                    call_exits_label="Yes" if call_boundary <= 0 or call_sum <= 0 else "No",
+                    put_exits_label="Yes" if put_boundary <= 0 or put_sum <= 0 else "No")
+
+
+class StrikeTable(NamedTuple):
+    strike_price: numpy.ndarray
+    call_sum: numpy.ndarray
+    put_sum: numpy.ndarray
+    difference: numpy.ndarray
+    call_boundary: numpy.ndarray
+    put_boundary: numpy.ndarray
+    call_itm: numpy.ndarray
+    put_itm: numpy.ndarray
+
+    def __len__(self) -> int:
+        return len(self.strike_price)
+
+    def rows(self, order: Optional[numpy.ndarray] = None) -> List[List[float]]:
+        columns: List[numpy.ndarray] = [column if order is None else column[order] for column in self]
+        return [list(row) for row in zip(*(column.tolist() for column in columns))]
+
+
+def shifted(values: numpy.ndarray, offset: int) -> numpy.ndarray:
+    result: numpy.ndarray = numpy.zeros_like(values)
+    if abs(offset) >= len(values):
+        return result
+    if offset >= 0:
+        result[:len(values) - offset] = values[offset:]
+    else:
+        result[-offset:] = values[:offset]
+    return result
+
+
+def round_tenths(values: numpy.ndarray) -> numpy.ndarray:
+    scaled: numpy.ndarray = values * 10
+    result: numpy.ndarray = numpy.round(scaled) / 10
+    for row in numpy.flatnonzero(numpy.abs(scaled - numpy.floor(scaled) - 0.5) < 1e-6).tolist():
+        result[row] = round(float(values[row]), 1)
+    return result + 0.0
+
+
+def ratio(numerator: numpy.ndarray, denominator: numpy.ndarray) -> numpy.ndarray:
+    result: numpy.ndarray = numpy.zeros(len(numerator), dtype=numpy.float64)
+    numpy.divide(numerator, denominator, out=result, where=denominator != 0)
+    return round_tenths(result)
+
+
+def analyze_strikes(chain: OptionChain, round_factor: int) -> StrikeTable:
+    call_change_oi: numpy.ndarray = chain.call_change_oi
+    put_change_oi: numpy.ndarray = chain.put_change_oi
+    c3: numpy.ndarray = shifted(call_change_oi, 2)
+    p1: numpy.ndarray = put_change_oi
+    call_sum: numpy.ndarray = round_tenths((call_change_oi + shifted(call_change_oi, 1) + c3) / round_factor)
+    put_sum: numpy.ndarray = round_tenths((p1 + shifted(put_change_oi, 1) + shifted(put_change_oi, 2)) / round_factor)
+    return StrikeTable(strike_price=chain.strike_price, call_sum=call_sum, put_sum=put_sum,
+                       difference=round_tenths(call_sum - put_sum),
+                       call_boundary=round_tenths(c3 / round_factor),
+                       put_boundary=round_tenths(p1 / round_factor),
+                       call_itm=ratio(shifted(put_change_oi, 4), shifted(call_change_oi, 4)),
+                       put_itm=ratio(shifted(call_change_oi, -2), shifted(put_change_oi, -2)))
+
+
+class ExpiryAnalysis(NamedTuple):
+    expiry_date: str
+    boundaries: OiBoundaries
+    analysis: Optional[Analysis]
+
+
+def analyze_expiries(chains: Dict[str, OptionChain], strike_price: float,
+                     round_factor: int) -> List[ExpiryAnalysis]:
+    results: List[ExpiryAnalysis] = []
+    for expiry_date, chain in chains.items():
+        if len(chain) == 0:
+            continue
+        boundaries: OiBoundaries = oi_boundaries(chain, round_factor)
+        results.append(ExpiryAnalysis(expiry_date=expiry_date, boundaries=boundaries,
+                                      analysis=analyze(chain, strike_price, round_factor, boundaries)))
+    return results
+
+
+delta_fields: Tuple[str, ...] = ('call_oi', 'call_volume', 'call_ltp', 'call_iv',
+                                 'put_oi', 'put_volume', 'put_ltp', 'put_iv')
+trigger_fields: Tuple[str, ...] = ('call_oi', 'call_volume', 'call_ltp', 'put_oi', 'put_volume', 'put_ltp')
+buildup_labels: Tuple[str, ...] = ('', 'Long Buildup', 'Short Covering', 'Short Buildup', 'Long Unwinding')
+
+
+class StrikeDeltas(NamedTuple):
+    expiry_date: str
+    strike_price: numpy.ndarray
+    values: numpy.ndarray
+    call_buildup: numpy.ndarray
+    put_buildup: numpy.ndarray
+
+    def __len__(self) -> int:
+        return len(self.strike_price)
+
+    def column(self, field: str) -> numpy.ndarray:
+        return self.values[:, delta_fields.index(field)]
+
+    def rows(self) -> List[List[Union[str, float]]]:
+        return [[strike_price] + values + [buildup_labels[call], buildup_labels[put]]
+                for strike_price, values, call, put in zip(self.strike_price.tolist(), self.values.tolist(),
+                                                           self.call_buildup.tolist(), self.put_buildup.tolist())]
+
+
+def buildup(oi_change: numpy.ndarray, ltp_change: numpy.ndarray) -> numpy.ndarray:
+    codes: numpy.ndarray = numpy.zeros(len(oi_change), dtype=numpy.int8)
+    codes[(ltp_change > 0) & (oi_change > 0)] = 1
+    codes[(ltp_change > 0) & (oi_change < 0)] = 2
+    codes[(ltp_change < 0) & (oi_change > 0)] = 3
+    codes[(ltp_change < 0) & (oi_change < 0)] = 4
+    return codes
+
+
+class DeltaEngine:
+    def __init__(self) -> None:
+        self.previous: Dict[str, OptionChain] = {}
+        self.compared: int = 0
+        self.changed: int = 0
+
+    def update(self, chain: OptionChain) -> Optional[StrikeDeltas]:
+        previous: Optional[OptionChain] = self.previous.get(chain.expiry_date)
+        self.previous[chain.expiry_date] = chain
+        if previous is None:
+            return
+        current_rows: numpy.ndarray
+        previous_rows: numpy.ndarray
+        if numpy.array_equal(chain.strike_price, previous.strike_price):
+            changed: numpy.ndarray = numpy.zeros(len(chain), dtype=bool)
+            for field in trigger_fields:
+                changed |= getattr(chain, field) != getattr(previous, field)
+            current_rows = previous_rows = numpy.flatnonzero(changed)
+            self.compared += len(chain)
+        else:
+            rows: List[Tuple[int, int]] = [(row, previous.strike_rows[strike_price]) for row, strike_price in
+                                           enumerate(chain.strike_price.tolist()) if strike_price in
+                                           previous.strike_rows]
+            current_rows = numpy.array([row for row, _ in rows], dtype=numpy.intp)
+            previous_rows = numpy.array([row for _, row in rows], dtype=numpy.intp)
+            changed = numpy.zeros(len(rows), dtype=bool)
+            for field in trigger_fields:
+                changed |= getattr(chain, field)[current_rows] != getattr(previous, field)[previous_rows]
+            current_rows, previous_rows = current_rows[changed], previous_rows[changed]
+            self.compared += len(rows)
+        self.changed += len(current_rows)
+        values: numpy.ndarray = numpy.empty((len(current_rows), len(delta_fields)), dtype=numpy.float64)
+        for column, field in enumerate(delta_fields):
+            numpy.subtract(getattr(chain, field)[current_rows], getattr(previous, field)[previous_rows],
+                           out=values[:, column], casting='unsafe')
+        return StrikeDeltas(expiry_date=chain.expiry_date, strike_price=chain.strike_price[current_rows],
+                            values=values, call_buildup=buildup(values[:, 0], values[:, 2]),
+                            put_buildup=buildup(values[:, 4], values[:, 6]))
+
+    def update_all(self, chains: Dict[str, OptionChain]) -> Dict[str, StrikeDeltas]:
+        results: Dict[str, StrikeDeltas] = {}
+        for expiry_date, chain in chains.items():
+            deltas: Optional[StrikeDeltas] = self.update(chain)
+            if deltas is not None:
+                results[expiry_date] = deltas
+        return results
@@ -0,0 +1,113 @@
+import csv
+import io
+import os
+import queue
+import sys
+import threading
+import time
+from typing import Optional, List, Sequence, TextIO, Any, Union
+
+
+class ExportSink:
+    def __init__(self, path: str, headers: Sequence[str], flush_seconds: float = 1.0,
+                 flush_bytes: int = 64 * 1024) -> None:
+        self.path: str = path
+        self.headers: Sequence[str] = headers
+        self.flush_seconds: float = flush_seconds
+        self.flush_bytes: int = flush_bytes
+        self.rows: queue.Queue = queue.Queue()
+        self.buffer: io.StringIO = io.StringIO()
+        self.writer: csv.writer = csv.writer(self.buffer)
+        self.file: Optional[TextIO] = None
+        self.unflushed: bool = False
+        self.failing: bool = False
+        self.failed: Optional[OSError] = None
+        self.written: int = 0
+        self.flushes: int = 0
+        self.thread: threading.Thread = threading.Thread(target=self.run, name="NSE-OCA-Export", daemon=True)
+        self.thread.start()
+        self.rows.put(threading.Event())
+
+    def write(self, values: Sequence[Any]) -> None:
+        self.rows.put(list(values))
+
+    def request_flush(self) -> threading.Event:
+        flushed: threading.Event = threading.Event()
+        self.rows.put(flushed)
+        return flushed
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        return self.request_flush().wait(timeout)
+
+    def stop(self, timeout: Optional[float] = 5.0) -> None:
+        self.rows.put(None)
+        self.thread.join(timeout)
+
+    def error(self) -> Optional[OSError]:
+        failed: Optional[OSError] = self.failed
+        self.failed = None
+        return failed
+
+    def run(self) -> None:
+        deadline: Optional[float] = None
+        while True:
+            try:
+                item: Union[List[Any], threading.Event, None] = self.rows.get(
+                    timeout=None if deadline is None else max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                deadline = None if self.write_out() else time.monotonic() + self.flush_seconds
+                continue
+            if item is None:
+                self.write_out(sync=True)
+                self.close()
+                return
+            if isinstance(item, threading.Event):
+                deadline = None if self.write_out() else time.monotonic() + self.flush_seconds
+                item.set()
+                continue
+            self.writer.writerow(item)
+            if self.buffer.tell() >= self.flush_bytes:
+                deadline = None if self.write_out() else time.monotonic() + self.flush_seconds
+            elif deadline is None:
+                deadline = time.monotonic() + self.flush_seconds
+
+    def write_out(self, sync: bool = False) -> bool:
+        data: str = self.buffer.getvalue()
+        if not data and not self.unflushed and self.file is not None and not sync:
+            return True
+        try:
+            if self.file is None:
+                self.file = open(self.path, 'a', newline='')
+                if self.file.tell() == 0:
+                    csv.writer(self.file).writerow(self.headers)
+            if data:
+                self.file.write(data)
+                self.unflushed = True
+                self.written += data.count('\n')
+                self.buffer.seek(0)
+                self.buffer.truncate()
+            self.file.flush()
+            self.unflushed = False
+            if sync:
+                os.fsync(self.file.fileno())
+        except OSError as err:
+            if not self.unflushed:
+                self.close()
+            if not self.failing:
+                print(err, sys.exc_info()[0], "42")
+                self.failing = True
+                self.failed = err
+            return False
+        self.failing = False
+        self.flushes += 1
+        return True
+
+    def close(self) -> None:
+        if self.file is None:
+            return
+        try:
+            self.file.close()
+        except OSError as err:
+            print(err, sys.exc_info()[0], "43")
+        self.file = None
+        self.unflushed = False
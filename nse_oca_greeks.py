@@ -0,0 +1,232 @@
+import argparse
+import datetime
+import math
+import time
+from typing import List, Dict, Tuple, NamedTuple, Any
+
+import numpy
+
+import nse_oca_chain
+from nse_oca_chain import OptionChain
+
+risk_free_rate: float = 0.07
+seconds_per_year: float = 365 * 86400
+
+
+class Greeks(NamedTuple):
+    expiry_date: str
+    years: float
+    strike_price: numpy.ndarray
+    call_iv: numpy.ndarray
+    call_delta: numpy.ndarray
+    call_gamma: numpy.ndarray
+    call_theta: numpy.ndarray
+    call_vega: numpy.ndarray
+    put_iv: numpy.ndarray
+    put_delta: numpy.ndarray
+    put_gamma: numpy.ndarray
+    put_theta: numpy.ndarray
+    put_vega: numpy.ndarray
+
+    def __len__(self) -> int:
+        return len(self.strike_price)
+
+
+def years_to_expiry(expiry_date: str, timestamp: str) -> float:
+    expires_at: datetime.datetime = datetime.datetime.strptime(expiry_date, '%d-%b-%Y').replace(hour=15, minute=30)
+    now: datetime.datetime = datetime.datetime.strptime(timestamp, '%d-%b-%Y %H:%M:%S')
+    return max(60.0, (expires_at - now).total_seconds()) / seconds_per_year
+
+
+def norm_cdf(x: numpy.ndarray) -> numpy.ndarray:
+    z: numpy.ndarray = numpy.abs(x) / math.sqrt(2)
+    t: numpy.ndarray = 1 / (1 + 0.5 * z)
+    tail: numpy.ndarray = 0.5 * t * numpy.exp(-z * z - 1.26551223 + t * (1.00002368 + t * (0.37409196 + t * (
+        0.09678418 + t * (-0.18628806 + t * (0.27886807 + t * (-1.13520398 + t * (1.48851587 + t * (
+            -0.82215223 + t * 0.17087277)))))))))
+    return numpy.where(x < 0, tail, 1 - tail)
+
+
+def norm_pdf(x: numpy.ndarray) -> numpy.ndarray:
+    return numpy.exp(-0.5 * x * x) / math.sqrt(2 * math.pi)
+
+
+def d1_d2(spot: numpy.ndarray, strike: numpy.ndarray, years: numpy.ndarray, rate: float,
+          sigma: numpy.ndarray) -> Tuple[numpy.ndarray, numpy.ndarray]:
+    deviation: numpy.ndarray = sigma * numpy.sqrt(years)
+    d1: numpy.ndarray = (numpy.log(spot / strike) + (rate + 0.5 * sigma * sigma) * years) / deviation
+    return d1, d1 - deviation
+
+
+def price(spot: numpy.ndarray, strike: numpy.ndarray, years: numpy.ndarray, rate: float, sigma: numpy.ndarray,
+          call: numpy.ndarray) -> numpy.ndarray:
+    d1: numpy.ndarray
+    d2: numpy.ndarray
+    d1, d2 = d1_d2(spot, strike, years, rate, sigma)
+    sign: numpy.ndarray = numpy.where(call, 1.0, -1.0)
+    return sign * (spot * norm_cdf(sign * d1) - strike * numpy.exp(-rate * years) * norm_cdf(sign * d2))
+
+
+def implied_volatility(target: numpy.ndarray, spot: numpy.ndarray, strike: numpy.ndarray, years: numpy.ndarray,
+                       rate: float, call: numpy.ndarray, tolerance: float = 1e-6, iterations: int = 64,
+                       low: float = 1e-4, high: float = 5.0) -> numpy.ndarray:
+    target, spot, strike, years, call = numpy.broadcast_arrays(
+        numpy.asarray(target, dtype=numpy.float64), spot, strike, years, call)
+    discounted: numpy.ndarray = strike * numpy.exp(-rate * years)
+    lower: numpy.ndarray = numpy.where(call, numpy.maximum(spot - discounted, 0.0),
+                                       numpy.maximum(discounted - spot, 0.0))
+    upper: numpy.ndarray = numpy.where(call, spot, discounted)
+    sigma: numpy.ndarray = numpy.full(target.shape, numpy.nan)
+    active: numpy.ndarray = numpy.flatnonzero((target > lower) & (target < upper))
+    if len(active) == 0:
+        return sigma
+
+    target, spot, strike, years = target[active], spot[active], strike[active], years[active]
+    lows: numpy.ndarray = numpy.full(len(active), low)
+    highs: numpy.ndarray = numpy.full(len(active), high)
+    guess: numpy.ndarray = numpy.clip(numpy.sqrt(2 * math.pi / years) * target / spot, 0.01, 3.0)
+    sign: numpy.ndarray = numpy.where(call[active], 1.0, -1.0)
+    discounted = discounted[active]
+    for _ in range(iterations):
+        d1: numpy.ndarray
+        d2: numpy.ndarray
+        d1, d2 = d1_d2(spot, strike, years, rate, guess)
+        probabilities: numpy.ndarray = norm_cdf(numpy.concatenate((sign * d1, sign * d2)))
+        error: numpy.ndarray = sign * (spot * probabilities[:len(d1)] - discounted * probabilities[len(d1):]) - target
+        done: numpy.ndarray = (numpy.abs(error) < tolerance * numpy.maximum(target, 1.0)) | (highs - lows < 1e-10)
+        sigma[active[done]] = guess[done]
+        pending: numpy.ndarray = ~done
+        if not pending.any():
+            break
+        active, target, spot, strike, years, sign, discounted = (
+            active[pending], target[pending], spot[pending], strike[pending], years[pending], sign[pending],
+            discounted[pending])
+        guess, error, d1, lows, highs = guess[pending], error[pending], d1[pending], lows[pending], highs[pending]
+        highs = numpy.where(error > 0, guess, highs)
+        lows = numpy.where(error > 0, lows, guess)
+        with numpy.errstate(divide='ignore', over='ignore', invalid='ignore'):
+            newton: numpy.ndarray = guess - error / (spot * norm_pdf(d1) * numpy.sqrt(years))
+        guess = numpy.where((newton > lows) & (newton < highs), newton, 0.5 * (lows + highs))
+    return sigma
+
+
+def side_greeks(spot: numpy.ndarray, strike: numpy.ndarray, years: numpy.ndarray, rate: float,
+                sigma: numpy.ndarray, call: bool) -> Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray, numpy.ndarray]:
+    root_years: numpy.ndarray = numpy.sqrt(years)
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        d1: numpy.ndarray
+        d2: numpy.ndarray
+        d1, d2 = d1_d2(spot, strike, years, rate, sigma)
+        density: numpy.ndarray = norm_pdf(d1)
+        delta: numpy.ndarray = norm_cdf(d1) - (0.0 if call else 1.0)
+        gamma: numpy.ndarray = density / (spot * sigma * root_years)
+        carry: numpy.ndarray = rate * strike * numpy.exp(-rate * years) * (norm_cdf(d2) if call else -norm_cdf(-d2))
+        theta: numpy.ndarray = (-spot * density * sigma / (2 * root_years) - carry) / 365
+        vega: numpy.ndarray = spot * density * root_years / 100
+    return delta, gamma, theta, vega
+
+
+def option_price(ltp: numpy.ndarray, bid_price: numpy.ndarray, ask_price: numpy.ndarray) -> numpy.ndarray:
+    mid: numpy.ndarray = numpy.where((bid_price > 0) & (ask_price > 0), (bid_price + ask_price) / 2, numpy.nan)
+    return numpy.where(ltp > 0, ltp, mid)
+
+
+def greeks_all(chains: Dict[str, OptionChain], rate: float = risk_free_rate) -> Dict[str, Greeks]:
+    chains = {expiry_date: chain for expiry_date, chain in chains.items() if len(chain)}
+    if not chains:
+        return {}
+    lengths: List[int] = [len(chain) for chain in chains.values()]
+    years_of: List[float] = [years_to_expiry(chain.expiry_date, chain.timestamp) for chain in chains.values()]
+    spot: numpy.ndarray = numpy.repeat([chain.underlying_value for chain in chains.values()], lengths)
+    years: numpy.ndarray = numpy.repeat(years_of, lengths)
+    strike: numpy.ndarray = numpy.concatenate([chain.strike_price for chain in chains.values()])
+    count: int = len(strike)
+
+    def column(field: str) -> numpy.ndarray:
+        return numpy.concatenate([getattr(chain, field) for chain in chains.values()])
+
+    reported: numpy.ndarray = numpy.concatenate((column('call_iv'), column('put_iv'))) / 100
+    target: numpy.ndarray = numpy.concatenate((
+        option_price(column('call_ltp'), column('call_bid_price'), column('call_ask_price')),
+        option_price(column('put_ltp'), column('put_bid_price'), column('put_ask_price'))))
+    call: numpy.ndarray = numpy.arange(2 * count) < count
+    sigma: numpy.ndarray = reported.copy()
+    missing: numpy.ndarray = numpy.flatnonzero(reported <= 0)
+    if len(missing):
+        rows: numpy.ndarray = missing % count
+        sigma[missing] = implied_volatility(target[missing], spot[rows], strike[rows], years[rows], rate,
+                                            call[missing])
+
+    calls: Tuple[numpy.ndarray, ...] = side_greeks(spot, strike, years, rate, sigma[:count], True)
+    puts: Tuple[numpy.ndarray, ...] = side_greeks(spot, strike, years, rate, sigma[count:], False)
+    call_iv: numpy.ndarray = sigma[:count] * 100
+    put_iv: numpy.ndarray = sigma[count:] * 100
+    bounds: numpy.ndarray = numpy.cumsum([0] + lengths)
+    results: Dict[str, Greeks] = {}
+    for number, expiry_date in enumerate(chains):
+        expiry_rows: slice = slice(int(bounds[number]), int(bounds[number + 1]))
+        results[expiry_date] = Greeks(
+            expiry_date, years_of[number], strike[expiry_rows], call_iv[expiry_rows],
+            *(values[expiry_rows] for values in calls), put_iv[expiry_rows], *(values[expiry_rows] for values in puts))
+    return results
+
+
+def greeks(chain: OptionChain, rate: float = risk_free_rate) -> Greeks:
+    return greeks_all({chain.expiry_date: chain}, rate)[chain.expiry_date]
+
+
+def benchmark() -> None:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        description="Time the Greeks and implied volatility of every contract of an option chain response.")
+    parser.add_argument('--file', help="Raw option chain response to use instead of a synthetic one")
+    parser.add_argument('--strikes', type=int, default=120)
+    parser.add_argument('--expiries', type=int, default=18)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--rate', type=float, default=risk_free_rate, help="Annual risk free rate")
+    args: argparse.Namespace = parser.parse_args()
+    if args.file:
+        with open(args.file, 'rb') as f:
+            json_data: Any = nse_oca_chain.json_loads(f.read())
+    else:
+        json_data = nse_oca_chain.synthetic_payload(strikes=args.strikes, expiries=args.expiries, seed=0)
+    chains: Dict[str, OptionChain] = nse_oca_chain.extract_chains(json_data)
+    contracts: int = 2 * sum(len(chain) for chain in chains.values())
+    zero_iv: int = sum(int((chain.call_iv <= 0).sum() + (chain.put_iv <= 0).sum()) for chain in chains.values())
+
+    start: float = time.perf_counter()
+    for _ in range(args.repeat):
+        results: Dict[str, Greeks] = greeks_all(chains, args.rate)
+    elapsed: float = (time.perf_counter() - start) / args.repeat
+    unsolved: int = sum(int(numpy.isnan(result.call_iv).sum() + numpy.isnan(result.put_iv).sum())
+                        for result in results.values())
+    print(f"{contracts} contracts, {len(chains)} expiries, {zero_iv} without IV, {unsolved} without a valid price")
+    print(f"greeks of every contract:    {elapsed * 1000:.2f} ms per tick")
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        for chain in chains.values():
+            greeks(chain, args.rate)
+    print(f"greeks one expiry at a time: {(time.perf_counter() - start) / args.repeat * 1000:.2f} ms per tick")
+
+    spot: numpy.ndarray = numpy.concatenate([numpy.full(len(chain), chain.underlying_value)
+                                             for chain in chains.values()] * 2)
+    strike: numpy.ndarray = numpy.concatenate([chain.strike_price for chain in chains.values()] * 2)
+    years: numpy.ndarray = numpy.concatenate([numpy.full(len(chain), years_to_expiry(chain.expiry_date,
+                                                                                     chain.timestamp))
+                                              for chain in chains.values()] * 2)
+    call: numpy.ndarray = numpy.arange(contracts) < contracts // 2
+    sigma: numpy.ndarray = numpy.random.default_rng(0).uniform(0.05, 1.0, contracts)
+    target: numpy.ndarray = price(spot, strike, years, args.rate, sigma, call)
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        solved: numpy.ndarray = implied_volatility(target, spot, strike, years, args.rate, call)
+    elapsed = (time.perf_counter() - start) / args.repeat
+    priced: numpy.ndarray = ~numpy.isnan(solved)
+    error: float = float(numpy.abs(price(spot[priced], strike[priced], years[priced], args.rate, solved[priced],
+                                         call[priced]) - target[priced]).max())
+    print(f"implied volatility of all:   {elapsed * 1000:.2f} ms per tick, {int(priced.sum())} solved, "
+          f"max price error {error:.2e}")
+
+
+if __name__ == '__main__':
+    benchmark()
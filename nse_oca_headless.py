@@ -0,0 +1,213 @@
+import argparse
+import configparser
+import datetime
+import json
+import sys
+import time
+from typing import Optional, List, Dict, Tuple, TextIO, Any, Union
+
+import numpy
+
+import nse_oca_chain
+import nse_oca_engine
+from nse_oca_capture import Journal, ReplaySource, journal_path
+from nse_oca_client import NseClient
+from nse_oca_export import ExportSink
+from nse_oca_history import HistoryWriter
+from nse_oca_scheduler import PollScheduler
+
+
+class Headless:
+    def __init__(self, symbol: str, option_mode: str, expiry_date: Optional[str], strike_price: Optional[float],
+                 seconds: float, output_format: str = 'table', live_export: bool = False, auto_stop: bool = False,
+                 stream: TextIO = sys.stdout, source: Optional[Union[NseClient, ReplaySource]] = None,
+                 adaptive: bool = True, history: bool = False) -> None:
+        self.symbol: str = symbol
+        self.option_mode: str = option_mode
+        self.expiry_date: Optional[str] = expiry_date
+        self.sp: Optional[float] = strike_price
+        self.seconds: float = seconds
+        self.output_format: str = output_format
+        self.live_export: bool = live_export
+        self.auto_stop: bool = auto_stop
+        self.stream: TextIO = stream
+        self.round_factor: int = 1000 if option_mode == 'Index' else 10
+        self.units_str: str = 'in K' if option_mode == 'Index' else 'in 10s'
+        self.csv_headers: Tuple[str, str, str, str, str, str, str, str, str] = (
+            'Time', 'Value', f'Call Sum ({self.units_str})', f'Put Sum ({self.units_str})',
+            f'Difference ({self.units_str})',
+            f'Call Boundary ({self.units_str})', f'Put Boundary ({self.units_str})', 'Call ITM', 'Put ITM')
+        self.client: Union[NseClient, ReplaySource] = source if source is not None else NseClient(pool_size=1)
+        self.replaying: bool = isinstance(self.client, ReplaySource)
+        self.scheduler: PollScheduler = PollScheduler(seconds, adaptive=adaptive)
+        self.previous_timestamp: Optional[datetime.datetime] = None
+        self.skipped_ticks: int = 0
+        self.export_sink: Optional[ExportSink] = None
+        self.history_writer: Optional[HistoryWriter] = HistoryWriter() if history else None
+        self.stop: bool = False
+
+    def export_path(self) -> str:
+        return f"NSE-OCA-{self.symbol}-{self.expiry_date}.csv"
+
+    def process(self, json_data: Any) -> Optional[nse_oca_engine.Analysis]:
+        records: Dict[str, Any] = json_data['records']
+        timestamp: datetime.datetime = datetime.datetime.strptime(records['timestamp'], '%d-%b-%Y %H:%M:%S')
+        if self.previous_timestamp is not None and timestamp <= self.previous_timestamp:
+            self.skipped_ticks += 1
+            return
+        if self.expiry_date is None:
+            self.expiry_date = records['expiryDates'][0]
+        chain: nse_oca_chain.OptionChain = nse_oca_chain.extract_chain(json_data, self.expiry_date)
+        if len(chain) == 0:
+            print(f"Invalid Expiry Date {self.expiry_date}", "27", file=sys.stderr)
+            self.stop = True
+            return
+        if self.sp is None:
+            self.sp = float(chain.strike_price[numpy.argmin(numpy.abs(chain.strike_price - chain.underlying_value))])
+        analysis: Optional[nse_oca_engine.Analysis] = nse_oca_engine.analyze(chain, self.sp, self.round_factor)
+        if analysis is None:
+            print(f"Strike Price {self.sp} not found in the option chain", "28", file=sys.stderr)
+            self.stop = True
+            return
+        self.previous_timestamp = timestamp
+        return analysis
+
+    def emit(self, analysis: nse_oca_engine.Analysis, first: bool) -> None:
+        if self.output_format == 'json':
+            record: Dict[str, Any] = analysis._asdict()
+            record['boundaries'] = analysis.boundaries._asdict()
+            record['levels'] = analysis.levels._asdict()
+            record.update(symbol=self.symbol, expiry_date=self.expiry_date, strike_price=self.sp)
+            print(json.dumps(record), file=self.stream, flush=True)
+        else:
+            if first:
+                print(f"{self.symbol} - {self.expiry_date} - {self.sp}", file=self.stream)
+                print('\t'.join(self.csv_headers), file=self.stream)
+            print('\t'.join(str(value) for value in analysis.row()), file=self.stream, flush=True)
+        if self.live_export:
+            self.export_row(analysis.row())
+        if self.history_writer is not None:
+            self.history_writer.write(self.symbol, self.expiry_date, self.sp, analysis)
+
+    def export_row(self, values: List[Any]) -> None:
+        export_path: str = self.export_path()
+        if self.export_sink is None or self.export_sink.path != export_path:
+            self.close_export_sink()
+            self.export_sink = ExportSink(export_path, self.csv_headers)
+        self.export_sink.write(values)
+        err: Optional[OSError] = self.export_sink.error()
+        if isinstance(err, PermissionError):
+            print(err, sys.exc_info()[0], "29", file=sys.stderr)
+            print(f"Failed to access {export_path}. Permission Denied. Try closing any apps using it.",
+                  file=sys.stderr)
+
+    def close_export_sink(self) -> None:
+        export_sink: Optional[ExportSink] = self.export_sink
+        self.export_sink = None
+        if export_sink is not None:
+            export_sink.stop()
+
+    def run(self) -> None:
+        first: bool = True
+        try:
+            while not self.stop:
+                result: Optional[Tuple[Any, Any]] = self.client.fetch(self.symbol, self.option_mode)
+                timestamp: Optional[str] = None
+                if result is not None:
+                    try:
+                        timestamp = result[1]['records']['timestamp']
+                        analysis: Optional[nse_oca_engine.Analysis] = self.process(result[1])
+                    except (KeyError, TypeError, ValueError, IndexError) as err:
+                        print(err, sys.exc_info()[0], "30", file=sys.stderr)
+                        analysis = None
+                    if analysis is not None:
+                        self.emit(analysis, first)
+                        first = False
+                        if self.auto_stop and analysis.time == '15:30:00' and \
+                                self.previous_timestamp.date() == datetime.date.today():
+                            break
+                if self.replaying:
+                    if self.client.finished:
+                        break
+                    continue
+                self.scheduler.record(timestamp)
+                time.sleep(self.scheduler.delay())
+        finally:
+            self.client.close()
+            self.close_export_sink()
+            self.history_writer.stop() if self.history_writer is not None else None
+
+
+def read_config(path: str) -> Dict[str, str]:
+    config_parser: configparser.ConfigParser = configparser.ConfigParser()
+    try:
+        config_parser.read(path)
+        return dict(config_parser['main']) if config_parser.has_section('main') else {}
+    except configparser.Error as err:
+        print(err, sys.exc_info()[0], "0", file=sys.stderr)
+        return {}
+
+
+def main(args: Optional[List[str]] = None) -> None:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        description="Run NSE-Option-Chain-Analyzer without a window. Unset options are read from the config file.")
+    parser.add_argument('--config', default='NSE-OCA.ini', help="Configuration file (default: NSE-OCA.ini)")
+    parser.add_argument('--mode', choices=('Index', 'Stock'), help="Index or Stock mode")
+    parser.add_argument('--symbol', help="Index or Stock symbol, eg. NIFTY")
+    parser.add_argument('--expiry', help="Expiry date, eg. 25-Nov-2021 (default: nearest expiry)")
+    parser.add_argument('--strike', type=float, help="Strike price (default: strike nearest to the value)")
+    parser.add_argument('--seconds', type=float, help="Refresh interval in seconds")
+    parser.add_argument('--format', choices=('table', 'json'), default='table', help="Output format for stdout")
+    parser.add_argument('--live-export', action='store_true', default=None, help="Append rows to the CSV file")
+    parser.add_argument('--history', action='store_true', default=None,
+                        help="Store rows in the SQLite history database queried by nse_oca_history.py")
+    parser.add_argument('--fixed', action='store_true',
+                        help="Refresh at exactly --seconds instead of just after the server is expected to update")
+    parser.add_argument('--base-url', help="Option chain server (default: base_url in the config file or NSE)")
+    parser.add_argument('--capture', nargs='?', const='', metavar='FILE',
+                        help="Append raw responses to a compressed journal "
+                             "(default: NSE-OCA-<symbol>-<date>.journal.gz)")
+    parser.add_argument('--replay', metavar='FILE', help="Replay a captured journal instead of fetching from NSE")
+    parser.add_argument('--speed', type=float, default=1.0,
+                        help="Replay speed relative to capture time, 0 for as fast as possible (default: 1)")
+    parsed: argparse.Namespace = parser.parse_args(args)
+
+    config: Dict[str, str] = read_config(parsed.config)
+    option_mode: str = parsed.mode or config.get('option_mode', 'Index')
+    symbol: Optional[str] = parsed.symbol or config.get('index' if option_mode == 'Index' else 'stock')
+    if not symbol:
+        parser.error("--symbol is required when it is not set in the config file")
+    strike_price: Optional[float] = parsed.strike
+    if strike_price is None and config.get('strike_price'):
+        strike_price = float(config['strike_price'])
+    seconds: float = parsed.seconds if parsed.seconds is not None else float(config.get('seconds', 60))
+    live_export: bool = parsed.live_export if parsed.live_export is not None else \
+        config.get('live_export', 'False') == 'True'
+    history: bool = parsed.history if parsed.history is not None else config.get('history', 'False') == 'True'
+
+    capture: Optional[str] = parsed.capture if parsed.capture is not None else \
+        '' if config.get('capture', 'False') == 'True' else None
+    base_url: Optional[str] = parsed.base_url or config.get('base_url') or None
+
+    source: Union[NseClient, ReplaySource]
+    if parsed.replay is not None:
+        source = ReplaySource(parsed.replay, speed=parsed.speed)
+    elif capture is not None:
+        source = NseClient(pool_size=1, journal=Journal(capture or journal_path(symbol)), base_url=base_url)
+    else:
+        source = NseClient(pool_size=1, base_url=base_url)
+
+    headless: Headless = Headless(symbol=symbol, option_mode=option_mode, expiry_date=parsed.expiry,
+                                  strike_price=strike_price, seconds=seconds, output_format=parsed.format,
+                                  live_export=live_export, auto_stop=config.get('auto_stop', 'False') == 'True',
+                                  source=source,
+                                  adaptive=not parsed.fixed and config.get('adaptive', 'True') == 'True',
+                                  history=history)
+    try:
+        headless.run()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
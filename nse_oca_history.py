@@ -0,0 +1,252 @@
+import argparse
+import datetime
+import os
+import queue
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from typing import Optional, List, Tuple, Any, Union
+
+from nse_oca_chain import OptionChain
+from nse_oca_engine import Analysis
+
+database_path: str = "NSE-OCA-history.sqlite3"
+columns: Tuple[str, ...] = (
+    'strike_price', 'value', 'call_sum', 'put_sum', 'difference', 'call_boundary', 'put_boundary', 'call_itm',
+    'put_itm', 'put_call_ratio', 'max_call_oi', 'max_call_oi_sp', 'max_put_oi', 'max_put_oi_sp', 'max_pain',
+    'support', 'resistance', 'oi_label')
+schema: Tuple[str, ...] = (
+    "CREATE TABLE IF NOT EXISTS summary (symbol TEXT NOT NULL, expiry_date TEXT NOT NULL, session TEXT NOT NULL, "
+    "timestamp TEXT NOT NULL, strike_price REAL NOT NULL, value REAL, call_sum REAL, put_sum REAL, difference REAL, "
+    "call_boundary REAL, put_boundary REAL, call_itm REAL, put_itm REAL, put_call_ratio REAL, max_call_oi REAL, "
+    "max_call_oi_sp REAL, max_put_oi REAL, max_put_oi_sp REAL, max_pain REAL, support REAL, resistance REAL, "
+    "oi_label TEXT, PRIMARY KEY (symbol, expiry_date, strike_price, timestamp)) WITHOUT ROWID",
+    "CREATE INDEX IF NOT EXISTS summary_expiries ON summary (symbol, expiry_date, timestamp)",
+    "CREATE INDEX IF NOT EXISTS summary_sessions ON summary (symbol, session, timestamp)")
+insert: str = f"INSERT OR REPLACE INTO summary VALUES ({', '.join('?' * (4 + len(columns)))})"
+
+
+def iso_date(date: str) -> str:
+    return datetime.datetime.strptime(date, '%d-%b-%Y').strftime('%Y-%m-%d')
+
+
+def connect(path: str) -> sqlite3.Connection:
+    connection: sqlite3.Connection = sqlite3.connect(path, timeout=10)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    for statement in schema:
+        connection.execute(statement)
+    connection.commit()
+    return connection
+
+
+def summary_row(symbol: str, expiry_date: str, strike_price: float, analysis: Analysis) -> Tuple[Any, ...]:
+    timestamp: datetime.datetime = datetime.datetime.strptime(analysis.timestamp, '%d-%b-%Y %H:%M:%S')
+    return (symbol, iso_date(expiry_date), timestamp.strftime('%Y-%m-%d'),
+            timestamp.strftime('%Y-%m-%d %H:%M:%S'), strike_price, analysis.points, analysis.call_sum,
+            analysis.put_sum, analysis.difference, analysis.call_boundary, analysis.put_boundary, analysis.call_itm,
+            analysis.put_itm, analysis.boundaries.put_call_ratio, analysis.boundaries.max_call_oi,
+            analysis.boundaries.max_call_oi_sp, analysis.boundaries.max_put_oi, analysis.boundaries.max_put_oi_sp,
+            analysis.levels.max_pain, analysis.levels.support, analysis.levels.resistance, analysis.oi_label)
+
+
+class HistoryWriter:
+    def __init__(self, path: str = database_path, flush_seconds: float = 1.0, batch_rows: int = 500) -> None:
+        self.path: str = path
+        self.flush_seconds: float = flush_seconds
+        self.batch_rows: int = batch_rows
+        self.rows: queue.Queue = queue.Queue()
+        self.pending: List[Tuple[Any, ...]] = []
+        self.connection: Optional[sqlite3.Connection] = None
+        self.failing: bool = False
+        self.failed: Optional[Exception] = None
+        self.written: int = 0
+        self.commits: int = 0
+        self.thread: threading.Thread = threading.Thread(target=self.run, name="NSE-OCA-History", daemon=True)
+        self.thread.start()
+
+    def write(self, symbol: str, expiry_date: str, strike_price: float, analysis: Analysis) -> None:
+        self.rows.put((symbol, expiry_date, strike_price, analysis))
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        flushed: threading.Event = threading.Event()
+        self.rows.put(flushed)
+        return flushed.wait(timeout)
+
+    def stop(self, timeout: Optional[float] = 5.0) -> None:
+        self.rows.put(None)
+        self.thread.join(timeout)
+
+    def error(self) -> Optional[Exception]:
+        failed: Optional[Exception] = self.failed
+        self.failed = None
+        return failed
+
+    def run(self) -> None:
+        deadline: Optional[float] = None
+        while True:
+            try:
+                item: Union[Tuple[Any, ...], threading.Event, None] = self.rows.get(
+                    timeout=None if deadline is None else max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                deadline = None if self.commit() else time.monotonic() + self.flush_seconds
+                continue
+            if item is None:
+                self.commit()
+                self.close()
+                return
+            if isinstance(item, threading.Event):
+                deadline = None if self.commit() else time.monotonic() + self.flush_seconds
+                item.set()
+                continue
+            try:
+                self.pending.append(summary_row(*item))
+            except (TypeError, ValueError) as err:
+                print(err, sys.exc_info()[0], "46")
+                continue
+            if len(self.pending) >= self.batch_rows:
+                deadline = None if self.commit() else time.monotonic() + self.flush_seconds
+            elif deadline is None:
+                deadline = time.monotonic() + self.flush_seconds
+
+    def commit(self) -> bool:
+        if not self.pending:
+            return True
+        try:
+            if self.connection is None:
+                self.connection = connect(self.path)
+            with self.connection:
+                self.connection.executemany(insert, self.pending)
+        except sqlite3.Error as err:
+            self.close()
+            if not self.failing:
+                print(err, sys.exc_info()[0], "44")
+                self.failing = True
+                self.failed = err
+            return False
+        self.failing = False
+        self.written += len(self.pending)
+        self.commits += 1
+        self.pending = []
+        return True
+
+    def close(self) -> None:
+        if self.connection is None:
+            return
+        try:
+            self.connection.close()
+        except sqlite3.Error as err:
+            print(err, sys.exc_info()[0], "45")
+        self.connection = None
+
+
+class History:
+    def __init__(self, path: str = database_path) -> None:
+        self.path: str = path
+        self.connection: sqlite3.Connection = connect(path)
+
+    def sessions(self, symbol: str, count: int) -> List[str]:
+        return [row[0] for row in self.connection.execute(
+            "SELECT DISTINCT session FROM summary WHERE symbol = ? ORDER BY session DESC LIMIT ?", (symbol, count))]
+
+    def series(self, symbol: str, column: str, sessions: int = 1, expiry_date: Optional[str] = None,
+               strike_price: Optional[float] = None) -> List[Tuple[str, str, float, Any]]:
+        if column not in columns:
+            raise ValueError(f"Unknown column {column}, expected one of {', '.join(columns)}")
+        recent: List[str] = self.sessions(symbol, sessions)
+        if not recent:
+            return []
+        query: str = f"SELECT timestamp, expiry_date, strike_price, {column} FROM summary " \
+                     f"WHERE symbol = ? AND session >= ?"
+        parameters: Tuple[Any, ...] = (symbol, recent[-1])
+        if expiry_date is not None:
+            query += " AND expiry_date = ?"
+            parameters += (iso_date(expiry_date),)
+        if strike_price is not None:
+            query += " AND strike_price = ?"
+            parameters += (strike_price,)
+        return self.connection.execute(f"{query} ORDER BY timestamp, expiry_date, strike_price", parameters).fetchall()
+
+    def put_call_ratio(self, symbol: str, sessions: int = 5, expiry_date: Optional[str] = None,
+                       strike_price: Optional[float] = None) -> List[Tuple[str, str, float, float]]:
+        return self.series(symbol, 'put_call_ratio', sessions, expiry_date, strike_price)
+
+    def close(self) -> None:
+        self.connection.close()
+
+
+def benchmark(days: int, ticks: int) -> None:
+    import nse_oca_chain
+    import nse_oca_engine
+
+    json_data: Any = nse_oca_chain.synthetic_payload(seed=0, expiries=2)
+    chain: OptionChain = nse_oca_chain.extract_chain(json_data, json_data['records']['expiryDates'][0])
+    strike_price: float = float(chain.strike_price[len(chain) // 2])
+    analysis: Analysis = nse_oca_engine.analyze(chain, strike_price, 1000)
+    rng: random.Random = random.Random(0)
+    directory: str = tempfile.mkdtemp(prefix='NSE-OCA-history-')
+    path: str = os.path.join(directory, database_path)
+    try:
+        first_day: datetime.datetime = datetime.datetime(2021, 1, 4, 9, 15)
+        ticks_of: List[Tuple[str, Analysis]] = [
+            (symbol, analysis._replace(
+                timestamp=(first_day + datetime.timedelta(days=day, seconds=tick * 60)).strftime('%d-%b-%Y %H:%M:%S'),
+                boundaries=analysis.boundaries._replace(put_call_ratio=round(rng.uniform(0.5, 1.5), 2))))
+            for day in range(days) for symbol in ('NIFTY', 'BANKNIFTY', 'FINNIFTY') for tick in range(ticks)]
+        writer: HistoryWriter = HistoryWriter(path)
+        start: float = time.perf_counter()
+        for symbol, tick_analysis in ticks_of:
+            writer.write(symbol, chain.expiry_date, strike_price, tick_analysis)
+        enqueued: float = time.perf_counter() - start
+        writer.stop(timeout=None)
+        written: float = time.perf_counter() - start
+
+        history: History = History(path)
+        start = time.perf_counter()
+        rows: List[Tuple[str, str, float, float]] = history.put_call_ratio('BANKNIFTY', 5)
+        queried: float = time.perf_counter() - start
+        history.close()
+        print(f"{writer.written} rows in {writer.commits} commits, {os.path.getsize(path) / 1024 / 1024:.1f} MB")
+        print(f"write: {enqueued * 1000:.0f} ms on the caller, {written * 1000:.0f} ms until committed")
+        print(f"BANKNIFTY PCR over the last 5 sessions: {len(rows)} rows in {queried * 1000:.2f} ms")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def main() -> None:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        description="Query the summary rows stored by the analyzer, e.g. the PCR of a symbol over its last sessions.")
+    parser.add_argument('--database', default=database_path)
+    parser.add_argument('--symbol', help="Index or Stock symbol, e.g. BANKNIFTY")
+    parser.add_argument('--column', default='put_call_ratio', choices=columns)
+    parser.add_argument('--sessions', type=int, default=5, help="Number of most recent sessions")
+    parser.add_argument('--expiry', help="Only this expiry date, e.g. 25-Nov-2021")
+    parser.add_argument('--strike', type=float, help="Only this strike price, e.g. 17500")
+    parser.add_argument('--bench', type=int, metavar='DAYS',
+                        help="Store this many days of ticks for three symbols in a temporary database, query it "
+                             "and exit")
+    parser.add_argument('--ticks', type=int, default=375, help="Ticks per day stored by --bench")
+    args: argparse.Namespace = parser.parse_args()
+    if args.bench is not None:
+        benchmark(args.bench, args.ticks)
+        return
+    if args.symbol is None:
+        parser.error("--symbol is required")
+    if not os.path.isfile(args.database):
+        parser.error(f"{args.database} not found")
+
+    history: History = History(args.database)
+    try:
+        for timestamp, expiry_date, strike_price, value in history.series(args.symbol, args.column, args.sessions,
+                                                                          args.expiry, args.strike):
+            print(f"{timestamp}\t{expiry_date}\t{strike_price}\t{value}")
+    finally:
+        history.close()
+
+
+if __name__ == '__main__':
+    main()
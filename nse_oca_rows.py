@@ -0,0 +1,124 @@
+import argparse
+import tempfile
+import time
+from typing import Optional, List, Sequence, Iterator, BinaryIO, Union
+
+import numpy
+
+from nse_oca_engine import row_rising_colors
+
+row_dtype: numpy.dtype = numpy.dtype([('time', 'S8'), ('values', '<f8', (len(row_rising_colors),)),
+                                      ('colors', 'i1', (len(row_rising_colors),))])
+
+
+class RowBuffer:
+    def __init__(self, capacity: int = 1000, spill_rows: Optional[int] = None) -> None:
+        self.capacity: int = capacity
+        self.spill_rows: int = spill_rows if spill_rows is not None else max(1, capacity // 4)
+        self.buffer: numpy.ndarray = numpy.zeros(capacity, dtype=row_dtype)
+        self.head: int = 0
+        self.count: int = 0
+        self.spilled: int = 0
+        self.spill_file: Optional[BinaryIO] = None
+
+    def __len__(self) -> int:
+        return self.spilled + self.count
+
+    def append(self, row: Sequence[Union[str, float]], colors: Sequence[int]) -> None:
+        if self.count == self.capacity:
+            self.spill()
+        self.buffer[(self.head + self.count) % self.capacity] = (str(row[0]).encode(), row[1:], colors)
+        self.count += 1
+
+    def spill(self) -> None:
+        if self.spill_file is None:
+            self.spill_file = tempfile.TemporaryFile(prefix='NSE-OCA-rows-')
+        rows: int = min(self.spill_rows, self.count)
+        self.spill_file.seek(self.spilled * row_dtype.itemsize)
+        self.spill_file.write(self.buffer.take(numpy.arange(self.head, self.head + rows), mode='wrap').tobytes())
+        self.spill_file.flush()
+        self.head = (self.head + rows) % self.capacity
+        self.count -= rows
+        self.spilled += rows
+
+    def records(self, start: int, stop: int) -> numpy.ndarray:
+        start, stop = max(0, start), min(len(self), stop)
+        if start >= stop:
+            return numpy.empty(0, dtype=row_dtype)
+        parts: List[numpy.ndarray] = []
+        if start < self.spilled:
+            self.spill_file.seek(start * row_dtype.itemsize)
+            spilled: int = min(stop, self.spilled) - start
+            parts.append(numpy.frombuffer(self.spill_file.read(spilled * row_dtype.itemsize), dtype=row_dtype))
+        if stop > self.spilled:
+            first: int = max(start, self.spilled) - self.spilled
+            parts.append(self.buffer.take(numpy.arange(self.head + first, self.head + stop - self.spilled),
+                                          mode='wrap'))
+        return parts[0] if len(parts) == 1 else numpy.concatenate(parts)
+
+    def rows(self, start: int, stop: int) -> List[List[Union[str, float]]]:
+        records: numpy.ndarray = self.records(start, stop)
+        return [[row_time.decode()] + values for row_time, values in
+                zip(records['time'].tolist(), records['values'].tolist())]
+
+    def colors(self, start: int, stop: int) -> numpy.ndarray:
+        return self.records(start, stop)['colors']
+
+    def chunks(self, size: Optional[int] = None, stop: Optional[int] = None) -> Iterator[List[List[Union[str, float]]]]:
+        size = size if size is not None else self.capacity
+        stop = len(self) if stop is None else min(stop, len(self))
+        for start in range(0, stop, size):
+            yield self.rows(start, min(stop, start + size))
+
+    def clear(self) -> None:
+        self.head = 0
+        self.count = 0
+        self.spilled = 0
+        if self.spill_file is not None:
+            self.spill_file.seek(0)
+            self.spill_file.truncate()
+
+    def close(self) -> None:
+        if self.spill_file is not None:
+            self.spill_file.close()
+            self.spill_file = None
+        self.clear()
+
+
+def benchmark(ticks: int, capacity: int, page: int) -> None:
+    rng: numpy.random.RandomState = numpy.random.RandomState(0)
+    values: numpy.ndarray = numpy.round(rng.uniform(-100, 100, (ticks, len(row_rising_colors))), 1)
+    colors: numpy.ndarray = rng.randint(0, 3, (ticks, len(row_rising_colors)))
+    times: List[str] = [time.strftime('%H:%M:%S', time.gmtime(9 * 3600 + tick)) for tick in range(ticks)]
+    rows: RowBuffer = RowBuffer(capacity)
+    start: float = time.perf_counter()
+    for tick in range(ticks):
+        rows.append([times[tick]] + values[tick].tolist(), colors[tick].tolist())
+    appended: float = time.perf_counter() - start
+    start = time.perf_counter()
+    rows.rows(len(rows) - page, len(rows))
+    rows.colors(len(rows) - page, len(rows))
+    tail: float = time.perf_counter() - start
+    start = time.perf_counter()
+    rows.rows(0, page)
+    rows.colors(0, page)
+    head: float = time.perf_counter() - start
+    print(f"{ticks} rows, {capacity} in memory ({rows.buffer.nbytes / 1024:.0f} KB), {rows.spilled} spilled to disk")
+    print(f"append:                 {appended / ticks * 1000000:.1f} us per row")
+    print(f"page of the latest {page}: {tail * 1000:.2f} ms")
+    print(f"page of the first {page}:  {head * 1000:.2f} ms")
+    rows.close()
+
+
+def main() -> None:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        description="Append rows to the bounded table history and time reading a page of it.")
+    parser.add_argument('--ticks', type=int, default=22500, help="Rows appended, e.g. a day at 1 second intervals")
+    parser.add_argument('--capacity', type=int, default=1000, help="Rows kept in memory")
+    parser.add_argument('--page', type=int, default=20, help="Rows read per page")
+    args: argparse.Namespace = parser.parse_args()
+    benchmark(args.ticks, args.capacity, args.page)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+import collections
+import datetime
+import math
+import random
+import time
+from typing import Optional, Deque, Callable
+
+
+class PollScheduler:
+    def __init__(self, seconds: float, adaptive: bool = True, margin: float = 1.0, probe: float = 0.5,
+                 max_backoff: float = 300.0, history: int = 20, clock: Callable[[], float] = time.monotonic,
+                 wall_clock: Callable[[], float] = time.time, rng: Optional[random.Random] = None) -> None:
+        self.seconds: float = seconds
+        self.adaptive: bool = adaptive
+        self.margin: float = margin
+        self.probe: float = probe
+        self.max_backoff: float = max(max_backoff, seconds)
+        self.clock: Callable[[], float] = clock
+        self.wall_clock: Callable[[], float] = wall_clock
+        self.rng: random.Random = rng if rng is not None else random.Random()
+        self.due: Optional[float] = None
+        self.timestamp: Optional[str] = None
+        self.server_time: Optional[float] = None
+        self.target: Optional[float] = None
+        self.gaps: Deque[float] = collections.deque(maxlen=history)
+        self.offset: Optional[float] = None
+        self.good_offset: Optional[float] = None
+        self.early_offset: Optional[float] = None
+        self.step: float = probe
+        self.history: int = history
+        self.on_time: int = 0
+        self.retries: int = 0
+        self.failures: int = 0
+        self.polls: int = 0
+        self.updates: int = 0
+        self.stale: int = 0
+
+    @property
+    def period(self) -> Optional[float]:
+        return min(self.gaps) if self.gaps else None
+
+    def record(self, timestamp: Optional[str]) -> bool:
+        self.polls += 1
+        if timestamp is None:
+            self.failures += 1
+            return False
+        self.failures = 0
+        new: bool = timestamp != self.timestamp
+        server_time: Optional[float] = datetime.datetime.strptime(
+            timestamp, '%d-%b-%Y %H:%M:%S').timestamp() if new else self.server_time
+        on_target: bool = new and (self.target is None or server_time >= self.target - 1)
+        if self.target is not None and self.retries == 0:
+            self.learn_offset(on_target, server_time)
+        self.retries = 0 if on_target or self.target is None else self.retries + 1
+        if not new:
+            self.stale += 1
+            return False
+
+        if self.server_time is not None and server_time > self.server_time:
+            self.gaps.append(server_time - self.server_time)
+        observed: float = self.wall_clock() - server_time
+        if self.offset is None or observed < self.offset and on_target:
+            self.offset = self.good_offset = observed
+        self.server_time = server_time
+        self.timestamp = timestamp
+        self.updates += 1
+        return True
+
+    def learn_offset(self, on_time: bool, server_time: float) -> None:
+        if not on_time:
+            self.on_time = 0
+            self.early_offset = self.offset
+            self.offset = max(self.good_offset, self.offset + self.probe)
+            self.step = self.probe
+            return
+        self.good_offset = self.offset
+        self.on_time += 1
+        if self.early_offset is None:
+            self.offset -= self.step
+            self.step = min(self.step * 2, (server_time - self.server_time) / 4)
+        elif self.offset - self.early_offset > self.probe:
+            self.offset = (self.offset + self.early_offset) / 2
+        elif self.on_time >= self.history:
+            self.early_offset -= self.probe
+            self.on_time = 0
+
+    def delay(self) -> float:
+        now: float = self.clock()
+        if self.failures:
+            self.due = None
+            self.target = None
+            cap: float = min(self.max_backoff, self.seconds * 2 ** min(self.failures, 16))
+            return self.seconds / 2 + self.rng.uniform(0, cap - self.seconds / 2)
+
+        period: Optional[float] = self.period
+        if self.adaptive and period is not None and self.retries:
+            self.due = now + min(self.seconds, max(1.0, period / 10) * 2 ** min(self.retries - 1, 8))
+            return self.due - now
+
+        due: float = self.due + self.seconds if self.due is not None else now + self.seconds
+        if due < now:
+            due += math.ceil((now - due) / self.seconds) * self.seconds
+        if self.adaptive and period is not None:
+            last_update: float = now + self.server_time + self.offset + self.margin - self.wall_clock()
+            updates: int = max(1, round((due - last_update) / period))
+            if last_update + updates * period <= now:
+                updates = math.floor((now - last_update) / period) + 1
+            due = last_update + updates * period
+            self.target = self.server_time + updates * period
+        else:
+            self.target = None
+        self.due = due
+        return max(0.0, due - now)
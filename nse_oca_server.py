@@ -0,0 +1,247 @@
+import argparse
+import datetime
+import http.cookies
+import http.server
+import random
+import secrets
+import socketserver
+import statistics
+import sys
+import threading
+import time
+import urllib.parse
+from typing import Optional, List, Dict, Tuple, Any
+
+import nse_oca_chain
+
+indices: Dict[str, Tuple[float, float]] = {
+    'NIFTY': (18000.0, 50.0), 'BANKNIFTY': (38000.0, 100.0), 'FINNIFTY': (18500.0, 50.0),
+    'MIDCPNIFTY': (8000.0, 25.0)}
+stocks: Dict[str, Tuple[float, float]] = {
+    'RELIANCE': (2400.0, 20.0), 'SBIN': (500.0, 5.0), 'TCS': (3400.0, 20.0), 'INFY': (1500.0, 20.0),
+    'HDFCBANK': (1600.0, 10.0)}
+
+
+class StandIn:
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 cookie_ttl: float = 300.0, update_seconds: float = 1.0, journal: Optional[str] = None,
+                 strikes: int = 120, expiries: int = 18, seed: Optional[int] = None) -> None:
+        self.latency: float = latency
+        self.jitter: float = jitter
+        self.error_rate: float = error_rate
+        self.cookie_ttl: float = cookie_ttl
+        self.update_seconds: float = update_seconds
+        self.strikes: int = strikes
+        self.expiries: int = expiries
+        self.rng: random.Random = random.Random(seed)
+        self.lock: threading.Lock = threading.Lock()
+        self.tokens: Dict[str, float] = {}
+        self.values: Dict[str, float] = {symbol: value for symbol, (value, step) in {**indices, **stocks}.items()}
+        self.chains: Dict[str, Tuple[int, bytes]] = {}
+        self.recorded: Dict[str, List[bytes]] = {}
+        self.positions: Dict[str, int] = {}
+        if journal is not None:
+            import nse_oca_capture
+            for fetched_at, symbol, content in nse_oca_capture.read_journal(journal):
+                self.recorded.setdefault(symbol, []).append(content)
+        self.requests: int = 0
+        self.handshakes: int = 0
+        self.unauthorized: int = 0
+        self.errors: int = 0
+
+    def issue_cookie(self) -> str:
+        token: str = secrets.token_hex(16)
+        with self.lock:
+            self.tokens[token] = time.monotonic() + self.cookie_ttl
+            self.handshakes += 1
+        return token
+
+    def authorized(self, token: Optional[str]) -> bool:
+        with self.lock:
+            expires_at: Optional[float] = self.tokens.get(token) if token is not None else None
+            if expires_at is None or expires_at < time.monotonic():
+                self.tokens.pop(token, None)
+                self.unauthorized += 1
+                return False
+            return True
+
+    def delay(self) -> None:
+        with self.lock:
+            self.requests += 1
+            seconds: float = self.latency + self.rng.uniform(0, self.jitter)
+            failed: bool = self.rng.random() < self.error_rate
+            if failed:
+                self.errors += 1
+        if seconds > 0:
+            time.sleep(seconds)
+        if failed:
+            raise ConnectionError
+
+    def chain(self, symbol: str) -> Optional[bytes]:
+        with self.lock:
+            if symbol in self.recorded:
+                position: int = self.positions.get(symbol, 0)
+                self.positions[symbol] = (position + 1) % len(self.recorded[symbol])
+                return self.recorded[symbol][position]
+            if symbol not in self.values:
+                return
+            tick: int = int(time.time() // self.update_seconds)
+            cached: Optional[Tuple[int, bytes]] = self.chains.get(symbol)
+            if cached is not None and cached[0] == tick:
+                return cached[1]
+            step: float = indices[symbol][1] if symbol in indices else stocks[symbol][1]
+            self.values[symbol] = round(self.values[symbol] + self.rng.gauss(0, step / 5), 2)
+            timestamp: datetime.datetime = datetime.datetime.fromtimestamp(tick * self.update_seconds)
+            content: bytes = nse_oca_chain.json_dumps(nse_oca_chain.synthetic_payload(
+                symbol, self.values[symbol], strikes=self.strikes, expiries=self.expiries, step=step,
+                timestamp=timestamp.replace(microsecond=0), seed=tick))
+            self.chains[symbol] = (tick, content)
+            return content
+
+    def symbols_page(self) -> bytes:
+        def row(number: int, name: str, symbol: str) -> str:
+            return f'<tr>\n<td>{number}</td>\n<td>{name}</td>\n<td>{symbol}</td>\n</tr>\n'
+
+        rows: List[str] = ['<tr>\n<th>Sr. No.</th>\n<th>Underlying</th>\n<th>Symbol</th>\n</tr>\n']
+        rows.extend(row(number, symbol.title(), symbol) for number, symbol in enumerate(indices, 1))
+        rows.append('<tr>\n<td colspan="3"><strong>Derivatives on Individual Securities</strong></td>\n</tr>\n')
+        rows.extend(row(number, symbol.title(), symbol) for number, symbol in enumerate(stocks, 1))
+        return f"<html><body><table>\n{''.join(rows)}</table></body></html>".encode()
+
+
+class StandInHandler(http.server.BaseHTTPRequestHandler):
+    server_version: str = "NSE-OCA-StandIn"
+    protocol_version: str = "HTTP/1.1"
+
+    def send_body(self, status: int, content: bytes, content_type: str = 'application/json',
+                  headers: Optional[Dict[str, str]] = None) -> None:
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(content)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(content)
+
+    def do_GET(self) -> None:
+        stand_in: StandIn = self.server.stand_in
+        url: urllib.parse.SplitResult = urllib.parse.urlsplit(self.path)
+        try:
+            stand_in.delay()
+        except ConnectionError:
+            self.send_body(503, b'{}')
+            return
+        if url.path == '/option-chain':
+            cookie: str = f'nsit={stand_in.issue_cookie()}; Path=/; Max-Age={max(1, int(stand_in.cookie_ttl))}'
+            self.send_body(200, b'<html><body>Option Chain</body></html>', 'text/html', {'Set-Cookie': cookie})
+        elif url.path in ('/api/option-chain-indices', '/api/option-chain-equities'):
+            cookies: http.cookies.SimpleCookie = http.cookies.SimpleCookie(self.headers.get('Cookie', ''))
+            if not stand_in.authorized(cookies['nsit'].value if 'nsit' in cookies else None):
+                self.send_body(401, b'{}')
+                return
+            symbol: str = urllib.parse.parse_qs(url.query).get('symbol', [''])[0]
+            content: Optional[bytes] = stand_in.chain(symbol)
+            self.send_body(200, content if content is not None else b'{}')
+        elif url.path == '/products-services/equity-derivatives-list-underlyings-information':
+            self.send_body(200, stand_in.symbols_page(), 'text/html')
+        else:
+            self.send_body(404, b'{}')
+
+    def log_message(self, format: str, *args: Any) -> None:
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class StandInServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    daemon_threads: bool = True
+
+    def __init__(self, address: Tuple[str, int], stand_in: StandIn, verbose: bool = False) -> None:
+        super().__init__(address, StandInHandler)
+        self.stand_in: StandIn = stand_in
+        self.verbose: bool = verbose
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.server_address[0]}:{self.server_address[1]}"
+
+
+def benchmark(server: StandInServer, ticks: int, symbol: str) -> None:
+    import nse_oca_engine
+    from nse_oca_client import NseClient
+
+    option_mode: str = 'Index' if symbol in indices else 'Stock'
+    round_factor: int = 1000 if option_mode == 'Index' else 10
+    client: NseClient = NseClient(pool_size=1, base_url=server.base_url, cookie_file=None)
+    latencies: List[float] = []
+    failed: int = 0
+    for _ in range(ticks):
+        start: float = time.perf_counter()
+        result: Optional[Tuple[Any, Any]] = client.fetch(symbol, option_mode)
+        if result is None:
+            failed += 1
+            continue
+        chain: nse_oca_chain.OptionChain = nse_oca_chain.extract_chain(result[1],
+                                                                        result[1]['records']['expiryDates'][0])
+        sp: float = float(chain.strike_price[len(chain) // 2])
+        nse_oca_engine.analyze(chain, sp, round_factor)
+        latencies.append((time.perf_counter() - start) * 1000)
+    client.close()
+
+    stand_in: StandIn = server.stand_in
+    print(f"ticks: {ticks}  ok: {len(latencies)}  failed: {failed}")
+    if latencies:
+        latencies.sort()
+        print(f"tick latency ms  p50: {statistics.median(latencies):.1f}  "
+              f"p95: {latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]:.1f}  "
+              f"max: {latencies[-1]:.1f}")
+    print(f"server requests: {stand_in.requests}  handshakes: {stand_in.handshakes}  "
+          f"401s: {stand_in.unauthorized}  injected errors: {stand_in.errors}")
+    print(f"client requests: {client.requests}  handshakes: {client.handshakes}  renewals: {client.renewals}  "
+          f"reconnects: {client.reconnects}")
+
+
+def main() -> None:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        description="Serve a local stand-in for the NSE option chain endpoints. Point the analyzer at it by setting "
+                    "base_url in NSE-OCA.ini or passing --base-url.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080, help="Port to listen on, 0 for any free port")
+    parser.add_argument('--latency', type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument('--jitter', type=float, default=0.0, help="Random extra seconds added to every response")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Fraction of requests answered with 503")
+    parser.add_argument('--cookie-ttl', type=float, default=300.0, help="Seconds until issued cookies expire")
+    parser.add_argument('--update-seconds', type=float, default=1.0,
+                        help="Seconds between new synthetic snapshots per symbol")
+    parser.add_argument('--replay', metavar='FILE', help="Serve recorded chains from a captured journal")
+    parser.add_argument('--strikes', type=int, default=120)
+    parser.add_argument('--expiries', type=int, default=18)
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--bench', type=int, metavar='TICKS',
+                        help="Fetch and analyze this many ticks against the server, print latencies and exit")
+    parser.add_argument('--symbol', default='NIFTY', help="Symbol used by --bench")
+    parser.add_argument('--verbose', action='store_true', help="Log every request")
+    args: argparse.Namespace = parser.parse_args()
+
+    stand_in: StandIn = StandIn(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                                cookie_ttl=args.cookie_ttl, update_seconds=args.update_seconds,
+                                journal=args.replay, strikes=args.strikes, expiries=args.expiries, seed=args.seed)
+    server: StandInServer = StandInServer((args.host, args.port), stand_in, verbose=args.verbose)
+    if args.bench is not None:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            benchmark(server, args.bench, args.symbol)
+        finally:
+            server.shutdown()
+            server.server_close()
+        return
+    print(f"Serving on {server.base_url}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+import argparse
+import os
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Optional, List, Tuple, Match
+
+from nse_oca_server import StandIn, StandInServer
+
+analyzer_path: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'NSE_Option_Chain_Analyzer.py')
+cache_files: Tuple[str, ...] = ('.NSE-OCA-symbols.json', '.NSE-OCA-cookies.json', '.NSE-OCA-update.json',
+                                '.NSE-OCA.png', '.NSE-OCA.ico')
+
+
+def clear_cache(directory: str) -> None:
+    for name in cache_files:
+        path: str = os.path.join(directory, name)
+        os.remove(path) if os.path.isfile(path) else None
+
+
+def launch(directory: str, timeout: float) -> Tuple[float, Optional[float], str]:
+    start: float = time.perf_counter()
+    completed: subprocess.CompletedProcess = subprocess.run(
+        [sys.executable, analyzer_path, '--startup-time'], cwd=directory, stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT, universal_newlines=True, timeout=timeout)
+    wall: float = time.perf_counter() - start
+    match: Optional[Match[str]] = re.search(r'Login window shown in ([\d.]+)s', completed.stdout)
+    return wall, float(match.group(1)) if match else None, completed.stdout
+
+
+def summarize(label: str, results: List[Tuple[float, Optional[float], str]]) -> None:
+    shown: List[float] = [result[1] for result in results if result[1] is not None]
+    failed: int = len(results) - len(shown)
+    if not shown:
+        print(f"{label}: all {failed} launches failed")
+        print(results[-1][2].strip(), file=sys.stderr)
+        return
+    walls: List[float] = [wall for wall, seconds, output in results if seconds is not None]
+    print(f"{label} launch s  window shown p50: {statistics.median(shown):.3f}  min: {min(shown):.3f}  "
+          f"max: {max(shown):.3f}  process p50: {statistics.median(walls):.3f}  failed: {failed}")
+
+
+def main() -> None:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        description="Launch the analyzer repeatedly until its login window shows and report cold (no cached "
+                    "symbols, cookies, icons or update check) and warm startup times.")
+    parser.add_argument('--runs', type=int, default=5, help="Launches per cold and warm round")
+    parser.add_argument('--base-url', help="Server to fetch symbols from, defaults to a local stand-in server")
+    parser.add_argument('--timeout', type=float, default=60.0, help="Seconds to wait for each launch")
+    args: argparse.Namespace = parser.parse_args()
+
+    directory: str = tempfile.mkdtemp(prefix='NSE-OCA-startup-')
+    server: Optional[StandInServer] = None
+    base_url: Optional[str] = args.base_url
+    if base_url is None:
+        server = StandInServer(('127.0.0.1', 0), StandIn())
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = server.base_url
+    with open(os.path.join(directory, 'NSE-OCA.ini'), 'w') as f:
+        f.write(f"[main]\nbase_url = {base_url}\n")
+    try:
+        for label, cold in (('cold', True), ('warm', False)):
+            results: List[Tuple[float, Optional[float], str]] = []
+            for _ in range(args.runs):
+                clear_cache(directory) if cold else None
+                results.append(launch(directory, args.timeout))
+            summarize(label, results)
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,316 @@
+import argparse
+import csv
+import datetime
+import os
+import queue
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from typing import Optional, List, Dict, Tuple, BinaryIO, TextIO, Any, Union
+
+import numpy
+
+import nse_oca_chain
+from nse_oca_chain import OptionChain
+
+store_directory: str = "NSE-OCA-store"
+timestamp_format: str = '%d-%b-%Y %H:%M:%S'
+fields: Tuple[str, ...] = nse_oca_chain.csv_fields
+field_dtypes: Dict[str, numpy.dtype] = {
+    field: numpy.dtype('<i8' if field.partition('_')[2] in nse_oca_chain.int_fields else '<f8') for field in fields}
+index_dtype: numpy.dtype = numpy.dtype([('server_time', '<f8'), ('underlying_value', '<f8'), ('start', '<i8'),
+                                        ('count', '<i8')])
+
+
+def partition_path(symbol: str, expiry_date: str, day: str, directory: str = store_directory) -> str:
+    return os.path.join(directory, symbol, expiry_date, day)
+
+
+def column_path(path: str, field: str) -> str:
+    return os.path.join(path, f"{field}.bin")
+
+
+def index_path(path: str) -> str:
+    return os.path.join(path, "index.bin")
+
+
+def file_items(path: str, dtype: numpy.dtype) -> int:
+    return os.path.getsize(path) // dtype.itemsize if os.path.isfile(path) else 0
+
+
+def map_file(path: str, dtype: numpy.dtype, items: int) -> numpy.ndarray:
+    if items == 0:
+        return numpy.empty(0, dtype=dtype)
+    return numpy.memmap(path, dtype=dtype, mode='r', shape=(items,))
+
+
+def complete_index(path: str) -> numpy.ndarray:
+    index: numpy.ndarray = numpy.fromfile(index_path(path), dtype=index_dtype,
+                                          count=file_items(index_path(path), index_dtype)) \
+        if os.path.isfile(index_path(path)) else numpy.empty(0, dtype=index_dtype)
+    rows: int = min(file_items(column_path(path, field), field_dtypes[field]) for field in fields)
+    return index[:int(numpy.searchsorted(index['start'] + index['count'], rows, side='right'))]
+
+
+class Partition:
+    def __init__(self, path: str) -> None:
+        self.path: str = path
+        os.makedirs(path, exist_ok=True)
+        index: numpy.ndarray = complete_index(path)
+        self.ticks: int = len(index)
+        self.rows: int = int(index['start'][-1] + index['count'][-1]) if self.ticks else 0
+        self.last_server_time: Optional[float] = float(index['server_time'][-1]) if self.ticks else None
+        self.files: Dict[str, BinaryIO] = {}
+        for field in fields:
+            self.files[field] = self.open(column_path(path, field), self.rows * field_dtypes[field].itemsize)
+        self.index_file: BinaryIO = self.open(index_path(path), self.ticks * index_dtype.itemsize)
+
+    def open(self, path: str, size: int) -> BinaryIO:
+        f: BinaryIO = open(path, 'ab')
+        if f.tell() > size:
+            f.truncate(size)
+        return f
+
+    def append(self, chain: OptionChain, server_time: float) -> bool:
+        if server_time == self.last_server_time or len(chain) == 0:
+            return False
+        for field, f in self.files.items():
+            f.write(numpy.ascontiguousarray(getattr(chain, field), dtype=field_dtypes[field]).tobytes())
+            f.flush()
+        record: numpy.ndarray = numpy.array([(server_time, chain.underlying_value, self.rows, len(chain))],
+                                            dtype=index_dtype)
+        self.index_file.write(record.tobytes())
+        self.index_file.flush()
+        self.rows += len(chain)
+        self.ticks += 1
+        self.last_server_time = server_time
+        return True
+
+    def close(self) -> None:
+        for f in self.files.values():
+            f.close()
+        self.index_file.close()
+
+
+class SnapshotStore:
+    def __init__(self, directory: str = store_directory) -> None:
+        self.directory: str = directory
+        self.lock: threading.Lock = threading.Lock()
+        self.partitions: Dict[Tuple[str, str, str], Partition] = {}
+        self.snapshots: int = 0
+
+    def append(self, symbol: str, chain: OptionChain) -> bool:
+        server_time: datetime.datetime = datetime.datetime.strptime(chain.timestamp, timestamp_format)
+        key: Tuple[str, str, str] = (symbol, chain.expiry_date, server_time.strftime('%Y-%m-%d'))
+        with self.lock:
+            partition: Optional[Partition] = self.partitions.get(key)
+            if partition is None:
+                for old_key in [old_key for old_key in self.partitions if old_key[:2] == key[:2]]:
+                    self.partitions.pop(old_key).close()
+                partition = self.partitions[key] = Partition(partition_path(*key, directory=self.directory))
+            if not partition.append(chain, server_time.timestamp()):
+                return False
+            self.snapshots += 1
+            return True
+
+    def close(self) -> None:
+        with self.lock:
+            for partition in self.partitions.values():
+                partition.close()
+            self.partitions.clear()
+
+
+class SnapshotWriter:
+    def __init__(self, directory: str = store_directory) -> None:
+        self.store: SnapshotStore = SnapshotStore(directory)
+        self.chains: queue.Queue = queue.Queue()
+        self.failing: bool = False
+        self.failed: Optional[Exception] = None
+        self.thread: threading.Thread = threading.Thread(target=self.run, name="NSE-OCA-Store", daemon=True)
+        self.thread.start()
+
+    def write(self, symbol: str, chain: OptionChain) -> None:
+        self.chains.put((symbol, chain))
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        flushed: threading.Event = threading.Event()
+        self.chains.put(flushed)
+        return flushed.wait(timeout)
+
+    def stop(self, timeout: Optional[float] = 5.0) -> None:
+        self.chains.put(None)
+        self.thread.join(timeout)
+
+    def error(self) -> Optional[Exception]:
+        failed: Optional[Exception] = self.failed
+        self.failed = None
+        return failed
+
+    def run(self) -> None:
+        while True:
+            item: Union[Tuple[str, OptionChain], threading.Event, None] = self.chains.get()
+            if item is None:
+                self.close()
+                return
+            if isinstance(item, threading.Event):
+                item.set()
+                continue
+            try:
+                self.store.append(*item)
+            except (OSError, ValueError) as err:
+                self.close()
+                if not self.failing:
+                    print(err, sys.exc_info()[0], "16")
+                    self.failing = True
+                    self.failed = err
+                continue
+            self.failing = False
+
+    def close(self) -> None:
+        try:
+            self.store.close()
+        except OSError as err:
+            print(err, sys.exc_info()[0], "47")
+
+
+class PartitionReader:
+    def __init__(self, path: str) -> None:
+        self.path: str = path
+        self.expiry_date: str = os.path.basename(os.path.dirname(os.path.normpath(path)))
+        self.index: numpy.ndarray = complete_index(path)
+        self.rows: int = int(self.index['start'][-1] + self.index['count'][-1]) if len(self.index) else 0
+        self.columns: Dict[str, numpy.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def timestamp(self, tick: int) -> str:
+        return datetime.datetime.fromtimestamp(float(self.index['server_time'][tick])).strftime(timestamp_format)
+
+    def find(self, timestamp: str) -> int:
+        server_time: float = datetime.datetime.strptime(timestamp, timestamp_format).timestamp()
+        return max(0, int(numpy.searchsorted(self.index['server_time'], server_time, side='right')) - 1)
+
+    def column(self, field: str) -> numpy.ndarray:
+        if field not in self.columns:
+            self.columns[field] = map_file(column_path(self.path, field), field_dtypes[field], self.rows)
+        return self.columns[field]
+
+    def values(self, field: str, tick: int) -> numpy.ndarray:
+        start: int = int(self.index['start'][tick])
+        return numpy.array(self.column(field)[start:start + int(self.index['count'][tick])])
+
+    def snapshot(self, tick: int = -1) -> OptionChain:
+        columns: Dict[str, numpy.ndarray] = {field: self.values(field, tick) for field in fields}
+        return OptionChain(expiry_date=self.expiry_date, timestamp=self.timestamp(tick),
+                           underlying_value=float(self.index['underlying_value'][tick]),
+                           strike_rows=dict(zip(columns['strike_price'].tolist(), range(len(columns['strike_price'])))),
+                           **columns)
+
+    def strike_series(self, field: str, strike_price: float) -> numpy.ndarray:
+        rows: numpy.ndarray = numpy.flatnonzero(self.column('strike_price') == strike_price)
+        series: numpy.ndarray = numpy.full(len(self.index), numpy.nan)
+        ticks: numpy.ndarray = numpy.searchsorted(self.index['start'], rows, side='right') - 1
+        series[ticks] = self.column(field)[rows]
+        return series
+
+
+def partitions(directory: str = store_directory, symbol: Optional[str] = None) -> List[Tuple[str, str, str]]:
+    found: List[Tuple[str, str, str]] = []
+    for path, directories, files in os.walk(directory):
+        if 'index.bin' in files:
+            found.append(tuple(os.path.relpath(path, directory).split(os.sep)))
+    return sorted(key for key in found if len(key) == 3 and (symbol is None or key[0] == symbol))
+
+
+def write_csv(chain: OptionChain, stream: TextIO) -> None:
+    data_writer: csv.writer = csv.writer(stream)
+    data_writer.writerow(nse_oca_chain.csv_headers)
+    data_writer.writerows(chain.rows())
+
+
+def benchmark(ticks: int) -> None:
+    json_data: Any = nse_oca_chain.synthetic_payload(seed=0)
+    chain: OptionChain = nse_oca_chain.extract_chain(json_data, json_data['records']['expiryDates'][0])
+    directory: str = tempfile.mkdtemp(prefix='NSE-OCA-store-')
+    try:
+        start: float = time.perf_counter()
+        for tick in range(ticks):
+            with open(os.path.join(directory, 'Full.csv'), 'w', newline='') as f:
+                write_csv(chain, f)
+        csv_time: float = (time.perf_counter() - start) / ticks
+
+        store: SnapshotStore = SnapshotStore(os.path.join(directory, store_directory))
+        base: datetime.datetime = datetime.datetime.strptime(chain.timestamp, timestamp_format).replace(hour=9)
+        start = time.perf_counter()
+        for tick in range(ticks):
+            store.append('NIFTY', OptionChain(**{
+                **chain._asdict(), 'timestamp': (base + datetime.timedelta(seconds=tick)).strftime(timestamp_format)}))
+        store_time: float = (time.perf_counter() - start) / ticks
+        store.close()
+
+        writer: SnapshotWriter = SnapshotWriter(os.path.join(directory, 'writer'))
+        start = time.perf_counter()
+        for tick in range(ticks):
+            writer.write('NIFTY', OptionChain(**{
+                **chain._asdict(), 'timestamp': (base + datetime.timedelta(seconds=tick)).strftime(timestamp_format)}))
+        writer_time: float = (time.perf_counter() - start) / ticks
+        writer.stop(None)
+
+        path: str = partition_path('NIFTY', chain.expiry_date, base.strftime('%Y-%m-%d'),
+                                   os.path.join(directory, store_directory))
+        start = time.perf_counter()
+        reader: PartitionReader = PartitionReader(path)
+        reader.snapshot(len(reader) // 2)
+        read_time: float = time.perf_counter() - start
+        size: int = sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+        print(f"{ticks} ticks of {len(chain)} strikes")
+        print(f"overwrite Full.csv: {csv_time * 1000:.2f} ms per tick, keeps the last tick only")
+        print(f"append to store:    {store_time * 1000:.2f} ms per tick, {size / ticks / 1024:.1f} KB per tick")
+        print(f"append via writer:  {writer_time * 1000:.2f} ms per tick on the caller")
+        print(f"read one tick:      {read_time * 1000:.2f} ms from {size / 1024 / 1024:.1f} MB")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def main() -> None:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        description="List the stored option chain snapshots or export one of them to CSV.")
+    parser.add_argument('--directory', default=store_directory)
+    parser.add_argument('--symbol')
+    parser.add_argument('--expiry', help="Expiry date of the snapshot to export, e.g. 25-Nov-2021")
+    parser.add_argument('--day', help="Day of the snapshot to export, e.g. 2021-11-25 (default: latest)")
+    parser.add_argument('--time', help="Server time to export, e.g. '25-Nov-2021 15:30:00' (default: latest)")
+    parser.add_argument('--output', help="CSV file to export to (default: standard output)")
+    parser.add_argument('--bench', type=int, metavar='TICKS',
+                        help="Compare overwriting a CSV with appending to the store for this many ticks and exit")
+    args: argparse.Namespace = parser.parse_args()
+    if args.bench is not None:
+        benchmark(args.bench)
+        return
+
+    found: List[Tuple[str, str, str]] = partitions(args.directory, args.symbol)
+    if args.expiry is None:
+        for symbol, expiry_date, day in found:
+            print(f"{symbol}\t{expiry_date}\t{day}\t"
+                  f"{len(PartitionReader(partition_path(symbol, expiry_date, day, args.directory)))} ticks")
+        return
+    matches: List[Tuple[str, str, str]] = [key for key in found if key[1] == args.expiry and
+                                           (args.day is None or key[2] == args.day)]
+    if args.symbol is None or not matches:
+        parser.error("no snapshots found, pass --symbol and an --expiry listed without them")
+    reader: PartitionReader = PartitionReader(partition_path(*matches[-1], directory=args.directory))
+    if len(reader) == 0:
+        parser.error("no complete snapshots in the partition")
+    chain: OptionChain = reader.snapshot(reader.find(args.time) if args.time is not None else -1)
+    if args.output is None:
+        write_csv(chain, sys.stdout)
+        return
+    with open(args.output, 'w', newline='') as f:
+        write_csv(chain, f)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+import html.parser
+import json
+import os
+import sys
+import threading
+import time
+from typing import Optional, List, Dict, Tuple, Any
+
+
+class SymbolTableParser(html.parser.HTMLParser):
+    divider: str = "Derivatives on Individual Securities"
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.indices: List[str] = []
+        self.stocks: List[str] = []
+        self.tables: int = 0
+        self.in_cell: bool = False
+        self.cells: List[str] = []
+        self.stock_section: bool = False
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        if tag == 'table':
+            self.tables += 1
+        elif self.tables == 1:
+            if tag == 'tr':
+                self.cells = []
+            elif tag == 'td':
+                self.in_cell = True
+                self.cells.append('')
+
+    def handle_endtag(self, tag: str) -> None:
+        if self.tables != 1:
+            return
+        if tag == 'td':
+            self.in_cell = False
+        elif tag == 'tr':
+            if len(self.cells) == 1 and self.cells[0].strip() == self.divider:
+                self.stock_section = True
+            elif len(self.cells) >= 3 and self.cells[2].strip():
+                (self.stocks if self.stock_section else self.indices).append(self.cells[2].strip())
+            self.cells = []
+        elif tag == 'table':
+            self.tables += 1
+
+    def handle_data(self, data: str) -> None:
+        if self.in_cell:
+            self.cells[-1] += data
+
+
+def parse_symbols(content: bytes) -> Tuple[List[str], List[str]]:
+    parser: SymbolTableParser = SymbolTableParser()
+    parser.feed(content.decode('utf-8', 'replace'))
+    parser.close()
+    return parser.indices, parser.stocks
+
+
+class SymbolCache:
+    def __init__(self, url: str, headers: Dict[str, str], path: str = ".NSE-OCA-symbols.json",
+                 ttl: float = 86400, timeout: float = 10) -> None:
+        self.url: str = url
+        self.headers: Dict[str, str] = headers
+        self.path: str = path
+        self.ttl: float = ttl
+        self.timeout: float = timeout
+        self.fetched: float = 0.0
+        self.refresh_thread: Optional[threading.Thread] = None
+
+    def load(self) -> Optional[Tuple[List[str], List[str]]]:
+        if not os.path.isfile(self.path):
+            return
+        try:
+            with open(self.path) as f:
+                cached: Dict[str, Any] = json.load(f).get(self.url, {})
+        except (OSError, ValueError, AttributeError) as err:
+            print(err, sys.exc_info()[0], "37")
+            return
+        if not cached.get('indices') or not cached.get('stocks'):
+            return
+        self.fetched = cached.get('fetched', 0.0)
+        return cached['indices'], cached['stocks']
+
+    @property
+    def expired(self) -> bool:
+        return time.time() - self.fetched > self.ttl
+
+    def fetch(self) -> Tuple[List[str], List[str]]:
+        import requests
+
+        response: requests.Response = requests.get(self.url, headers=self.headers, timeout=self.timeout)
+        indices: List[str]
+        stocks: List[str]
+        indices, stocks = parse_symbols(response.content)
+        if not indices or not stocks:
+            raise ValueError(f"No symbols found in {self.url}")
+        self.fetched = time.time()
+        self.save(indices, stocks)
+        return indices, stocks
+
+    def save(self, indices: List[str], stocks: List[str]) -> None:
+        try:
+            with open(self.path) as f:
+                cached: Dict[str, Any] = json.load(f)
+        except (OSError, ValueError):
+            cached = {}
+        cached[self.url] = {'fetched': self.fetched, 'indices': indices, 'stocks': stocks}
+        try:
+            with open(f"{self.path}.tmp", 'w') as f:
+                json.dump(cached, f)
+            os.replace(f"{self.path}.tmp", self.path)
+        except OSError as err:
+            print(err, sys.exc_info()[0], "38")
+
+    def refresh(self) -> None:
+        try:
+            self.fetch()
+        except Exception as err:
+            print(err, sys.exc_info()[0], "39")
+
+    def refresh_in_background(self) -> None:
+        if self.refresh_thread is not None and self.refresh_thread.is_alive():
+            return
+        self.refresh_thread = threading.Thread(target=self.refresh, name="NSE-OCA-Symbols", daemon=True)
+        self.refresh_thread.start()
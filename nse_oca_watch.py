@@ -0,0 +1,124 @@
+import argparse
+import concurrent.futures
+import sys
+import time
+from typing import Optional, List, Dict, Tuple, Any, Callable
+
+import nse_oca_chain
+import nse_oca_engine
+from nse_oca_client import NseClient
+
+
+class SymbolState:
+    def __init__(self, symbol: str, option_mode: str, expiry_date: Optional[str] = None) -> None:
+        self.symbol: str = symbol
+        self.option_mode: str = option_mode
+        self.pinned_expiry_date: Optional[str] = expiry_date
+        self.expiry_date: Optional[str] = expiry_date
+        self.round_factor: int = 1000 if option_mode == 'Index' else 10
+        self.timestamp: Optional[str] = None
+        self.points: float = 0.0
+        self.boundaries: Optional[nse_oca_engine.OiBoundaries] = None
+        self.levels: Optional[nse_oca_engine.OiLevels] = None
+        self.updates: int = 0
+        self.skipped: int = 0
+        self.errors: int = 0
+
+    def update(self, json_data: Any) -> bool:
+        records: Dict[str, Any] = json_data['records']
+        if records['timestamp'] == self.timestamp:
+            self.skipped += 1
+            return False
+        expiry_date: str = self.pinned_expiry_date if self.pinned_expiry_date is not None else \
+            records['expiryDates'][0]
+        chain: nse_oca_chain.OptionChain = nse_oca_chain.extract_chain(json_data, expiry_date)
+        if len(chain) == 0:
+            self.errors += 1
+            return False
+
+        self.boundaries = nse_oca_engine.oi_boundaries(chain, self.round_factor)
+        self.levels = nse_oca_engine.oi_levels(chain)
+        self.points = chain.underlying_value
+        self.timestamp = chain.timestamp
+        self.expiry_date = expiry_date
+        self.updates += 1
+        return True
+
+
+class WatchList:
+    def __init__(self, symbols: List[Tuple[str, str]], max_workers: int = 4,
+                 client: Optional[NseClient] = None) -> None:
+        self.max_workers: int = max(1, min(max_workers, len(symbols)))
+        self.client: NseClient = client if client is not None else NseClient(pool_size=self.max_workers)
+        self.states: Dict[str, SymbolState] = {symbol: SymbolState(symbol, option_mode)
+                                               for symbol, option_mode in symbols}
+        self.executor: concurrent.futures.ThreadPoolExecutor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="NSE-OCA-Watch")
+
+    def poll_symbol(self, state: SymbolState) -> bool:
+        result: Optional[Tuple[Any, Any]] = self.client.fetch(state.symbol, state.option_mode)
+        if result is None:
+            state.errors += 1
+            return False
+        try:
+            return state.update(result[1])
+        except (KeyError, TypeError, ValueError, IndexError) as err:
+            print(err, sys.exc_info()[0], "26")
+            state.errors += 1
+            return False
+
+    def poll(self) -> List[SymbolState]:
+        futures: Dict[concurrent.futures.Future, SymbolState] = {
+            self.executor.submit(self.poll_symbol, state): state for state in self.states.values()}
+        updated: List[SymbolState] = []
+        for future in concurrent.futures.as_completed(futures):
+            if future.result():
+                updated.append(futures[future])
+        return updated
+
+    def run(self, seconds: float, callback: Callable[[List[SymbolState]], None]) -> None:
+        next_poll: float = time.monotonic()
+        while True:
+            callback(self.poll())
+            next_poll += seconds
+            time.sleep(max(0.0, next_poll - time.monotonic()))
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=False)
+        self.client.close()
+
+
+def print_states(states: List[SymbolState]) -> None:
+    for state in sorted(states, key=lambda item: item.symbol):
+        boundaries: nse_oca_engine.OiBoundaries = state.boundaries
+        levels: nse_oca_engine.OiLevels = state.levels
+        print(f"{state.timestamp}\t{state.symbol}\t{state.expiry_date}\t{state.points}\t"
+              f"PCR {boundaries.put_call_ratio}\tCall OI {boundaries.max_call_oi} @ {boundaries.max_call_oi_sp}\t"
+              f"Put OI {boundaries.max_put_oi} @ {boundaries.max_put_oi_sp}\tMax Pain {levels.max_pain}\t"
+              f"Support {levels.support}\tResistance {levels.resistance}", flush=True)
+
+
+def main() -> None:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description="Watch several NSE option chains at once.")
+    parser.add_argument('--indices', nargs='*', default=[], help="Index symbols, eg. NIFTY BANKNIFTY")
+    parser.add_argument('--stocks', nargs='*', default=[], help="Stock symbols, eg. RELIANCE SBIN")
+    parser.add_argument('--workers', type=int, default=4, help="Maximum concurrent requests")
+    parser.add_argument('--seconds', type=float, default=60, help="Refresh interval in seconds")
+    parser.add_argument('--base-url', help="Option chain server (default: NSE)")
+    args: argparse.Namespace = parser.parse_args()
+    symbols: List[Tuple[str, str]] = [(symbol, 'Index') for symbol in args.indices] + \
+                                     [(symbol, 'Stock') for symbol in args.stocks]
+    if not symbols:
+        parser.error("at least one index or stock is required")
+    watch_list: WatchList = WatchList(symbols, max_workers=args.workers,
+                                      client=NseClient(pool_size=max(1, args.workers), base_url=args.base_url))
+    try:
+        watch_list.run(args.seconds, print_states)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watch_list.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,160 @@
+import datetime
+import os
+import types
+from typing import Any, Dict, List, Tuple
+
+import pytest
+
+import nse_oca_capture
+import nse_oca_chain
+from nse_oca_capture import Journal, ReplaySource
+
+first_tick: datetime.datetime = datetime.datetime(2021, 11, 25, 9, 15)
+
+
+def payloads(ticks: int, symbol: str = 'NIFTY') -> List[bytes]:
+    return [nse_oca_chain.json_dumps(nse_oca_chain.synthetic_payload(
+        symbol, strikes=10, expiries=2, seed=tick, timestamp=first_tick + datetime.timedelta(minutes=tick)))
+        for tick in range(ticks)]
+
+
+def records() -> List[Tuple[float, str, bytes]]:
+    fetched_at: float = first_tick.timestamp()
+    nifty: List[bytes] = payloads(4)
+    banknifty: List[bytes] = payloads(3, 'BANKNIFTY')
+    return [(fetched_at, 'NIFTY', nifty[0]), (fetched_at + 1, 'BANKNIFTY', banknifty[0]),
+            (fetched_at + 60, 'NIFTY', nifty[1]), (fetched_at + 61, 'BANKNIFTY', banknifty[1]),
+            (fetched_at + 120, 'NIFTY', nifty[2]), (fetched_at + 180, 'NIFTY', nifty[3]),
+            (fetched_at + 181, 'BANKNIFTY', banknifty[2])]
+
+
+def write_journal(path: str, entries: List[Tuple[float, str, bytes]]) -> Journal:
+    journal: Journal = Journal(path)
+    for fetched_at, symbol, content in entries:
+        journal.append(symbol, content, fetched_at)
+    return journal
+
+
+def test_round_trip(tmp_path: Any) -> None:
+    path: str = os.path.join(str(tmp_path), 'capture.journal.gz')
+    entries: List[Tuple[float, str, bytes]] = records()
+    journal: Journal = write_journal(path, entries[:3])
+    journal.close()
+    journal = write_journal(path, entries[3:])
+    assert journal.records == 4
+    journal.close()
+    assert list(nse_oca_capture.read_journal(path)) == entries
+
+
+def test_replay_filters_by_symbol(tmp_path: Any) -> None:
+    path: str = os.path.join(str(tmp_path), 'capture.journal.gz')
+    entries: List[Tuple[float, str, bytes]] = records()
+    write_journal(path, entries).close()
+
+    replay: ReplaySource = ReplaySource(path)
+    fetched: List[Dict[str, Any]] = []
+    while True:
+        result: Any = replay.fetch('NIFTY', 'Index')
+        if result is None:
+            break
+        assert result[0] is None
+        fetched.append(result[1])
+    assert replay.finished
+    assert replay.replayed == 4
+    assert fetched == [nse_oca_chain.json_loads(content) for _, symbol, content in entries if symbol == 'NIFTY']
+    assert nse_oca_chain.extract_chains(fetched[-1])
+
+    replay = ReplaySource(path)
+    assert [replay.next_content() for _ in entries] == [content for _, _, content in entries]
+    assert replay.next_content() is None
+    assert replay.finished
+
+
+def test_replay_skips_invalid_content(tmp_path: Any) -> None:
+    path: str = os.path.join(str(tmp_path), 'capture.journal.gz')
+    entries: List[Tuple[float, str, bytes]] = records()[:2]
+    write_journal(path, [(entries[0][0], 'NIFTY', b'<html>Resource not found</html>')] + entries).close()
+    replay: ReplaySource = ReplaySource(path)
+    assert replay.fetch('NIFTY') is None
+    assert not replay.finished
+    assert replay.fetch('NIFTY')[1] == nse_oca_chain.json_loads(entries[0][2])
+
+
+def test_replay_speed(tmp_path: Any, monkeypatch: Any) -> None:
+    path: str = os.path.join(str(tmp_path), 'capture.journal.gz')
+    entries: List[Tuple[float, str, bytes]] = records()
+    write_journal(path, entries).close()
+    clock: List[float] = [100.0]
+    sleeps: List[float] = []
+
+    def sleep(seconds: float) -> None:
+        sleeps.append(seconds)
+        clock[0] += seconds
+
+    monkeypatch.setattr(nse_oca_capture, 'time', types.SimpleNamespace(monotonic=lambda: clock[0], sleep=sleep))
+    replay: ReplaySource = ReplaySource(path, speed=60)
+    assert replay.next_content('NIFTY') == entries[0][2]
+    assert replay.next_content('NIFTY') == entries[2][2]
+    clock[0] += 0.5
+    assert replay.next_content('NIFTY') == entries[4][2]
+    clock[0] += 2
+    assert replay.next_content('NIFTY') == entries[5][2]
+    assert sleeps == [1.0, 0.5]
+
+
+def test_journal_is_readable_while_open(tmp_path: Any) -> None:
+    path: str = os.path.join(str(tmp_path), 'capture.journal.gz')
+    entries: List[Tuple[float, str, bytes]] = records()
+    journal: Journal = write_journal(path, entries[:4])
+    assert list(nse_oca_capture.read_journal(path)) == entries[:4]
+    journal.append(entries[4][1], entries[4][2], entries[4][0])
+    assert list(nse_oca_capture.read_journal(path)) == entries[:5]
+    journal.close()
+
+
+def test_truncated_journal_keeps_complete_records(tmp_path: Any) -> None:
+    path: str = os.path.join(str(tmp_path), 'capture.journal.gz')
+    entries: List[Tuple[float, str, bytes]] = records()
+    journal: Journal = write_journal(path, [])
+    ends: List[int] = []
+    for fetched_at, symbol, content in entries:
+        journal.append(symbol, content, fetched_at)
+        ends.append(os.path.getsize(path))
+    with open(path, 'rb') as f:
+        data: bytes = f.read()
+    journal.close()
+
+    truncated: str = os.path.join(str(tmp_path), 'truncated.journal.gz')
+    for size in sorted({*range(0, len(data), 97), *ends, *(end - 1 for end in ends), *(end + 1 for end in ends)}):
+        with open(truncated, 'wb') as f:
+            f.write(data[:size])
+        read: List[Tuple[float, str, bytes]] = list(nse_oca_capture.read_journal(truncated))
+        assert read == entries[:len(read)]
+        assert sum(end <= size for end in ends) <= len(read) <= sum(end - 4 <= size for end in ends), size
+
+
+@pytest.mark.parametrize('cut', [0, 2, 200])
+def test_journal_resumed_after_a_crash(tmp_path: Any, cut: int) -> None:
+    path: str = os.path.join(str(tmp_path), 'capture.journal.gz')
+    entries: List[Tuple[float, str, bytes]] = records()
+    journal: Journal = write_journal(path, entries[:3])
+    with open(path, 'rb') as f:
+        data: bytes = f.read()
+    journal.close()
+    with open(path, 'wb') as f:
+        f.write(data[:len(data) - cut])
+
+    write_journal(path, entries[3:5]).close()
+    write_journal(path, entries[5:]).close()
+    expected: List[Tuple[float, str, bytes]] = entries[:3] if cut < 4 else entries[:2]
+    assert list(nse_oca_capture.read_journal(path)) == expected + entries[3:]
+    assert len(list(nse_oca_capture.ReplaySource(path).records)) == len(expected) + 4
+
+
+def test_empty_journal(tmp_path: Any) -> None:
+    path: str = os.path.join(str(tmp_path), 'capture.journal.gz')
+    Journal(path).close()
+    assert list(nse_oca_capture.read_journal(path)) == []
+    open(path, 'wb').close()
+    assert list(nse_oca_capture.read_journal(path)) == []
+    assert ReplaySource(path).fetch('NIFTY') is None
@@ -0,0 +1,160 @@
+import os
+import threading
+import time
+import types
+from typing import Any, Iterator, List, Optional
+
+import pytest
+import requests
+
+import nse_oca_client
+from nse_oca_client import NseClient
+from nse_oca_server import StandIn, StandInServer
+
+
+@pytest.fixture
+def server() -> Iterator[StandInServer]:
+    server: StandInServer = StandInServer(('127.0.0.1', 0), StandIn(strikes=10, expiries=2, seed=0))
+    thread: threading.Thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+def client_of(server: StandInServer, **options: Any) -> NseClient:
+    return NseClient(pool_size=8, base_url=server.base_url, **{'cookie_file': None, **options})
+
+
+def wait_for(condition: Any, seconds: float = 5.0) -> bool:
+    deadline: float = time.monotonic() + seconds
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return bool(condition())
+
+
+def test_fetch(server: StandInServer) -> None:
+    client: NseClient = client_of(server)
+    result: Any = client.fetch('NIFTY', 'Index')
+    assert result is not None
+    assert result[1]['records']['underlyingValue'] > 0
+    assert client.fetch('RELIANCE', 'Stock') is not None
+    assert (server.stand_in.handshakes, client.handshakes, client.requests) == (1, 1, 2)
+    client.close()
+
+
+def test_concurrent_gets_share_one_handshake(server: StandInServer) -> None:
+    client: NseClient = client_of(server)
+    barrier: threading.Barrier = threading.Barrier(8)
+    statuses: List[Optional[int]] = []
+
+    def get() -> None:
+        barrier.wait()
+        response: Optional[requests.Response] = client.get('NIFTY', 'Index')
+        statuses.append(response.status_code if response is not None else None)
+
+    threads: List[threading.Thread] = [threading.Thread(target=get) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert statuses == [200] * 8
+    assert (server.stand_in.handshakes, client.handshakes, client.cookies_generation) == (1, 1, 1)
+
+    client.cookies_expire_at = time.time() - 1
+    barrier.reset()
+    threads = [threading.Thread(target=get) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert statuses == [200] * 16
+    assert (server.stand_in.handshakes, client.cookies_generation) == (2, 2)
+    assert server.stand_in.unauthorized == 0
+    client.close()
+
+
+def test_cookie_expiry_renews_once(server: StandInServer) -> None:
+    client: NseClient = client_of(server)
+    assert client.get('NIFTY', 'Index').status_code == 200
+    assert client.renew_window() == 30
+    client.cookies_expire_at = time.time() + 20
+    for _ in range(5):
+        assert client.get('NIFTY', 'Index').status_code == 200
+    assert wait_for(lambda: not client.renewing)
+    for _ in range(5):
+        assert client.get('NIFTY', 'Index').status_code == 200
+    assert client.renewals == 1
+    assert (server.stand_in.handshakes, client.cookies_generation) == (2, 2)
+    assert client.cookies_expire_at - time.time() > client.renew_window()
+    assert server.stand_in.unauthorized == 0
+    client.close()
+
+
+def test_renew_window() -> None:
+    client: NseClient = NseClient(cookie_file=None, renew_before=30, renew_fraction=0.25)
+    client.cookies_lifetime = 300
+    assert client.renew_window() == 30
+    client.cookies_lifetime = 40
+    assert client.renew_window() == 10
+    client.cookies_lifetime = -5
+    assert client.renew_window() == 0
+    client.close()
+
+
+def test_unauthorized_rehandshakes_and_retries_once(server: StandInServer) -> None:
+    client: NseClient = client_of(server)
+    assert client.get('NIFTY', 'Index').status_code == 200
+    server.stand_in.tokens.clear()
+    assert client.get('NIFTY', 'Index').status_code == 200
+    assert (server.stand_in.unauthorized, server.stand_in.handshakes, client.requests) == (1, 2, 3)
+
+    server.stand_in.cookie_ttl = 0
+    server.stand_in.tokens.clear()
+    assert client.get('NIFTY', 'Index') is None
+    assert (server.stand_in.unauthorized, server.stand_in.handshakes, client.requests) == (3, 3, 5)
+    client.close()
+
+
+def test_server_errors_back_off(server: StandInServer, monkeypatch: Any) -> None:
+    sleeps: List[float] = []
+    monkeypatch.setattr(nse_oca_client, 'time', types.SimpleNamespace(time=time.time, sleep=sleeps.append))
+    monkeypatch.setattr(nse_oca_client, 'random', types.SimpleNamespace(uniform=lambda low, high: high))
+    client: NseClient = client_of(server, retries=3, backoff=0.5, max_backoff=1.5)
+    assert client.get('NIFTY', 'Index').status_code == 200
+    server.stand_in.error_rate = 1.0
+    assert client.get('NIFTY', 'Index') is None
+    assert sleeps == [0.5, 1.0, 1.5]
+    assert (client.requests, server.stand_in.errors) == (5, 4)
+    server.stand_in.error_rate = 0.0
+    assert client.get('NIFTY', 'Index').status_code == 200
+    assert sleeps == [0.5, 1.0, 1.5]
+    assert server.stand_in.handshakes == 1
+    client.close()
+
+
+def test_cookies_are_persisted(server: StandInServer, tmp_path: Any) -> None:
+    cookie_file: str = os.path.join(str(tmp_path), 'cookies.json')
+    client: NseClient = client_of(server, cookie_file=cookie_file)
+    assert client.get('NIFTY', 'Index').status_code == 200
+    client.close()
+    assert os.path.isfile(cookie_file)
+
+    client = client_of(server, cookie_file=cookie_file)
+    assert client.cookies
+    assert client.get('NIFTY', 'Index').status_code == 200
+    assert (server.stand_in.handshakes, client.handshakes) == (1, 0)
+    client.close()
+
+    client = client_of(server, cookie_file=cookie_file, renew_before=client.cookies_expire_at - time.time() + 60)
+    assert not client.cookies
+    client.close()
+
+    with open(cookie_file, 'w') as f:
+        f.write('not json')
+    client = client_of(server, cookie_file=cookie_file)
+    assert not client.cookies
+    assert client.get('NIFTY', 'Index').status_code == 200
+    assert server.stand_in.handshakes == 2
+    client.close()
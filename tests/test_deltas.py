@@ -0,0 +1,101 @@
+from typing import Any, Dict, List, Union
+
+import numpy
+
+import nse_oca_chain
+import nse_oca_engine
+from nse_oca_chain import OptionChain
+from nse_oca_engine import DeltaEngine, StrikeDeltas
+
+
+def base_chain(strikes: int = 10) -> OptionChain:
+    json_data: Dict[str, Any] = nse_oca_chain.synthetic_payload(strikes=strikes, expiries=1, seed=0)
+    return nse_oca_chain.extract_chain(json_data, json_data['records']['expiryDates'][0])
+
+
+def changed(chain: OptionChain, rows: slice = slice(None), **offsets: Dict[int, float]) -> OptionChain:
+    columns: Dict[str, Any] = {field: value[rows] if isinstance(value, numpy.ndarray) else value
+                               for field, value in chain._asdict().items()}
+    columns['strike_rows'] = dict(zip(columns['strike_price'].tolist(), range(len(columns['strike_price']))))
+    for field, offset in offsets.items():
+        values: numpy.ndarray = columns[field].copy()
+        for row, amount in offset.items():
+            values[row] += amount
+        columns[field] = values
+    return OptionChain(**columns)
+
+
+def test_first_snapshot_has_no_deltas() -> None:
+    engine: DeltaEngine = DeltaEngine()
+    chain: OptionChain = base_chain()
+    assert engine.update(chain) is None
+    assert DeltaEngine().update_all({chain.expiry_date: chain}) == {}
+
+
+def test_unchanged_snapshot_has_no_changed_strikes() -> None:
+    engine: DeltaEngine = DeltaEngine()
+    chain: OptionChain = base_chain()
+    engine.update(chain)
+    deltas: StrikeDeltas = engine.update(changed(chain))
+    assert len(deltas) == 0
+    assert (engine.compared, engine.changed) == (10, 0)
+
+
+def test_buildup_labels() -> None:
+    engine: DeltaEngine = DeltaEngine()
+    chain: OptionChain = base_chain()
+    engine.update(chain)
+    deltas: StrikeDeltas = engine.update(changed(
+        chain, call_oi={1: 100, 2: -100, 3: 100, 4: -100}, call_ltp={1: 5, 2: 5, 3: -5, 4: -5, 5: 5},
+        put_oi={1: -100, 2: 100}, put_ltp={1: -5, 2: -5}, put_volume={6: 10}))
+    assert deltas.strike_price.tolist() == chain.strike_price[1:7].tolist()
+    rows: List[List[Union[str, float]]] = deltas.rows()
+    assert [row[-2] for row in rows] == ['Long Buildup', 'Short Covering', 'Short Buildup', 'Long Unwinding', '', '']
+    assert [row[-1] for row in rows] == ['Long Unwinding', 'Short Buildup', '', '', '', '']
+    assert deltas.column('call_oi').tolist() == [100, -100, 100, -100, 0, 0]
+    assert deltas.column('put_volume').tolist() == [0, 0, 0, 0, 0, 10]
+    assert (engine.compared, engine.changed) == (10, 6)
+
+
+def test_buildup_codes() -> None:
+    codes: numpy.ndarray = nse_oca_engine.buildup(numpy.array([1, -1, 1, -1, 0, 1]),
+                                                  numpy.array([1.0, 1.0, -1.0, -1.0, 1.0, 0.0]))
+    assert [nse_oca_engine.buildup_labels[code] for code in codes.tolist()] == [
+        'Long Buildup', 'Short Covering', 'Short Buildup', 'Long Unwinding', '', '']
+
+
+def test_implied_volatility_alone_is_not_a_change() -> None:
+    engine: DeltaEngine = DeltaEngine()
+    chain: OptionChain = base_chain()
+    engine.update(chain)
+    deltas: StrikeDeltas = engine.update(changed(chain, call_iv={0: 1.5}, put_iv={3: -0.5}, call_oi={3: 100},
+                                                 put_ltp={3: 2}))
+    assert deltas.strike_price.tolist() == [chain.strike_price[3]]
+    assert deltas.column('put_iv').tolist() == [-0.5]
+    assert deltas.column('put_ltp').tolist() == [2]
+
+
+def test_added_and_removed_strikes() -> None:
+    engine: DeltaEngine = DeltaEngine()
+    chain: OptionChain = base_chain(12)
+    engine.update(changed(chain, slice(0, 10)))
+    deltas: StrikeDeltas = engine.update(changed(chain, slice(2, 12), call_oi={1: 100, 9: 100}, put_oi={0: -50}))
+    assert deltas.strike_price.tolist() == chain.strike_price[[2, 3]].tolist()
+    assert deltas.column('put_oi').tolist() == [-50, 0]
+    assert deltas.column('call_oi').tolist() == [0, 100]
+    assert (engine.compared, engine.changed) == (8, 2)
+    deltas = engine.update(changed(chain, slice(2, 12), call_oi={1: 100, 9: 300}, put_oi={0: -50}))
+    assert deltas.strike_price.tolist() == [chain.strike_price[11]]
+    assert deltas.column('call_oi').tolist() == [200]
+
+
+def test_expiries_are_kept_apart() -> None:
+    engine: DeltaEngine = DeltaEngine()
+    json_data: Dict[str, Any] = nse_oca_chain.synthetic_payload(strikes=10, expiries=2, seed=0)
+    chains: Dict[str, OptionChain] = nse_oca_chain.extract_chains(json_data)
+    engine.update_all(chains)
+    first, second = chains
+    deltas: Dict[str, StrikeDeltas] = engine.update_all({first: changed(chains[first], call_oi={0: 100}),
+                                                         second: chains[second]})
+    assert len(deltas[first]) == 1
+    assert len(deltas[second]) == 0
@@ -0,0 +1,242 @@
+import random
+from typing import Optional, List, Dict, Tuple, Any
+
+import pytest
+
+import nse_oca_chain
+import nse_oca_engine
+from nse_oca_chain import OptionChain
+
+pandas = pytest.importorskip('pandas')
+
+round_factor: int = 1000
+
+
+def payload(seed: int, strikes: int = 30, call_oi: Optional[List[int]] = None,
+            put_oi: Optional[List[int]] = None) -> Tuple[Dict[str, Any], str]:
+    json_data: Dict[str, Any] = nse_oca_chain.synthetic_payload(strikes=strikes, expiries=2, seed=seed)
+    expiry_date: str = json_data['records']['expiryDates'][0]
+    rows: List[Dict[str, Any]] = [row for row in json_data['records']['data'] if row['expiryDate'] == expiry_date]
+    for i, row in enumerate(rows):
+        if call_oi is not None:
+            row['CE']['openInterest'] = call_oi[i]
+        if put_oi is not None:
+            row['PE']['openInterest'] = put_oi[i]
+    return json_data, expiry_date
+
+
+def old_dataframe(json_data: Dict[str, Any], expiry_date: str) -> pandas.DataFrame:
+    ce_values: List[dict] = [data['CE'] for data in json_data['records']['data'] if "CE" in data]
+    pe_values: List[dict] = [data['PE'] for data in json_data['records']['data'] if "PE" in data]
+    ce_data: pandas.DataFrame = pandas.DataFrame(ce_values)
+    pe_data: pandas.DataFrame = pandas.DataFrame(pe_values)
+    ce_data_f: pandas.DataFrame = ce_data.loc[ce_data['expiryDate'] == expiry_date]
+    pe_data_f: pandas.DataFrame = pe_data.loc[pe_data['expiryDate'] == expiry_date]
+    columns_ce: List[str] = ['openInterest', 'changeinOpenInterest', 'totalTradedVolume', 'impliedVolatility',
+                             'lastPrice', 'change', 'bidQty', 'bidprice', 'askPrice', 'askQty', 'strikePrice']
+    columns_pe: List[str] = ['strikePrice', 'bidQty', 'bidprice', 'askPrice', 'askQty', 'change', 'lastPrice',
+                             'impliedVolatility', 'totalTradedVolume', 'changeinOpenInterest', 'openInterest']
+    merged_inner: pandas.DataFrame = pandas.merge(left=ce_data_f[columns_ce], right=pe_data_f[columns_pe],
+                                                  left_on='strikePrice', right_on='strikePrice')
+    merged_inner.columns = ['Open Interest', 'Change in Open Interest', 'Traded Volume', 'Implied Volatility',
+                            'Last Traded Price', 'Net Change', 'Bid Quantity', 'Bid Price', 'Ask Price',
+                            'Ask Quantity', 'Strike Price', 'Bid Quantity', 'Bid Price', 'Ask Price',
+                            'Ask Quantity', 'Net Change', 'Last Traded Price', 'Implied Volatility',
+                            'Traded Volume', 'Change in Open Interest', 'Open Interest']
+    return merged_inner
+
+
+def old_boundaries(entire_oc: pandas.DataFrame, round_factor: int = round_factor) -> \
+        nse_oca_engine.OiBoundaries:
+    call_oi_list: List[int] = []
+    for i in range(len(entire_oc)):
+        call_oi_list.append(int(entire_oc.iloc[i, [0]].iloc[0]))
+    call_oi_index: int = call_oi_list.index(max(call_oi_list))
+    max_call_oi: float = round(max(call_oi_list) / round_factor, 1)
+    max_call_oi_sp: float = float(entire_oc.iloc[call_oi_index]['Strike Price'])
+
+    put_oi_list: List[int] = []
+    for i in range(len(entire_oc)):
+        put_oi_list.append(int(entire_oc.iloc[i, [20]].iloc[0]))
+    put_oi_index: int = put_oi_list.index(max(put_oi_list))
+    max_put_oi: float = round(max(put_oi_list) / round_factor, 1)
+    max_put_oi_sp: float = float(entire_oc.iloc[put_oi_index]['Strike Price'])
+
+    sp_range_list: List[float] = []
+    for i in range(put_oi_index, call_oi_index + 1):
+        sp_range_list.append(float(entire_oc.iloc[i]['Strike Price']))
+
+    if max_call_oi_sp == max_put_oi_sp:
+        max_call_oi_2, max_call_oi_sp_2, max_put_oi_2, max_put_oi_sp_2 = \
+            max_call_oi, max_call_oi_sp, max_put_oi, max_put_oi_sp
+    elif len(sp_range_list) == 2:
+        max_call_oi_2 = round((entire_oc[entire_oc['Strike Price'] == max_put_oi_sp].iloc[0, 0]) / round_factor, 1)
+        max_call_oi_sp_2 = max_put_oi_sp
+        max_put_oi_2 = round((entire_oc[entire_oc['Strike Price'] == max_call_oi_sp].iloc[0, 20]) / round_factor, 1)
+        max_put_oi_sp_2 = max_call_oi_sp
+    else:
+        call_oi_list_2: List[int] = []
+        for i in range(put_oi_index, call_oi_index):
+            call_oi_list_2.append(int(entire_oc.iloc[i, [0]].iloc[0]))
+        call_oi_index_2: int = put_oi_index + call_oi_list_2.index(max(call_oi_list_2))
+        max_call_oi_2 = round(max(call_oi_list_2) / round_factor, 1)
+        max_call_oi_sp_2 = float(entire_oc.iloc[call_oi_index_2]['Strike Price'])
+
+        put_oi_list_2: List[int] = []
+        for i in range(put_oi_index + 1, call_oi_index + 1):
+            put_oi_list_2.append(int(entire_oc.iloc[i, [20]].iloc[0]))
+        put_oi_index_2: int = put_oi_index + 1 + put_oi_list_2.index(max(put_oi_list_2))
+        max_put_oi_2 = round(max(put_oi_list_2) / round_factor, 1)
+        max_put_oi_sp_2 = float(entire_oc.iloc[put_oi_index_2]['Strike Price'])
+
+    total_call_oi: int = sum(call_oi_list)
+    total_put_oi: int = sum(put_oi_list)
+    try:
+        put_call_ratio: float = round(total_put_oi / total_call_oi, 2)
+    except ZeroDivisionError:
+        put_call_ratio = 0
+    return nse_oca_engine.OiBoundaries(max_call_oi=max_call_oi, max_call_oi_sp=max_call_oi_sp, max_put_oi=max_put_oi,
+                                       max_put_oi_sp=max_put_oi_sp, max_call_oi_2=max_call_oi_2,
+                                       max_call_oi_sp_2=max_call_oi_sp_2, max_put_oi_2=max_put_oi_2,
+                                       max_put_oi_sp_2=max_put_oi_sp_2, put_call_ratio=put_call_ratio)
+
+
+def old_values(entire_oc: pandas.DataFrame, sp: float) -> Tuple[float, ...]:
+    index: int = int(entire_oc[entire_oc['Strike Price'] == sp].index.tolist()[0])
+    a: pandas.DataFrame = entire_oc[['Change in Open Interest']][entire_oc['Strike Price'] == sp]
+    c1: int = int(a.iloc[:, 0].get(index))
+    c2: int = int(entire_oc.iloc[:, 1].get(index + 1))
+    c3: int = int(entire_oc.iloc[:, 1].get(index + 2))
+    call_sum: float = round((c1 + c2 + c3) / round_factor, 1)
+    if call_sum == -0:
+        call_sum = 0.0
+    call_boundary: float = round(c3 / round_factor, 1)
+
+    o2: pandas.Series = entire_oc.iloc[:, 19]
+    o3: pandas.Series = entire_oc.iloc[:, 1]
+    p1: int = int(a.iloc[:, 1].get(index))
+    p2: int = int(o2.get(index + 1))
+    p3: int = int(o2.get(index + 2))
+    p4: int = int(o2.get(index + 4))
+    p5: int = int(o3.get(index + 4))
+    p6: int = int(o3.get(index - 2))
+    p7: int = int(o2.get(index - 2))
+    put_sum: float = round((p1 + p2 + p3) / round_factor, 1)
+    put_boundary: float = round(p1 / round_factor, 1)
+    difference: float = round(call_sum - put_sum, 1)
+    call_itm: float = 0.0
+    if p5 != 0:
+        call_itm = round(p4 / p5, 1)
+        if call_itm == -0:
+            call_itm = 0.0
+    put_itm: float = 0.0
+    if p7 != 0:
+        put_itm = round(p6 / p7, 1)
+        if put_itm == -0:
+            put_itm = 0.0
+    return call_sum, put_sum, difference, call_boundary, put_boundary, call_itm, put_itm
+
+
+def brute_force_max_pain(chain: OptionChain) -> float:
+    pains: List[float] = []
+    for expiry_price in chain.strike_price.tolist():
+        pain: float = 0.0
+        for strike_price, call_oi, put_oi in zip(chain.strike_price.tolist(), chain.call_oi.tolist(),
+                                                 chain.put_oi.tolist()):
+            pain += call_oi * max(0.0, expiry_price - strike_price) + put_oi * max(0.0, strike_price - expiry_price)
+        pains.append(pain)
+    return float(chain.strike_price[pains.index(min(pains))])
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_oi_boundaries_matches_old_loop(seed: int) -> None:
+    rng: random.Random = random.Random(seed)
+    strikes: int = rng.randint(5, 40)
+    call_oi: List[int] = [rng.randint(0, 5) * 10000 for _ in range(strikes)]
+    put_oi: List[int] = [rng.randint(0, 5) * 10000 for _ in range(strikes)]
+    put_index: int = rng.randrange(strikes - 1)
+    call_oi[rng.randrange(put_index + 1, strikes)] = 90000
+    put_oi[put_index] = 90000
+    json_data, expiry_date = payload(seed, strikes, call_oi, put_oi)
+    chain: OptionChain = nse_oca_chain.extract_chain(json_data, expiry_date)
+    assert nse_oca_engine.oi_boundaries(chain, round_factor) == old_boundaries(old_dataframe(json_data, expiry_date))
+
+
+def test_oi_boundaries_tied_max_oi_takes_first_strike() -> None:
+    json_data, expiry_date = payload(0, 8, [10, 20, 30, 70, 50, 70, 70, 10], [80, 20, 80, 30, 40, 10, 20, 10])
+    chain: OptionChain = nse_oca_chain.extract_chain(json_data, expiry_date)
+    boundaries: nse_oca_engine.OiBoundaries = nse_oca_engine.oi_boundaries(chain, 1)
+    assert boundaries == old_boundaries(old_dataframe(json_data, expiry_date), 1)
+    assert boundaries.max_call_oi_sp == float(chain.strike_price[3])
+    assert boundaries.max_put_oi_sp == float(chain.strike_price[0])
+
+
+def test_oi_boundaries_adjacent_and_equal_strikes() -> None:
+    for seed, call_oi, put_oi in ((1, [1, 2, 9, 3, 1, 1], [1, 9, 2, 3, 1, 1]),
+                                  (2, [1, 2, 9, 3, 1, 1], [1, 2, 9, 3, 1, 1])):
+        json_data, expiry_date = payload(seed, len(call_oi), call_oi, put_oi)
+        chain: OptionChain = nse_oca_chain.extract_chain(json_data, expiry_date)
+        assert nse_oca_engine.oi_boundaries(chain, 1) == old_boundaries(old_dataframe(json_data, expiry_date), 1)
+
+
+def test_oi_boundaries_put_above_call() -> None:
+    json_data, expiry_date = payload(3, 8, [9, 1, 2, 3, 1, 1, 1, 1], [1, 1, 2, 3, 1, 1, 9, 1])
+    with pytest.raises(ValueError):
+        old_boundaries(old_dataframe(json_data, expiry_date), 1)
+    chain: OptionChain = nse_oca_chain.extract_chain(json_data, expiry_date)
+    boundaries: nse_oca_engine.OiBoundaries = nse_oca_engine.oi_boundaries(chain, 1)
+    assert (boundaries.max_call_oi_2, boundaries.max_call_oi_sp_2) == (boundaries.max_call_oi,
+                                                                         boundaries.max_call_oi_sp)
+    assert (boundaries.max_put_oi_2, boundaries.max_put_oi_sp_2) == (boundaries.max_put_oi, boundaries.max_put_oi_sp)
+    assert boundaries.max_put_oi_sp > boundaries.max_call_oi_sp
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_analyze_matches_old_values(seed: int) -> None:
+    json_data, expiry_date = payload(seed)
+    chain: OptionChain = nse_oca_chain.extract_chain(json_data, expiry_date)
+    entire_oc: pandas.DataFrame = old_dataframe(json_data, expiry_date)
+    boundaries: Optional[nse_oca_engine.OiBoundaries]
+    try:
+        boundaries = old_boundaries(entire_oc)
+    except ValueError:
+        boundaries = None
+    for sp in chain.strike_price[2:-4].tolist():
+        analysis: nse_oca_engine.Analysis = nse_oca_engine.analyze(chain, sp, round_factor)
+        assert (analysis.call_sum, analysis.put_sum, analysis.difference, analysis.call_boundary,
+                analysis.put_boundary, analysis.call_itm, analysis.put_itm) == old_values(entire_oc, sp)
+        if boundaries is not None:
+            assert analysis.boundaries == boundaries
+        else:
+            assert analysis.boundaries.max_put_oi_sp > analysis.boundaries.max_call_oi_sp
+
+
+def test_analyze_unknown_strike() -> None:
+    json_data, expiry_date = payload(0)
+    assert nse_oca_engine.analyze(nse_oca_chain.extract_chain(json_data, expiry_date), 1.0, round_factor) is None
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_max_pain_matches_brute_force(seed: int) -> None:
+    json_data, expiry_date = payload(seed, strikes=random.Random(seed).randint(1, 60))
+    chain: OptionChain = nse_oca_chain.extract_chain(json_data, expiry_date)
+    assert nse_oca_engine.max_pain(chain) == brute_force_max_pain(chain)
+
+
+@pytest.mark.parametrize('factor', [round_factor, 10])
+def test_analyze_strikes_matches_analyze(factor: int) -> None:
+    for seed in range(200):
+        rng: random.Random = random.Random(seed)
+        json_data, expiry_date = payload(seed, strikes=rng.randint(1, 40))
+        if seed % 2:
+            for row in json_data['records']['data']:
+                for side in ('CE', 'PE'):
+                    row[side]['changeinOpenInterest'] = rng.randint(-40, 40) * 25
+        chain: OptionChain = nse_oca_chain.extract_chain(json_data, expiry_date)
+        boundaries: nse_oca_engine.OiBoundaries = nse_oca_engine.oi_boundaries(chain, factor)
+        table: nse_oca_engine.StrikeTable = nse_oca_engine.analyze_strikes(chain, factor)
+        assert len(table) == len(chain)
+        for row, sp in zip(table.rows(), chain.strike_price.tolist()):
+            analysis: nse_oca_engine.Analysis = nse_oca_engine.analyze(chain, sp, factor, boundaries)
+            assert row == [sp, analysis.call_sum, analysis.put_sum, analysis.difference, analysis.call_boundary,
+                           analysis.put_boundary, analysis.call_itm, analysis.put_itm], (seed, sp)
@@ -0,0 +1,128 @@
+import csv
+import os
+import time
+from typing import Any, List
+
+import nse_oca_export
+from nse_oca_export import ExportSink
+
+headers: List[str] = ['Time', 'Value']
+
+
+def read_rows(path: str) -> List[List[str]]:
+    with open(path, newline='') as f:
+        return list(csv.reader(f))
+
+
+def wait_for(condition: Any, seconds: float = 5.0) -> bool:
+    deadline: float = time.monotonic() + seconds
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return bool(condition())
+
+
+class FlakyFile:
+    def __init__(self, file: Any, failures: int) -> None:
+        self.file: Any = file
+        self.failures: int = failures
+
+    def write(self, data: str) -> int:
+        return self.file.write(data)
+
+    def flush(self) -> None:
+        if self.failures:
+            self.failures -= 1
+            raise OSError("disk full")
+        self.file.flush()
+
+    def fileno(self) -> int:
+        return self.file.fileno()
+
+    def close(self) -> None:
+        self.file.close()
+
+
+def test_flush_after_flush_bytes(tmp_path: Any) -> None:
+    path: str = os.path.join(str(tmp_path), 'export.csv')
+    sink: ExportSink = ExportSink(path, headers, flush_seconds=60, flush_bytes=100)
+    for tick in range(20):
+        sink.write([f'09:{tick:02d}:00', 18000.5])
+    assert wait_for(lambda: sink.flushes == 4)
+    assert sink.written == 18
+    assert len(read_rows(path)) == 19
+    sink.stop()
+    assert len(read_rows(path)) == 21
+
+
+def test_flush_after_flush_seconds(tmp_path: Any) -> None:
+    path: str = os.path.join(str(tmp_path), 'export.csv')
+    sink: ExportSink = ExportSink(path, headers, flush_seconds=0.05)
+    sink.write(['09:15:00', 18000.5])
+    assert wait_for(lambda: sink.flushes == 2)
+    assert read_rows(path) == [headers, ['09:15:00', '18000.5']]
+    sink.stop()
+
+
+def test_request_flush_does_not_block(tmp_path: Any) -> None:
+    path: str = os.path.join(str(tmp_path), 'export.csv')
+    sink: ExportSink = ExportSink(path, headers, flush_seconds=60)
+    sink.write(['09:15:00', 18000.5])
+    assert sink.request_flush().wait(5)
+    assert read_rows(path) == [headers, ['09:15:00', '18000.5']]
+    sink.stop()
+
+
+def test_headers_are_written_once(tmp_path: Any) -> None:
+    path: str = os.path.join(str(tmp_path), 'export.csv')
+    for tick in range(2):
+        sink: ExportSink = ExportSink(path, headers)
+        sink.write([f'09:1{tick}:00', 18000.5])
+        sink.stop()
+    assert read_rows(path) == [headers, ['09:10:00', '18000.5'], ['09:11:00', '18000.5']]
+
+
+def test_rows_are_kept_while_the_file_cannot_be_opened(tmp_path: Any) -> None:
+    path: str = os.path.join(str(tmp_path), 'missing', 'export.csv')
+    sink: ExportSink = ExportSink(path, headers, flush_seconds=60)
+    sink.write(['09:15:00', 18000.5])
+    assert sink.flush(5)
+    assert isinstance(sink.error(), OSError)
+    assert sink.error() is None
+    os.mkdir(os.path.dirname(path))
+    sink.write(['09:16:00', 18001.5])
+    assert sink.flush(5)
+    sink.stop()
+    assert read_rows(path) == [headers, ['09:15:00', '18000.5'], ['09:16:00', '18001.5']]
+    assert sink.written == 2
+
+
+def test_rows_are_not_written_twice_when_flush_fails(tmp_path: Any) -> None:
+    path: str = os.path.join(str(tmp_path), 'export.csv')
+    sink: ExportSink = ExportSink(path, headers, flush_seconds=60)
+    assert sink.flush(5)
+    sink.file = FlakyFile(sink.file, failures=2)
+    sink.write(['09:15:00', 18000.5])
+    assert sink.flush(5)
+    assert isinstance(sink.error(), OSError)
+    sink.write(['09:16:00', 18001.5])
+    assert sink.flush(5)
+    assert sink.error() is None
+    assert sink.flush(5)
+    sink.stop()
+    assert read_rows(path) == [headers, ['09:15:00', '18000.5'], ['09:16:00', '18001.5']]
+    assert sink.written == 2
+
+
+def test_stop_fsyncs_and_closes(tmp_path: Any, monkeypatch: Any) -> None:
+    path: str = os.path.join(str(tmp_path), 'export.csv')
+    synced: List[int] = []
+    fsync: Any = os.fsync
+    monkeypatch.setattr(nse_oca_export.os, 'fsync', lambda fd: synced.append(fd) or fsync(fd))
+    sink: ExportSink = ExportSink(path, headers, flush_seconds=60)
+    sink.write(['09:15:00', 18000.5])
+    assert synced == []
+    sink.stop()
+    assert not sink.thread.is_alive()
+    assert len(synced) == 1
+    assert sink.file is None
+    assert read_rows(path) == [headers, ['09:15:00', '18000.5']]
@@ -0,0 +1,113 @@
+import math
+from typing import Any, Dict, Tuple
+
+import numpy
+import pytest
+
+import nse_oca_chain
+import nse_oca_greeks
+from nse_oca_chain import OptionChain
+from nse_oca_greeks import Greeks
+
+rate: float = nse_oca_greeks.risk_free_rate
+
+
+def grid() -> Tuple[numpy.ndarray, ...]:
+    strike, years, sigma, call = numpy.meshgrid(numpy.linspace(14000, 22000, 17), [1 / 365, 7 / 365, 30 / 365, 0.5],
+                                                [0.08, 0.15, 0.3, 0.6], [True, False], indexing='ij')
+    return numpy.full(strike.size, 18000.0), strike.ravel(), years.ravel(), sigma.ravel(), call.ravel()
+
+
+def test_norm_cdf_error_bound() -> None:
+    x: numpy.ndarray = numpy.linspace(-8, 8, 16001)
+    exact: numpy.ndarray = numpy.array([0.5 * math.erfc(-value / math.sqrt(2)) for value in x.tolist()])
+    approximate: numpy.ndarray = nse_oca_greeks.norm_cdf(x)
+    assert numpy.max(numpy.abs(approximate - exact)) < 1.2e-7
+    lower: numpy.ndarray = x <= 0
+    assert numpy.max(numpy.abs(approximate[lower] - exact[lower]) / exact[lower]) < 1.2e-7
+
+
+def test_put_call_parity() -> None:
+    spot, strike, years, sigma, call = grid()
+    calls: numpy.ndarray = nse_oca_greeks.price(spot, strike, years, rate, sigma, numpy.ones(len(call), dtype=bool))
+    puts: numpy.ndarray = nse_oca_greeks.price(spot, strike, years, rate, sigma, numpy.zeros(len(call), dtype=bool))
+    assert numpy.allclose(calls - puts, spot - strike * numpy.exp(-rate * years), atol=1e-6)
+
+
+def test_implied_volatility_round_trip() -> None:
+    spot, strike, years, sigma, call = grid()
+    target: numpy.ndarray = nse_oca_greeks.price(spot, strike, years, rate, sigma, call)
+    solved: numpy.ndarray = nse_oca_greeks.implied_volatility(target, spot, strike, years, rate, call)
+    lower: numpy.ndarray = numpy.where(call, numpy.maximum(spot - strike * numpy.exp(-rate * years), 0.0),
+                                       numpy.maximum(strike * numpy.exp(-rate * years) - spot, 0.0))
+    solvable: numpy.ndarray = target - lower > 1e-3
+    assert solvable.sum() > len(target) // 2
+    assert not numpy.isnan(solved[solvable]).any()
+    repriced: numpy.ndarray = nse_oca_greeks.price(spot, strike, years, rate, solved, call)
+    assert numpy.all(numpy.abs(repriced - target)[solvable] < 1e-6 * numpy.maximum(target[solvable], 1.0))
+    vega: numpy.ndarray = nse_oca_greeks.side_greeks(spot, strike, years, rate, sigma, True)[3] * 100
+    sensitive: numpy.ndarray = solvable & (vega > 1e-3)
+    assert numpy.all(numpy.abs(solved - sigma)[sensitive] <= 2e-6 * numpy.maximum(target, 1.0)[sensitive] /
+                     vega[sensitive] + 1e-8)
+
+
+def test_implied_volatility_without_solution() -> None:
+    spot: numpy.ndarray = numpy.full(6, 18000.0)
+    strike: numpy.ndarray = numpy.array([17000.0, 17000.0, 19000.0, 19000.0, 18000.0, 18000.0])
+    years: numpy.ndarray = numpy.full(6, 30 / 365)
+    call: numpy.ndarray = numpy.array([True, True, False, False, True, False])
+    discount: float = math.exp(-rate * 30 / 365)
+    target: numpy.ndarray = numpy.array([1000.0 - 17000.0 * (1 - discount) - 1, 18000.0, 19000.0 * discount - 18000.0,
+                                         19000.0 * discount, 0.0, -5.0])
+    assert numpy.isnan(nse_oca_greeks.implied_volatility(target, spot, strike, years, rate, call)).all()
+
+
+def test_implied_volatility_deep_in_and_out_of_the_money() -> None:
+    spot: numpy.ndarray = numpy.full(4, 18000.0)
+    strike: numpy.ndarray = numpy.array([12000.0, 24000.0, 24000.0, 12000.0])
+    years: numpy.ndarray = numpy.full(4, 7 / 365)
+    call: numpy.ndarray = numpy.array([True, True, False, False])
+    sigma: numpy.ndarray = numpy.array([0.9, 0.9, 0.9, 0.9])
+    target: numpy.ndarray = nse_oca_greeks.price(spot, strike, years, rate, sigma, call)
+    solved: numpy.ndarray = nse_oca_greeks.implied_volatility(target, spot, strike, years, rate, call)
+    assert numpy.all((solved >= 1e-4) & (solved <= 5.0))
+    assert numpy.allclose(nse_oca_greeks.price(spot, strike, years, rate, solved, call), target, atol=1e-6)
+    capped: numpy.ndarray = nse_oca_greeks.implied_volatility(target, spot, strike, years, rate, call, high=0.5)
+    assert numpy.allclose(capped[[1, 3]], 0.5)
+
+
+@pytest.mark.parametrize('call', [True, False])
+def test_greeks_match_finite_differences(call: bool) -> None:
+    spot, strike, years, sigma, _ = grid()
+    side: numpy.ndarray = numpy.full(len(spot), call)
+
+    def value(spot: numpy.ndarray = spot, years: numpy.ndarray = years, sigma: numpy.ndarray = sigma) -> numpy.ndarray:
+        return nse_oca_greeks.price(spot, strike, years, rate, sigma, side)
+
+    delta, gamma, theta, vega = nse_oca_greeks.side_greeks(spot, strike, years, rate, sigma, call)
+    step: float = 1.0
+    assert numpy.allclose(delta, (value(spot + step) - value(spot - step)) / (2 * step), atol=1e-4)
+    assert numpy.allclose(gamma, (value(spot + step) - 2 * value() + value(spot - step)) / step ** 2, atol=1e-5)
+    day: float = 1e-4 / 365
+    assert numpy.allclose(theta, -(value(years=years + day) - value(years=years - day)) / (2 * day) / 365,
+                          rtol=1e-3, atol=1e-2)
+    assert numpy.allclose(vega, (value(sigma=sigma + 1e-4) - value(sigma=sigma - 1e-4)) / 2e-4 / 100, atol=1e-3)
+
+
+def test_greeks_all_solves_missing_implied_volatility() -> None:
+    json_data: Dict[str, Any] = nse_oca_chain.synthetic_payload(strikes=20, expiries=2, seed=0)
+    for row in json_data['records']['data']:
+        row['CE']['impliedVolatility'] = 0
+    chains: Dict[str, OptionChain] = nse_oca_chain.extract_chains(json_data)
+    greeks: Dict[str, Greeks] = nse_oca_greeks.greeks_all(chains)
+    assert list(greeks) == list(chains)
+    for expiry_date, chain in chains.items():
+        result: Greeks = greeks[expiry_date]
+        assert numpy.allclose(result.put_iv, chain.put_iv)
+        solved: numpy.ndarray = ~numpy.isnan(result.call_iv)
+        assert solved.any()
+        repriced: numpy.ndarray = nse_oca_greeks.price(numpy.full(len(chain), chain.underlying_value),
+                                                       chain.strike_price, numpy.full(len(chain), result.years), rate,
+                                                       result.call_iv / 100, numpy.ones(len(chain), dtype=bool))
+        assert numpy.allclose(repriced[solved], chain.call_ltp[solved], atol=1e-3)
+        assert numpy.all((result.call_delta[solved] >= 0) & (result.call_delta[solved] <= 1))
@@ -0,0 +1,64 @@
+import os
+from typing import Any, Dict, List
+
+import pytest
+
+import nse_oca_headless
+from nse_oca_capture import ReplaySource
+
+
+class Recorder:
+    runs: List[Dict[str, Any]] = []
+
+    def __init__(self, **options: Any) -> None:
+        self.options: Dict[str, Any] = options
+
+    def run(self) -> None:
+        Recorder.runs.append(self.options)
+        self.options['source'].close()
+
+
+def main(tmp_path: Any, monkeypatch: Any, config: str, *args: str) -> Dict[str, Any]:
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(nse_oca_headless, 'Headless', Recorder)
+    Recorder.runs = []
+    with open('NSE-OCA.ini', 'w') as f:
+        f.write(f"[main]\noption_mode = Index\nindex = NIFTY\n{config}")
+    nse_oca_headless.main(list(args))
+    assert len(Recorder.runs) == 1
+    return Recorder.runs[0]
+
+
+def test_options_fall_back_to_the_config(tmp_path: Any, monkeypatch: Any) -> None:
+    options: Dict[str, Any] = main(tmp_path, monkeypatch, "seconds = 30\nlive_export = True\nhistory = True\n"
+                                                          "adaptive = False\nbase_url = http://127.0.0.1:1\n"
+                                                          "capture = True\n")
+    assert (options['symbol'], options['option_mode'], options['seconds']) == ('NIFTY', 'Index', 30)
+    assert options['live_export'] and options['history']
+    assert not options['adaptive']
+    assert options['source'].base_url == 'http://127.0.0.1:1'
+    assert options['source'].journal.path == nse_oca_headless.journal_path('NIFTY')
+    assert os.path.isfile(nse_oca_headless.journal_path('NIFTY'))
+
+
+def test_arguments_override_the_config(tmp_path: Any, monkeypatch: Any) -> None:
+    options: Dict[str, Any] = main(tmp_path, monkeypatch, "seconds = 30\nhistory = True\ncapture = True\n",
+                                   '--symbol', 'BANKNIFTY', '--seconds', '5', '--capture', 'banknifty.journal.gz',
+                                   '--base-url', 'http://127.0.0.1:2')
+    assert (options['symbol'], options['seconds']) == ('BANKNIFTY', 5)
+    assert options['source'].journal.path == 'banknifty.journal.gz'
+    assert options['source'].base_url == 'http://127.0.0.1:2'
+
+
+@pytest.mark.parametrize('config', ["", "capture = False\n"])
+def test_capture_is_off_by_default(tmp_path: Any, monkeypatch: Any, config: str) -> None:
+    options: Dict[str, Any] = main(tmp_path, monkeypatch, config)
+    assert options['source'].journal is None
+    assert not options['live_export'] and not options['history']
+    assert options['adaptive']
+
+
+def test_replay_does_not_capture(tmp_path: Any, monkeypatch: Any) -> None:
+    options: Dict[str, Any] = main(tmp_path, monkeypatch, "capture = True\n", '--replay', 'missing.journal.gz')
+    assert isinstance(options['source'], ReplaySource)
+    assert not os.path.exists(nse_oca_headless.journal_path('NIFTY'))
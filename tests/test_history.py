@@ -0,0 +1,109 @@
+import datetime
+import os
+import time
+from typing import List, Tuple, Any
+
+import pytest
+
+import nse_oca_chain
+import nse_oca_engine
+import nse_oca_history
+from nse_oca_chain import OptionChain
+from nse_oca_history import History, HistoryWriter
+
+first_day: datetime.datetime = datetime.datetime(2021, 1, 4, 9, 15)
+expiry_date: str = '28-Jan-2021'
+
+
+def analysis_at(moment: datetime.datetime, put_call_ratio: float) -> nse_oca_engine.Analysis:
+    json_data: Any = nse_oca_chain.synthetic_payload(strikes=20, expiries=1, seed=0)
+    chain: OptionChain = nse_oca_chain.extract_chain(json_data, json_data['records']['expiryDates'][0])
+    analysis: nse_oca_engine.Analysis = nse_oca_engine.analyze(chain, float(chain.strike_price[10]), 1000)
+    return analysis._replace(timestamp=moment.strftime('%d-%b-%Y %H:%M:%S'),
+                             boundaries=analysis.boundaries._replace(put_call_ratio=put_call_ratio))
+
+
+@pytest.fixture
+def path(tmp_path: Any) -> str:
+    return os.path.join(str(tmp_path), nse_oca_history.database_path)
+
+
+def write_rows(path: str, rows: List[Tuple[str, str, float, nse_oca_engine.Analysis]], **kwargs: Any) -> HistoryWriter:
+    writer: HistoryWriter = HistoryWriter(path, **kwargs)
+    for row in rows:
+        writer.write(*row)
+    assert writer.flush(5)
+    writer.stop()
+    assert not writer.thread.is_alive()
+    return writer
+
+
+def test_writer_commits_in_batches(path: str) -> None:
+    rows: List[Tuple[str, str, float, nse_oca_engine.Analysis]] = [
+        ('NIFTY', expiry_date, 14000.0, analysis_at(first_day + datetime.timedelta(minutes=minute), 1.0))
+        for minute in range(7)]
+    writer: HistoryWriter = write_rows(path, rows, batch_rows=3)
+    assert writer.written == 7
+    assert writer.commits == 3
+    assert writer.error() is None
+    history: History = History(path)
+    assert len(history.series('NIFTY', 'value')) == 7
+    history.close()
+
+
+def test_writer_commits_after_flush_seconds(path: str) -> None:
+    writer: HistoryWriter = HistoryWriter(path, flush_seconds=0.05)
+    writer.write('NIFTY', expiry_date, 14000.0, analysis_at(first_day, 1.0))
+    deadline: float = time.monotonic() + 5
+    while writer.written == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert writer.written == 1
+    writer.stop()
+
+
+def test_writer_skips_bad_rows(path: str) -> None:
+    writer: HistoryWriter = write_rows(path, [('NIFTY', 'not a date', 14000.0, analysis_at(first_day, 1.0)),
+                                              ('NIFTY', expiry_date, 14000.0, analysis_at(first_day, 1.0))])
+    assert writer.written == 1
+
+
+def test_primary_key_replaces_same_strike_and_keeps_other_strikes(path: str) -> None:
+    write_rows(path, [('NIFTY', expiry_date, 14000.0, analysis_at(first_day, 0.8)),
+                      ('NIFTY', expiry_date, 14000.0, analysis_at(first_day, 0.9)),
+                      ('NIFTY', expiry_date, 14100.0, analysis_at(first_day, 1.1))])
+    history: History = History(path)
+    assert history.put_call_ratio('NIFTY') == [('2021-01-04 09:15:00', '2021-01-28', 14000.0, 0.9),
+                                               ('2021-01-04 09:15:00', '2021-01-28', 14100.0, 1.1)]
+    history.close()
+
+
+def test_series_filters_sessions_expiry_and_strike(path: str) -> None:
+    rows: List[Tuple[str, str, float, nse_oca_engine.Analysis]] = []
+    for day in range(7):
+        moment: datetime.datetime = first_day + datetime.timedelta(days=day)
+        rows.append(('BANKNIFTY', expiry_date, 30000.0, analysis_at(moment, day / 10)))
+        rows.append(('BANKNIFTY', '25-Feb-2021', 30000.0, analysis_at(moment, 1 + day / 10)))
+        rows.append(('BANKNIFTY', expiry_date, 30100.0, analysis_at(moment, 2 + day / 10)))
+        rows.append(('NIFTY', expiry_date, 14000.0, analysis_at(moment, 3 + day / 10)))
+    write_rows(path, rows)
+    history: History = History(path)
+    try:
+        assert history.sessions('BANKNIFTY', 2) == ['2021-01-10', '2021-01-09']
+        assert len(history.put_call_ratio('BANKNIFTY', 5)) == 15
+        assert history.put_call_ratio('BANKNIFTY', 2, expiry_date, 30000.0) == [
+            ('2021-01-09 09:15:00', '2021-01-28', 30000.0, 0.5), ('2021-01-10 09:15:00', '2021-01-28', 30000.0, 0.6)]
+        assert [row[3] for row in history.series('NIFTY', 'strike_price', 1)] == [14000.0]
+        assert history.series('FINNIFTY', 'value') == []
+        with pytest.raises(ValueError):
+            history.series('NIFTY', 'symbol; DROP TABLE summary')
+    finally:
+        history.close()
+
+
+def test_expiry_index_serves_expiry_lookups(path: str) -> None:
+    history: History = History(path)
+    plan: List[Tuple[Any, ...]] = history.connection.execute(
+        "EXPLAIN QUERY PLAN SELECT timestamp, put_call_ratio FROM summary WHERE symbol = ? AND expiry_date = ? "
+        "ORDER BY timestamp", ('NIFTY', '2021-01-28')).fetchall()
+    history.close()
+    assert 'summary_expiries' in plan[0][-1]
@@ -0,0 +1,86 @@
+from typing import List, Union
+
+import pytest
+
+from nse_oca_rows import RowBuffer, row_rising_colors
+
+width: int = len(row_rising_colors)
+
+
+def row(number: int) -> List[Union[str, float]]:
+    return [f"{number // 3600:02d}:{number // 60 % 60:02d}:{number % 60:02d}"] + \
+           [number + column / 10 for column in range(width)]
+
+
+def colors(number: int) -> List[int]:
+    return [(number + column) % 3 for column in range(width)]
+
+
+def filled(rows: int, capacity: int = 8, spill_rows: int = 3) -> RowBuffer:
+    buffer: RowBuffer = RowBuffer(capacity, spill_rows)
+    for number in range(rows):
+        buffer.append(row(number), colors(number))
+    return buffer
+
+
+def test_rows_in_memory() -> None:
+    buffer: RowBuffer = filled(5)
+    assert len(buffer) == 5
+    assert buffer.spilled == 0
+    assert buffer.spill_file is None
+    assert buffer.rows(0, 5) == [row(number) for number in range(5)]
+    assert buffer.colors(1, 3).tolist() == [colors(1), colors(2)]
+
+
+def test_spill_wraps_the_ring() -> None:
+    buffer: RowBuffer = filled(8)
+    assert buffer.spilled == 0
+    buffer.append(row(8), colors(8))
+    assert (buffer.spilled, buffer.count, buffer.head) == (3, 6, 3)
+    buffer.append(row(9), colors(9))
+    buffer.append(row(10), colors(10))
+    assert (buffer.head, buffer.count) == (3, 8)
+    assert buffer.buffer['time'][0].decode() == row(8)[0]
+    assert buffer.rows(0, 11) == [row(number) for number in range(11)]
+
+
+@pytest.mark.parametrize('rows', [9, 17, 50])
+def test_reads_across_the_spill_boundary(rows: int) -> None:
+    buffer: RowBuffer = filled(rows)
+    assert len(buffer) == rows
+    assert buffer.spilled > 0
+    for start in range(rows):
+        for stop in (buffer.spilled, buffer.spilled + 1, start + 1, start + 4, rows):
+            expected: List[List[Union[str, float]]] = [row(number) for number in range(start, min(stop, rows))]
+            assert buffer.rows(start, stop) == expected
+            assert buffer.colors(start, stop).tolist() == [colors(number) for number in range(start, min(stop, rows))]
+
+
+def test_reads_are_clamped() -> None:
+    buffer: RowBuffer = filled(12)
+    assert buffer.rows(-5, 2) == [row(0), row(1)]
+    assert buffer.rows(10, 100) == [row(10), row(11)]
+    assert buffer.rows(7, 7) == []
+    assert buffer.colors(20, 30).shape == (0, width)
+
+
+def test_chunks() -> None:
+    buffer: RowBuffer = filled(20)
+    assert [len(chunk) for chunk in buffer.chunks()] == [8, 8, 4]
+    assert [line for chunk in buffer.chunks(7) for line in chunk] == [row(number) for number in range(20)]
+    assert [line for chunk in buffer.chunks(3, stop=10) for line in chunk] == [row(number) for number in range(10)]
+    assert [len(chunk) for chunk in buffer.chunks(3, stop=10)] == [3, 3, 3, 1]
+    assert list(buffer.chunks(stop=0)) == []
+
+
+def test_clear_and_close() -> None:
+    buffer: RowBuffer = filled(20)
+    buffer.clear()
+    assert len(buffer) == 0
+    assert buffer.rows(0, 10) == []
+    for number in range(100, 112):
+        buffer.append(row(number), colors(number))
+    assert buffer.rows(0, 12) == [row(number) for number in range(100, 112)]
+    buffer.close()
+    assert buffer.spill_file is None
+    assert len(buffer) == 0
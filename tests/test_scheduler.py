@@ -0,0 +1,142 @@
+import datetime
+import math
+import random
+from typing import List, Optional, Tuple
+
+import pytest
+
+from nse_oca_scheduler import PollScheduler
+
+first_update: float = datetime.datetime(2021, 11, 25, 9, 15).timestamp()
+
+
+class FakeServer:
+    def __init__(self, period: float, lag: float) -> None:
+        self.period: float = period
+        self.lag: float = lag
+
+    def updates(self, now: float) -> int:
+        return math.floor((now - self.lag - first_update) / self.period)
+
+    def timestamp(self, now: float) -> str:
+        return datetime.datetime.fromtimestamp(first_update + self.updates(now) * self.period).strftime(
+            '%d-%b-%Y %H:%M:%S')
+
+
+class Clock:
+    def __init__(self, now: float) -> None:
+        self.now: float = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def scheduler_of(clock: Clock, seconds: float, adaptive: bool = True, seed: int = 0) -> PollScheduler:
+    return PollScheduler(seconds, adaptive=adaptive, clock=clock, wall_clock=clock, rng=random.Random(seed))
+
+
+def run(scheduler: PollScheduler, server: FakeServer, clock: Clock, polls: int) -> List[Tuple[float, bool]]:
+    trace: List[Tuple[float, bool]] = []
+    for _ in range(polls):
+        trace.append((clock.now, scheduler.record(server.timestamp(clock.now))))
+        clock.now += scheduler.delay()
+    return trace
+
+
+def scheduled(trace: List[Tuple[float, bool]]) -> List[float]:
+    return [now for (_, earlier), (now, new) in zip(trace, trace[1:]) if earlier and new]
+
+
+@pytest.mark.parametrize('period, lag, seconds', [(60, 0.5, 20), (60, 4.3, 20), (60, 17.0, 20), (180, 2.0, 60)])
+def test_learns_period_and_offset(period: float, lag: float, seconds: float) -> None:
+    server: FakeServer = FakeServer(period, lag)
+    clock: Clock = Clock(first_update + 7)
+    scheduler: PollScheduler = scheduler_of(clock, seconds)
+    trace: List[Tuple[float, bool]] = run(scheduler, server, clock, 200)
+    assert scheduler.period == period
+    assert lag - scheduler.margin - scheduler.probe <= scheduler.offset <= lag
+    settled: List[Tuple[float, bool]] = trace[40:]
+    assert sum(not new for now, new in settled) <= len(settled) // scheduler.history + 1
+    for now in scheduled(settled):
+        assert 0 <= (now - first_update - lag) % period <= scheduler.margin + scheduler.probe
+    polled: List[int] = [server.updates(now) for now, new in settled if new]
+    assert polled == list(range(polled[0], polled[0] + len(polled)))
+
+
+def test_late_update_is_retried_quickly() -> None:
+    server: FakeServer = FakeServer(60, 4.3)
+    clock: Clock = Clock(first_update + 7)
+    scheduler: PollScheduler = scheduler_of(clock, 20)
+    run(scheduler, server, clock, 40)
+    offset: float = scheduler.offset
+    server.lag += 10
+    delays: List[float] = []
+    while not scheduler.record(server.timestamp(clock.now)):
+        delays.append(scheduler.delay())
+        clock.now += delays[-1]
+    assert delays == [6, 12]
+    assert scheduler.retries == 0
+    assert scheduler.offset == offset + scheduler.probe
+
+
+def test_not_adaptive_keeps_the_base_interval() -> None:
+    server: FakeServer = FakeServer(60, 4.3)
+    clock: Clock = Clock(first_update + 7)
+    scheduler: PollScheduler = scheduler_of(clock, 20, adaptive=False)
+    trace: List[Tuple[float, bool]] = run(scheduler, server, clock, 30)
+    assert [now - first_update for now, new in trace] == [7 + 20 * poll for poll in range(30)]
+    assert scheduler.target is None
+    assert scheduler.period == 60
+
+
+def test_errors_back_off_with_jitter() -> None:
+    clock: Clock = Clock(first_update)
+    scheduler: PollScheduler = scheduler_of(clock, 20, seed=1)
+    rng: random.Random = random.Random(1)
+    delays: List[float] = []
+    for failures in range(1, 12):
+        assert not scheduler.record(None)
+        assert scheduler.failures == failures
+        cap: float = min(scheduler.max_backoff, 20 * 2 ** failures)
+        delay: float = scheduler.delay()
+        assert delay == 10 + rng.uniform(0, cap - 10)
+        assert 10 <= delay <= cap
+        assert (scheduler.due, scheduler.target) == (None, None)
+        delays.append(delay)
+    assert max(delays) <= scheduler.max_backoff == 300
+    assert scheduler.polls == 11
+
+
+def test_returns_to_base_interval_after_errors() -> None:
+    server: FakeServer = FakeServer(60, 4.3)
+    clock: Clock = Clock(first_update + 7)
+    scheduler: PollScheduler = scheduler_of(clock, 20, adaptive=False)
+    run(scheduler, server, clock, 5)
+    for _ in range(6):
+        scheduler.record(None)
+        clock.now += scheduler.delay()
+    assert scheduler.record(server.timestamp(clock.now))
+    assert scheduler.failures == 0
+    assert scheduler.delay() == 20
+    clock.now += 20
+    scheduler.record(server.timestamp(clock.now))
+    assert scheduler.delay() == 20
+
+
+def test_adaptive_recovers_after_errors() -> None:
+    server: FakeServer = FakeServer(60, 4.3)
+    clock: Clock = Clock(first_update + 7)
+    scheduler: PollScheduler = scheduler_of(clock, 20)
+    run(scheduler, server, clock, 60)
+    offset: Optional[float] = scheduler.offset
+    for _ in range(4):
+        scheduler.record(None)
+        clock.now += scheduler.delay()
+    trace: List[Tuple[float, bool]] = run(scheduler, server, clock, 10)
+    assert trace[0][1]
+    assert sum(not new for now, new in trace) <= 1
+    assert scheduler.offset == offset
+    assert scheduler.period == 60
+    assert len(scheduled(trace)) >= 7
+    for now in scheduled(trace):
+        assert 0 <= (now - first_update - server.lag) % server.period <= scheduler.margin + scheduler.probe
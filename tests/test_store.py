@@ -0,0 +1,145 @@
+import csv
+import datetime
+import io
+import os
+import sys
+from typing import Any, Dict, List
+
+import numpy
+import pytest
+
+import nse_oca_chain
+import nse_oca_store
+from nse_oca_chain import OptionChain
+from nse_oca_store import SnapshotStore, SnapshotWriter, PartitionReader
+
+first_tick: datetime.datetime = datetime.datetime(2021, 11, 25, 9, 15)
+
+
+def chains(ticks: int) -> List[OptionChain]:
+    result: List[OptionChain] = []
+    for tick in range(ticks):
+        json_data: Dict[str, Any] = nse_oca_chain.synthetic_payload(
+            strikes=10 + tick, expiries=1, seed=tick, timestamp=first_tick + datetime.timedelta(minutes=tick))
+        result.append(nse_oca_chain.extract_chain(json_data, json_data['records']['expiryDates'][0]))
+    return result
+
+
+def assert_same_chain(stored: OptionChain, chain: OptionChain) -> None:
+    assert (stored.expiry_date, stored.timestamp, stored.underlying_value) == (
+        chain.expiry_date, chain.timestamp, chain.underlying_value)
+    assert stored.strike_rows == chain.strike_rows
+    for field in nse_oca_store.fields:
+        assert numpy.array_equal(getattr(stored, field), getattr(chain, field)), field
+
+
+def reader_of(directory: str, chain: OptionChain) -> PartitionReader:
+    return PartitionReader(nse_oca_store.partition_path('NIFTY', chain.expiry_date, first_tick.strftime('%Y-%m-%d'),
+                                                        directory))
+
+
+def test_append_and_read_back(tmp_path: Any) -> None:
+    directory: str = str(tmp_path)
+    ticks: List[OptionChain] = chains(3)
+    store: SnapshotStore = SnapshotStore(directory)
+    assert all(store.append('NIFTY', chain) for chain in ticks)
+    assert not store.append('NIFTY', ticks[-1])
+    assert store.snapshots == 3
+    store.close()
+
+    reader: PartitionReader = reader_of(directory, ticks[0])
+    assert len(reader) == 3
+    assert isinstance(reader.column('call_oi'), numpy.memmap)
+    for tick, chain in enumerate(ticks):
+        assert_same_chain(reader.snapshot(tick), chain)
+    assert reader.find(ticks[1].timestamp) == 1
+    assert reader.find('25-Nov-2021 09:16:30') == 1
+    strike_price: float = float(ticks[2].strike_price[0])
+    series: numpy.ndarray = reader.strike_series('call_oi', strike_price)
+    assert numpy.isnan(series[:2]).all()
+    assert series[2] == ticks[2].call_oi[0]
+
+
+def test_reopen_after_restart(tmp_path: Any) -> None:
+    directory: str = str(tmp_path)
+    ticks: List[OptionChain] = chains(4)
+    store: SnapshotStore = SnapshotStore(directory)
+    store.append('NIFTY', ticks[0])
+    store.append('NIFTY', ticks[1])
+    store.close()
+
+    store = SnapshotStore(directory)
+    assert not store.append('NIFTY', ticks[1])
+    assert store.append('NIFTY', ticks[2])
+    store.close()
+    reader: PartitionReader = reader_of(directory, ticks[0])
+    assert len(reader) == 3
+    assert_same_chain(reader.snapshot(-1), ticks[2])
+
+    path: str = reader.path
+    with open(nse_oca_store.column_path(path, 'call_oi'), 'ab') as f:
+        f.write(b'\0' * 12)
+    with open(nse_oca_store.index_path(path), 'ab') as f:
+        f.write(b'\0' * 5)
+    assert len(reader_of(directory, ticks[0])) == 3
+    store = SnapshotStore(directory)
+    assert store.append('NIFTY', ticks[3])
+    store.close()
+    reader = reader_of(directory, ticks[0])
+    assert len(reader) == 4
+    assert_same_chain(reader.snapshot(2), ticks[2])
+    assert_same_chain(reader.snapshot(3), ticks[3])
+
+
+def test_writer_appends_on_its_thread(tmp_path: Any) -> None:
+    directory: str = str(tmp_path)
+    ticks: List[OptionChain] = chains(3)
+    writer: SnapshotWriter = SnapshotWriter(directory)
+    for chain in ticks:
+        writer.write('NIFTY', chain)
+    assert writer.flush(5)
+    assert writer.store.snapshots == 3
+    writer.stop()
+    assert not writer.thread.is_alive()
+    assert writer.error() is None
+    assert len(reader_of(directory, ticks[0])) == 3
+
+
+def test_writer_reports_errors(tmp_path: Any) -> None:
+    directory: str = os.path.join(str(tmp_path), 'file')
+    open(directory, 'w').close()
+    writer: SnapshotWriter = SnapshotWriter(directory)
+    writer.write('NIFTY', chains(1)[0])
+    assert writer.flush(5)
+    assert isinstance(writer.error(), OSError)
+    writer.stop()
+
+
+def test_csv_export_cli(tmp_path: Any, monkeypatch: Any, capsys: Any) -> None:
+    directory: str = str(tmp_path)
+    ticks: List[OptionChain] = chains(2)
+    store: SnapshotStore = SnapshotStore(directory)
+    for chain in ticks:
+        store.append('NIFTY', chain)
+    store.close()
+
+    monkeypatch.setattr(sys, 'argv', ['nse_oca_store.py', '--directory', directory])
+    nse_oca_store.main()
+    assert capsys.readouterr().out == f"NIFTY\t{ticks[0].expiry_date}\t2021-11-25\t2 ticks\n"
+
+    output: str = os.path.join(directory, 'tick.csv')
+    monkeypatch.setattr(sys, 'argv', ['nse_oca_store.py', '--directory', directory, '--symbol', 'NIFTY',
+                                      '--expiry', ticks[0].expiry_date, '--time', ticks[0].timestamp,
+                                      '--output', output])
+    nse_oca_store.main()
+    expected: io.StringIO = io.StringIO()
+    nse_oca_store.write_csv(ticks[0], expected)
+    with open(output, newline='') as f:
+        assert f.read() == expected.getvalue()
+    with open(output, newline='') as f:
+        assert len(list(csv.reader(f))) == len(ticks[0]) + 1
+
+    monkeypatch.setattr(sys, 'argv', ['nse_oca_store.py', '--directory', directory, '--symbol', 'NIFTY',
+                                      '--expiry', '01-Jan-2000'])
+    with pytest.raises(SystemExit):
+        nse_oca_store.main()
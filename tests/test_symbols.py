@@ -0,0 +1,147 @@
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Tuple
+
+import pytest
+import requests
+
+import nse_oca_symbols
+from nse_oca_server import StandIn, StandInServer
+from nse_oca_symbols import SymbolCache
+
+page: bytes = b'''<!DOCTYPE html>
+<html><head><title>Underlyings</title></head><body>
+<div class="note"><p>Updated as on <strong>25-Nov-2021</strong></p></div>
+<table class="common_table">
+<thead><tr><th>Sr. No.</th><th>Underlying</th><th>Symbol</th></tr></thead>
+<tbody>
+<tr><td>1</td><td>Nifty 50</td><td>NIFTY</td></tr>
+<tr>
+  <td>2</td>
+  <td>Nifty Bank</td>
+  <td> <a href="/get-quotes/derivatives?symbol=BANKNIFTY">BANKNIFTY</a> </td>
+</tr>
+<tr><td colspan="3"><strong>Derivatives on Individual Securities</strong></td></tr>
+<tr><td>1</td><td>Mahindra &amp; Mahindra Limited</td><td>M&amp;M</td></tr>
+<tr><td>2</td><td>Bajaj Auto Limited</td><td>BAJAJ-AUTO</td></tr>
+<tr><td>3</td><td>Delisted</td><td></td></tr>
+</tbody>
+</table>
+<table><tr><td>1</td><td>Second table</td><td>IGNORED</td></tr></table>
+</body></html>
+'''
+
+symbols: Tuple[List[str], List[str]] = (['NIFTY', 'BANKNIFTY'], ['M&M', 'BAJAJ-AUTO'])
+
+
+@pytest.fixture
+def server() -> Iterator[StandInServer]:
+    server: StandInServer = StandInServer(('127.0.0.1', 0), StandIn())
+    thread: threading.Thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+def url_of(server: StandInServer) -> str:
+    return f"{server.base_url}/products-services/equity-derivatives-list-underlyings-information"
+
+
+def cache_of(tmp_path: Any, url: str, **options: Any) -> SymbolCache:
+    return SymbolCache(url, {}, path=os.path.join(str(tmp_path), 'symbols.json'), **options)
+
+
+def test_parse_symbols() -> None:
+    assert nse_oca_symbols.parse_symbols(page) == symbols
+
+
+def test_parse_symbols_in_chunks() -> None:
+    parser: nse_oca_symbols.SymbolTableParser = nse_oca_symbols.SymbolTableParser()
+    text: str = page.decode()
+    for start in range(0, len(text), 7):
+        parser.feed(text[start:start + 7])
+    parser.close()
+    assert (parser.indices, parser.stocks) == symbols
+
+
+def test_parse_without_table() -> None:
+    assert nse_oca_symbols.parse_symbols(b'<html><body>Access Denied</body></html>') == ([], [])
+
+
+def test_parse_stand_in_page() -> None:
+    indices, stocks = nse_oca_symbols.parse_symbols(StandIn().symbols_page())
+    assert indices == ['NIFTY', 'BANKNIFTY', 'FINNIFTY', 'MIDCPNIFTY']
+    assert 'RELIANCE' in stocks and 'NIFTY' not in stocks
+
+
+def test_fetch_saves_the_cache(server: StandInServer, tmp_path: Any) -> None:
+    cache: SymbolCache = cache_of(tmp_path, url_of(server))
+    assert cache.load() is None
+    assert cache.expired
+    indices, stocks = cache.fetch()
+    assert indices[0] == 'NIFTY' and stocks[0] == 'RELIANCE'
+    assert not cache.expired
+
+    loaded: SymbolCache = cache_of(tmp_path, url_of(server))
+    assert loaded.load() == (indices, stocks)
+    assert loaded.fetched == cache.fetched
+    assert not loaded.expired
+    assert cache_of(tmp_path, 'http://elsewhere/symbols').load() is None
+
+
+def test_expired_cache_is_still_used(server: StandInServer, tmp_path: Any) -> None:
+    cache: SymbolCache = cache_of(tmp_path, url_of(server), ttl=60)
+    cache.fetch()
+    with open(cache.path) as f:
+        saved: Dict[str, Any] = json.load(f)
+    saved[cache.url]['fetched'] = time.time() - 120
+    with open(cache.path, 'w') as f:
+        json.dump(saved, f)
+
+    stale: SymbolCache = cache_of(tmp_path, url_of(server), ttl=60)
+    assert stale.load() == (saved[cache.url]['indices'], saved[cache.url]['stocks'])
+    assert stale.expired
+    stale.refresh_in_background()
+    stale.refresh_thread.join(5)
+    assert not stale.expired
+    refreshed: SymbolCache = cache_of(tmp_path, url_of(server), ttl=60)
+    refreshed.load()
+    assert not refreshed.expired
+
+
+def test_failed_refresh_keeps_the_cache(server: StandInServer, tmp_path: Any, monkeypatch: Any) -> None:
+    cache: SymbolCache = cache_of(tmp_path, url_of(server), ttl=0)
+    expected: Tuple[List[str], List[str]] = cache.fetch()
+    with pytest.raises(requests.RequestException):
+        cache_of(tmp_path, 'http://127.0.0.1:1/symbols', timeout=1).fetch()
+    with pytest.raises(ValueError):
+        cache_of(tmp_path, f"{server.base_url}/missing").fetch()
+
+    fallback: SymbolCache = cache_of(tmp_path, url_of(server), ttl=0)
+    assert fallback.load() == expected
+    assert fallback.expired
+
+    def offline(*args: Any, **kwargs: Any) -> None:
+        raise requests.ConnectionError("offline")
+
+    monkeypatch.setattr(requests, 'get', offline)
+    fallback.refresh()
+    assert fallback.fetched == cache.fetched
+    assert cache_of(tmp_path, url_of(server)).load() == expected
+
+
+def test_unreadable_cache(tmp_path: Any) -> None:
+    cache: SymbolCache = cache_of(tmp_path, 'http://127.0.0.1:1/symbols')
+    with open(cache.path, 'w') as f:
+        f.write('{"http://127.0.0.1:1/symbols": ')
+    assert cache.load() is None
+    with open(cache.path, 'w') as f:
+        json.dump({cache.url: {'fetched': time.time(), 'indices': ['NIFTY'], 'stocks': []}}, f)
+    assert cache.load() is None
+    cache.fetched = time.time()
+    cache.save(*symbols)
+    assert cache.load() == symbols